@@ -2,11 +2,14 @@ import streamlit as st
 import pandas as pd
 import os
 import nlp_engine as nlp
-from scripts.reporting import generate_pdf_report
+from scripts import reporting
+from scripts.extraction_cache import ExtractionCache, extract_many_cached
+from scripts.skill_bits import SkillMatrix
 import matplotlib.pyplot as plt
 import seaborn as sns
-from io import BytesIO
 import datetime
+import hashlib
+import scipy.sparse as sp
 
 # Page Config
 st.set_page_config(page_title="Task 3: ML Resume Screening", layout="wide", page_icon="🤖")
@@ -31,13 +34,25 @@ st.markdown("""
 st.title("🤖 Task 3: Enterprise ML Resume Screener")
 st.markdown("Automate your hiring funnel with Supervised Learning, Semantic Analysis, and **LinkedIn Integration**.")
 
-# Load resources
-_, _, _, base_skills = nlp.load_resources()
+# Load resources once per server process; Streamlit re-executes this
+# script on every widget interaction
+@st.cache_resource
+def load_engine():
+    return nlp.get_skill_bank(), ExtractionCache()
+
+@st.cache_resource(max_entries=64)
+def skills_matcher(skills_key):
+    # Memoized by the (sorted) skill set, so typing in the JD box does not
+    # rebuild the PhraseMatcher on every keystroke
+    return nlp.get_skills_matcher(list(skills_key))
+
+base_skills, extraction_cache = load_engine()
 
 # Sidebar
 st.sidebar.title("⚙️ Engine Control")
 min_match = st.sidebar.slider("Min Match Threshold (%)", 0, 100, 30)
 top_k = st.sidebar.number_input("Display Top K", 5, 50, 10)
+workers = st.sidebar.number_input("Extraction Workers", 1, os.cpu_count() or 1, min(4, os.cpu_count() or 1))
 
 # Main Grid
 col1, col2 = st.columns([1, 1], gap="large")
@@ -48,8 +63,7 @@ with col1:
     
     if jd_txt:
         # Extract skills from JD for baseline
-        temp_matcher = nlp.get_skills_matcher(base_skills)
-        inferred_jd_skills = nlp.extract_skills(jd_txt, temp_matcher)
+        inferred_jd_skills = nlp.extract_skills(jd_txt, nlp.get_bank_matcher())
         
         target_skills = st.multiselect("Confirm Target Skills:", 
                                        options=sorted(list(set(base_skills + inferred_jd_skills))), 
@@ -65,105 +79,231 @@ with col2:
         st.success(f"{len(files)} files queued.")
 
 # Execution
+# With PROSCREEN_SERVICE_URL set the UI is a thin client of service.py and
+# scoring happens there; otherwise it runs in this process
+SERVICE_URL = os.environ.get('PROSCREEN_SERVICE_URL', '').rstrip('/')
+
+def score_local(jd_txt, target_skills, files):
+    # Returns {upload index: result}, None for unreadable files. Files that
+    # failed to score are left out, so they are retried on the next run.
+    # Keyed by position since two uploads can share a name.
+    jd_matcher = skills_matcher(tuple(sorted(target_skills))) if target_skills else nlp.get_bank_matcher()
+    scored = {}
+    positions, names, contents, cleaned, rows = [], [], [], [], []
+    progress = st.progress(0.0, text="Extracting documents...")
+    
+    # Repeat uploads are served from the content-addressed cache, the
+    # rest are parsed on a process pool and stream back as they finish
+    items = [(f.getvalue(), f.name) for f in files]
+    extracted = extract_many_cached(extraction_cache, items, workers, indexed=True)
+    for done, (i, name, content, clean, row, error) in enumerate(extracted, 1):
+        progress.progress(done / len(items), text=f"Extracted {done}/{len(items)}: {name}")
+        
+        if not content: 
+            st.warning(f"Could not extract text from {name}. Please check file format.")
+            scored[i] = None
+            continue
+        positions.append(i)
+        names.append(name)
+        contents.append(content)
+        cleaned.append(clean)
+        rows.append(row)
+    progress.empty()
+    if not contents:
+        return scored
+    
+    try:
+        # ML logic: one vectorized pass over the whole upload
+        features = sp.vstack(rows).tocsr() if all(r is not None for r in rows) else None
+        batch_cleaned = cleaned if all(c is not None for c in cleaned) else None
+        results = nlp.screen_batch(jd_txt, target_skills, contents, jd_matcher, features=features,
+                                   cleaned=batch_cleaned)
+        for res in results:
+            if res.get("Duplicate Of") is not None:
+                res["Duplicate Of"] = names[res["Duplicate Of"]]
+        scored.update(zip(positions, results))
+    except Exception:
+        # Score file by file so one bad resume does not sink the whole batch
+        for i, name, content, clean, row in zip(positions, names, contents, cleaned, rows):
+            try:
+                scored[i] = nlp.screen_batch(jd_txt, target_skills, [content], jd_matcher, features=row,
+                                             cleaned=[clean] if clean is not None else None)[0]
+            except Exception as e:
+                st.error(f"Error processing {name}: {e}")
+    return scored
+
+def score_remote(jd_txt, target_skills, files):
+    # Same contract as score_local, but the upload is posted to the
+    # screening service and results are read back from its NDJSON stream
+    import json
+    import requests
+    scored = {}
+    progress = st.progress(0.0, text="Submitting to the screening service...")
+    try:
+        resp = requests.post(
+            f"{SERVICE_URL}/jobs",
+            data={"jd": jd_txt, "skills": ",".join(target_skills)},
+            files=[("files", (f.name, f.getvalue())) for f in files],
+            timeout=60
+        )
+        if resp.status_code == 429:
+            st.error("The screening service is busy, please retry in a few seconds.")
+            progress.empty()
+            return scored
+        resp.raise_for_status()
+        job_id = resp.json()["job_id"]
+        with requests.get(f"{SERVICE_URL}/jobs/{job_id}/results", stream=True, timeout=600) as stream:
+            stream.raise_for_status()
+            for done, line in enumerate((l for l in stream.iter_lines() if l), 1):
+                row = json.loads(line)
+                name = row.pop("Candidate")
+                i = row.pop("Index")
+                progress.progress(done / len(files), text=f"Scored {done}/{len(files)}: {name}")
+                if "Error" in row:
+                    st.warning(f"Could not extract text from {name}. Please check file format.")
+                    scored[i] = None
+                    continue
+                scored[i] = row
+    except Exception as e:
+        # Files without a result yet are not remembered, so they are retried
+        st.error(f"Error contacting the screening service: {e}")
+    progress.empty()
+    return scored
+
+def run_screening(jd_txt, target_skills, files):
+    # Scores are memoized per (file hash, JD hash, target skills) in the
+    # session, so re-running with the same inputs only scores new files
+    memo = st.session_state.setdefault("score_memo", {})
+    skills_key = tuple(sorted(target_skills))
+    jd_key = hashlib.sha256(jd_txt.encode('utf-8')).hexdigest()
+    keyed = [(ExtractionCache.key_for(f.getvalue(), f.name), f) for f in files]
+    todo = [(key, f) for key, f in keyed if (key, jd_key, skills_key) not in memo]
+
+    if todo:
+        score = score_remote if SERVICE_URL else score_local
+        scored = score(jd_txt, target_skills, [f for _, f in todo])
+        for i, (key, f) in enumerate(todo):
+            if i in scored:
+                # Unreadable files (None) are remembered too, so they are not re-parsed
+                memo[(key, jd_key, skills_key)] = scored[i]
+
+    results = []
+    for key, f in keyed:
+        res = memo.get((key, jd_key, skills_key))
+        if res is not None:
+            results.append({"Candidate": f.name, **res})
+    return {"jd": jd_txt, "skills": target_skills, "results": results}
+
 if st.button("🚀 Execute ML Screening"):
     if not jd_txt or not files:
         st.error("Please provide both Job Requirements and Resumes.")
     else:
         with st.spinner("Processing through ML Vector Engine..."):
-            jd_matcher = nlp.get_skills_matcher(target_skills if target_skills else base_skills)
-            results = []
-            
-            for f in files:
-                f_bytes = BytesIO(f.getvalue())
-                content = nlp.extract_text_universal(f_bytes, f.name)
-                
-                if not content: 
-                    st.warning(f"Could not extract text from {f.name}. Please check file format.")
-                    continue
-                
-                try:
-                    # ML logic
-                    pred_role, conf = nlp.get_ml_prediction(content)
-                    res_skills = nlp.extract_skills(content, jd_matcher)
-                    score, semantic_sim, skill_pct = nlp.calculate_match_score(jd_txt, content, target_skills, res_skills)
-                    gaps = nlp.identify_gap(target_skills, res_skills)
-                    
-                    results.append({
-                        "Candidate": f.name,
-                        "Rank Score": score,
-                        "Predicted Role": pred_role,
-                        "ML Conf %": conf,
-                        "Semantic Sim %": semantic_sim,
-                        "Skill Match %": skill_pct,
-                        "Skills": res_skills,
-                        "Gaps": gaps
-                    })
-                except Exception as e:
-                    st.error(f"Error processing {f.name}: {e}")
-            
-            if results:
-                df = pd.DataFrame(results).sort_values("Rank Score", ascending=False)
-                df_filtered = df[df["Rank Score"] >= min_match].head(top_k)
-                
-                st.markdown("---")
-                
-                # Report Action Row
-                r_col1, r_col2 = st.columns([3, 1])
-                with r_col1:
-                    st.header("📊 Ranking Results")
-                with r_col2:
-                    try:
-                        pdf_bytes = generate_pdf_report(jd_txt, target_skills, results)
-                        st.download_button(
-                            label="📄 Download Full PDF Report",
-                            data=bytes(pdf_bytes) if isinstance(pdf_bytes, bytearray) else (pdf_bytes.encode('latin-1') if isinstance(pdf_bytes, str) else pdf_bytes),
-                            file_name=f"Screening_Report_{datetime.datetime.now().strftime('%Y%m%d_%H%M')}.pdf",
-                            mime="application/pdf"
-                        )
-                    except Exception as e:
-                        st.error(f"Reporting Error: {e}")
-                
-                # Visual highlight
-                if not df_filtered.empty:
-                    top_cand = df_filtered.iloc[0]
-                    h_col1, h_col2, h_col3 = st.columns(3)
-                    h_col1.metric("Top Fit", top_cand["Candidate"], f"{top_cand['Rank Score']}%")
-                    h_col2.metric("Dominant Role", top_cand["Predicted Role"], f"{top_cand['ML Conf %']}% Conf")
-                    h_col3.metric("Talent Pool", f"{len(df)} Resumes", "Processed")
-
-                    st.dataframe(df_filtered.drop(columns=["Skills", "Gaps"]), use_container_width=True)
-                    
-                    # Skill Gap Detail
-                    st.subheader("💡 Deep Dive: Skill Gaps")
-                    for _, row in df_filtered.iterrows():
-                        with st.expander(f"Analysis: {row['Candidate']} (Score: {row['Rank Score']})"):
-                            c_a, c_b = st.columns(2)
-                            with c_a:
-                                st.markdown("**Skills Found:**")
-                                if row['Skills']:
-                                    for s in row['Skills']: st.markdown(f'<span class="skill-chip">{s}</span>', unsafe_allow_html=True)
-                                else: st.write("None detected.")
-                            with c_b:
-                                st.markdown("**Missing Skills:**")
-                                if row['Gaps']:
-                                    for g in row['Gaps']: st.markdown(f'<span class="gap-chip">{g}</span>', unsafe_allow_html=True)
-                                else: st.success("No critical skill gap!")
-                    
-                    # Chart
-                    st.subheader("📈 Competitive Landscape")
-                    fig, ax = plt.subplots(figsize=(10, 5))
-                    fig.patch.set_facecolor('#0f172a')
-                    ax.set_facecolor('#1e293b')
-                    sns.barplot(x="Rank Score", y="Candidate", data=df_filtered, palette="flare", ax=ax)
-                    ax.tick_params(colors='white')
-                    ax.xaxis.label.set_color('white')
-                    ax.yaxis.label.set_color('white')
-                    st.pyplot(fig)
+            st.session_state["screening"] = run_screening(jd_txt, target_skills, files)
+
+# Results are rendered from the session, so moving the threshold or Top K
+# slider re-renders instantly without scoring anything again
+screening = st.session_state.get("screening")
+if screening is not None:
+    results = screening["results"]
+    if results:
+        df = pd.DataFrame(results).sort_values("Rank Score", ascending=False)
+        # Near-duplicates (PROSCREEN_DEDUP) share their representative's
+        # scores; they stay in the exports but not in the ranking
+        duplicates = df["Duplicate Of"].notna() if "Duplicate Of" in df.columns else pd.Series(False, index=df.index)
+        df_filtered = df[(df["Rank Score"] >= min_match) & ~duplicates].head(top_k)
+
+        st.markdown("---")
+
+        # Report Action Row
+        r_col1, r_col2 = st.columns([3, 1])
+        with r_col1:
+            st.header("📊 Ranking Results")
+        with r_col2:
+            try:
+                # Rendered on a background thread; the download button shows
+                # up on the first rerun after it finishes
+                if "pdf_job" not in screening:
+                    screening["pdf_job"] = reporting.submit_report("pdf", screening["jd"], screening["skills"], results)
+                stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M')
+                if screening["pdf_job"].done():
+                    st.download_button(
+                        label="📄 Download PDF Report",
+                        data=screening["pdf_job"].result(),
+                        file_name=f"Screening_Report_{stamp}.pdf",
+                        mime="application/pdf"
+                    )
                 else:
-                    st.warning(f"No candidates met the minimum match threshold of {min_match}%.")
-                    st.dataframe(df.drop(columns=["Skills", "Gaps"]), use_container_width=True)
-            else:
-                st.warning("Could not extract enough data for ranking.")
+                    st.caption(f"⏳ Preparing PDF report (top {reporting.DETAIL_TOP_K} in detail)...")
+                    st.button("Refresh")
+                if "csv" not in screening:
+                    screening["csv"] = reporting.export_csv(results)
+                st.download_button(
+                    label="🧾 Download Full Ranking (CSV)",
+                    data=screening["csv"],
+                    file_name=f"Screening_Ranking_{stamp}.csv",
+                    mime="text/csv"
+                )
+            except Exception as e:
+                st.error(f"Reporting Error: {e}")
+
+        # Visual highlight
+        if not df_filtered.empty:
+            top_cand = df_filtered.iloc[0]
+            h_col1, h_col2, h_col3 = st.columns(3)
+            h_col1.metric("Top Fit", top_cand["Candidate"], f"{top_cand['Rank Score']}%")
+            h_col2.metric("Dominant Role", top_cand["Predicted Role"], f"{top_cand['ML Conf %']}% Conf")
+            h_col3.metric("Talent Pool", f"{len(df)} Resumes", "Processed")
+
+            st.dataframe(df_filtered.drop(columns=["Skills", "Gaps", "Top Roles"]), use_container_width=True)
+            if duplicates.any():
+                st.caption(f"{int(duplicates.sum())} near-duplicate resumes hidden (scored once with their original).")
+
+            # Skill Gap Detail
+            st.subheader("💡 Deep Dive: Skill Gaps")
+            for _, row in df_filtered.iterrows():
+                with st.expander(f"Analysis: {row['Candidate']} (Score: {row['Rank Score']})"):
+                    st.caption("Likely roles: " + ", ".join(f"{r} ({p}%)" for r, p in row['Top Roles']))
+                    c_a, c_b = st.columns(2)
+                    with c_a:
+                        st.markdown("**Skills Found:**")
+                        if row['Skills']:
+                            for s in row['Skills']: st.markdown(f'<span class="skill-chip">{s}</span>', unsafe_allow_html=True)
+                        else: st.write("None detected.")
+                    with c_b:
+                        st.markdown("**Missing Skills:**")
+                        if row['Gaps']:
+                            for g in row['Gaps']: st.markdown(f'<span class="gap-chip">{g}</span>', unsafe_allow_html=True)
+                        else: st.success("No critical skill gap!")
+
+            # Pool-wide coverage of the target skills, from one packed
+            # skill matrix built once per screening
+            if screening["skills"]:
+                if "skill_bits" not in screening:
+                    screening["skill_bits"] = SkillMatrix.encode([r["Skills"] for r in results])
+                coverage = screening["skill_bits"].coverage(screening["skills"])
+                st.subheader("🧩 Skill Coverage Across the Pool")
+                st.dataframe(pd.DataFrame({
+                    "Skill": list(coverage),
+                    "Candidates": list(coverage.values()),
+                    "Coverage %": [round(n / len(results) * 100, 1) for n in coverage.values()]
+                }).sort_values("Coverage %"), use_container_width=True, hide_index=True)
+
+            # Chart
+            st.subheader("📈 Competitive Landscape")
+            fig, ax = plt.subplots(figsize=(10, 5))
+            fig.patch.set_facecolor('#0f172a')
+            ax.set_facecolor('#1e293b')
+            sns.barplot(x="Rank Score", y="Candidate", data=df_filtered, palette="flare", ax=ax)
+            ax.tick_params(colors='white')
+            ax.xaxis.label.set_color('white')
+            ax.yaxis.label.set_color('white')
+            st.pyplot(fig)
+        else:
+            st.warning(f"No candidates met the minimum match threshold of {min_match}%.")
+            st.dataframe(df.drop(columns=["Skills", "Gaps", "Top Roles"]), use_container_width=True)
+    else:
+        st.warning("Could not extract enough data for ranking.")
 
 st.markdown("---")
 st.caption("ProScreen AI v6.0 • Advanced Reporting & LinkedIn Support • Task 3 Complete")
@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import logging
+import threading
+import functools
+from contextlib import contextmanager
+
+# Opt-in per-stage timers and counters for the screening pipeline.
+#
+#   PROSCREEN_INSTRUMENT=1      enable at import (or call enable())
+#
+# nlp_engine wraps its stages with @instrumented(stage). While disabled the
+# wrapper is a flag check and a direct call, so production pays next to
+# nothing. While enabled, every call feeds the current recorder: a
+# MetricsRecorder by default, or anything with the same observe / count /
+# event methods installed with set_recorder() (e.g. a statsd adapter).
+#
+# Exports: snapshot() (JSON-friendly dict), log_metrics() (one structured
+# log line per stage) and prometheus_text() (text exposition format).
+# capture() adds an opt-in cProfile / tracemalloc session around a block.
+
+logger = logging.getLogger("proscreen.metrics")
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class MetricsRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # stage -> [count, sum, max, per-bucket counts (+Inf last)]
+            self.stages = {}
+            self.counters = {}
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                entry = self.stages[stage] = [0, 0.0, 0.0, [0] * (len(BUCKETS) + 1)]
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+            i = 0
+            while i < len(BUCKETS) and seconds > BUCKETS[i]:
+                i += 1
+            entry[3][i] += 1
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def event(self, name, **fields):
+        # Per-document detail goes to the log only, never into memory
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps({"event": name, **fields}))
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "stages": {stage: {"count": c, "sum": s, "max": m, "buckets": list(b)}
+                           for stage, (c, s, m, b) in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+
+    def merge(self, snapshot):
+        # Folds in a snapshot recorded elsewhere, e.g. in a worker process
+        with self._lock:
+            for stage, data in snapshot["stages"].items():
+                entry = self.stages.get(stage)
+                if entry is None:
+                    entry = self.stages[stage] = [0, 0.0, 0.0, [0] * (len(BUCKETS) + 1)]
+                entry[0] += data["count"]
+                entry[1] += data["sum"]
+                entry[2] = max(entry[2], data["max"])
+                entry[3] = [a + b for a, b in zip(entry[3], data["buckets"])]
+            for name, value in snapshot["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+_enabled = os.environ.get('PROSCREEN_INSTRUMENT', '').lower() in ('1', 'true', 'yes')
+_recorder = MetricsRecorder()
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def enabled():
+    return _enabled
+
+def get_recorder():
+    return _recorder
+
+def set_recorder(recorder):
+    global _recorder
+    _recorder = recorder
+
+def instrumented(stage):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                _recorder.count(stage + "_errors_total")
+                raise
+            finally:
+                _recorder.observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+def count(name, value=1):
+    if _enabled:
+        _recorder.count(name, value)
+
+def event(name, **fields):
+    if _enabled:
+        _recorder.event(name, **fields)
+
+@contextmanager
+def collect():
+    # Records the block into a fresh MetricsRecorder and yields it (None
+    # while disabled). Used inside worker processes, whose snapshot is then
+    # shipped back and merge()d by the parent.
+    global _recorder
+    if not _enabled:
+        yield None
+        return
+    previous, _recorder = _recorder, MetricsRecorder()
+    try:
+        yield _recorder
+    finally:
+        _recorder = previous
+
+def merge(snapshot):
+    if snapshot:
+        _recorder.merge(snapshot)
+
+def snapshot():
+    return _recorder.snapshot()
+
+def reset():
+    _recorder.reset()
+
+def log_metrics(log=None):
+    # One structured (JSON) log line per stage, then one for the counters
+    log = log or logger
+    data = snapshot()
+    for stage, s in sorted(data["stages"].items()):
+        log.info(json.dumps({
+            "stage": stage, "count": s["count"], "total_s": round(s["sum"], 6),
+            "mean_ms": round(s["sum"] / s["count"] * 1000, 3) if s["count"] else 0.0,
+            "max_ms": round(s["max"] * 1000, 3)
+        }))
+    if data["counters"]:
+        log.info(json.dumps({"counters": data["counters"]}))
+
+def prometheus_text(prefix="proscreen"):
+    data = snapshot()
+    lines = [f"# HELP {prefix}_stage_seconds Time spent per pipeline stage call.",
+             f"# TYPE {prefix}_stage_seconds histogram"]
+    for stage, s in sorted(data["stages"].items()):
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), s["buckets"]):
+            cumulative += n
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {s["sum"]}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+    for name, value in sorted(data["counters"].items()):
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        lines.append(f"{prefix}_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+def write_metrics(path):
+    # .prom / .txt -> Prometheus text, anything else -> JSON snapshot
+    with open(path, 'w', encoding='utf-8') as f:
+        if path.endswith(('.prom', '.txt')):
+            f.write(prometheus_text())
+        else:
+            json.dump(snapshot(), f, indent=2)
+
+class Capture:
+    def __init__(self):
+        self.profile = None        # cProfile.Profile, for pstats / snakeviz
+        self.peak_bytes = None     # tracemalloc peak
+        self.allocations = None    # top allocation sites, as text
+
+    def cpu_report(self, top=25, sort='cumulative'):
+        import io
+        import pstats
+        if self.profile is None:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats(sort).print_stats(top)
+        return out.getvalue()
+
+@contextmanager
+def capture(cpu=True, memory=False, top=25):
+    # Opt-in deep dive, much heavier than the timers:
+    #   with instrumentation.capture(memory=True) as cap:
+    #       nlp.screen_batch(...)
+    #   print(cap.cpu_report()); print(cap.allocations)
+    import cProfile
+    import tracemalloc
+    result = Capture()
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if cpu:
+        result.profile = cProfile.Profile()
+        result.profile.enable()
+    try:
+        yield result
+    finally:
+        if cpu:
+            result.profile.disable()
+        if memory:
+            result.peak_bytes = tracemalloc.get_traced_memory()[1]
+            stats = tracemalloc.take_snapshot().statistics('lineno')[:top]
+            result.allocations = "\n".join(str(stat) for stat in stats)
+            if started_tracing:
+                tracemalloc.stop()
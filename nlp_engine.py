@@ -1,134 +1,491 @@
+import time
+_IMPORT_START = time.perf_counter()
+
 import os
 import re
-import PyPDF2
-import docx
-import spacy
-from spacy.matcher import PhraseMatcher
-import joblib
-import numpy as np
 import json
-from sklearn.metrics.pairwise import cosine_similarity
+import instrumentation
+from instrumentation import instrumented
+
+# Heavy dependencies (spaCy, PyPDF2, python-docx, scikit-learn, joblib, numpy)
+# are imported inside the functions that use them, and every model is loaded
+# lazily on first use. Importing this module for clean_text or
+# is_linkedin_pdf therefore costs almost nothing, which matters for
+# short-lived workers and test scripts.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, 'models')
 
-# Load models and NLP
-nlp = spacy.load('en_core_web_sm')
+# Only the tokenizer is used (see extract_skills), so the trained
+# components are never loaded.
+_UNUSED_PIPES = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter"]
 
-# Global cache
+# Global cache, each entry is filled on first use
+_nlp = None
 _classifier = None
 _vectorizer = None
 _label_encoder = None
 _skill_bank = None
+_compact_model = None
+_streaming_model = None
+_lsa = None
+_skill_automaton = None
+_bank_matcher = None
 
-def load_resources():
-    global _classifier, _vectorizer, _label_encoder, _skill_bank
+# "pickle" loads the joblib artifacts below, "compact" the memory-mapped
+# array export in models/compact (see scripts/compact_model.py), which
+# loads faster and is shared between worker processes
+MODEL_FORMAT = os.environ.get('PROSCREEN_MODEL_FORMAT', 'pickle')
+COMPACT_MODEL_DIR = os.path.join(MODELS_DIR, 'compact')
+
+# Classifier backend behind predict_roles, all trained by scripts/train_v2.py
+# (see models/classifier_report.md for their accuracy, latency and size).
+# The compact format covers the random forest; other backends are small
+# pickles and load as such.
+CLASSIFIER_BACKEND = os.environ.get('PROSCREEN_CLASSIFIER', 'random_forest')
+CLASSIFIER_FILES = {
+    "random_forest": 'resume_classifier_v2.pkl',
+    "logreg": 'resume_classifier_v2_logreg.pkl',
+    "linear_svc": 'resume_classifier_v2_linear_svc.pkl',
+}
+
+# "tfidf" uses the fitted TF-IDF vectorizer and the classifier above.
+# "hashing" uses the stateless hashing featurizer and the SGD model from
+# out-of-core training (train_v2 --streaming), stored together in
+# STREAMING_MODEL_FILE so both sides always hash the same way.
+FEATURIZER = os.environ.get('PROSCREEN_FEATURIZER', 'tfidf')
+STREAMING_MODEL_FILE = 'resume_classifier_sgd.pkl'
+
+# Semantic similarity between a JD and a resume: "tfidf" is the cosine of
+# the sparse TF-IDF rows, "lsa" the cosine of dense LSA embeddings (a
+# truncated SVD of the TF-IDF space fitted by train_v2, LSA_FILE), which
+# also credits related terms that never co-occur verbatim. The embeddings
+# are what scripts/ann_index.py searches.
+SEMANTIC = os.environ.get('PROSCREEN_SEMANTIC', 'tfidf')
+LSA_FILE = 'lsa_v2.pkl'
+
+# Near-duplicate resumes (re-submissions, templates) in a screen_batch call
+# are scored once when enabled; DEDUP_THRESHOLD is the estimated Jaccard
+# similarity of their word 5-shingles from which two count as duplicates
+DEDUP = os.environ.get('PROSCREEN_DEDUP', '').lower() in ('1', 'true', 'yes')
+DEDUP_THRESHOLD = float(os.environ.get('PROSCREEN_DEDUP_THRESHOLD', 0.8))
+
+# Comma separated resume sections (scripts/sections.py, e.g.
+# "skills,experience") that skill matching and the TF-IDF features are
+# computed on in screen_batch; empty means the whole document
+SKILL_SECTIONS = os.environ.get('PROSCREEN_SKILL_SECTIONS', '')
+TFIDF_SECTIONS = os.environ.get('PROSCREEN_TFIDF_SECTIONS', '')
+
+# Seconds spent in each startup phase, see startup_report()
+_startup_timings = {}
+
+def _timed(phase, loader):
+    start = time.perf_counter()
+    result = loader()
+    _startup_timings[phase] = time.perf_counter() - start
+    return result
+
+def _load_artifact(filename):
+    import joblib
+    path = os.path.join(MODELS_DIR, filename)
+    try:
+        return _timed(filename, lambda: joblib.load(path))
+    except Exception as e:
+        print(f"Error loading {path}: {e}")
+        raise RuntimeError(f"Engine resources failed to load: {e}")
+
+def get_nlp():
+    global _nlp
+    if _nlp is None:
+        def _load():
+            import spacy
+            return spacy.load('en_core_web_sm', exclude=_UNUSED_PIPES)
+        _nlp = _timed('spacy', _load)
+    return _nlp
+
+def get_compact_model():
+    global _compact_model
+    if _compact_model is None:
+        def _load():
+            from scripts.compact_model import CompactModel
+            return CompactModel.load(COMPACT_MODEL_DIR)
+        try:
+            _compact_model = _timed('compact model', _load)
+        except Exception as e:
+            print(f"Error loading {COMPACT_MODEL_DIR}: {e}")
+            raise RuntimeError(f"Engine resources failed to load: {e}")
+    return _compact_model
+
+def get_streaming_model():
+    # {"classifier", "label_encoder", "featurizer_params"} plus the rebuilt
+    # "featurizer"
+    global _streaming_model
+    if _streaming_model is None:
+        from scripts.hashing_featurizer import HashingFeaturizer
+        bundle = _load_artifact(STREAMING_MODEL_FILE)
+        bundle["featurizer"] = HashingFeaturizer(**bundle["featurizer_params"])
+        _streaming_model = bundle
+    return _streaming_model
+
+def get_lsa():
+    global _lsa
+    if _lsa is None:
+        if FEATURIZER != 'tfidf':
+            raise RuntimeError("LSA embeddings project the TF-IDF features, they need PROSCREEN_FEATURIZER=tfidf.")
+        _lsa = _load_artifact(LSA_FILE)
+    return _lsa
+
+def get_classifier():
+    global _classifier
     if _classifier is None:
+        if FEATURIZER == 'hashing':
+            _classifier = get_streaming_model()["classifier"]
+        elif CLASSIFIER_BACKEND not in CLASSIFIER_FILES:
+            raise RuntimeError(f"Unknown classifier backend {CLASSIFIER_BACKEND!r}, expected one of {sorted(CLASSIFIER_FILES)}")
+        elif MODEL_FORMAT == 'compact' and CLASSIFIER_BACKEND == 'random_forest':
+            _classifier = get_compact_model().classifier
+        else:
+            _classifier = _load_artifact(CLASSIFIER_FILES[CLASSIFIER_BACKEND])
+    return _classifier
+
+def get_vectorizer():
+    global _vectorizer
+    if _vectorizer is None:
+        if FEATURIZER == 'hashing':
+            _vectorizer = get_streaming_model()["featurizer"]
+        elif MODEL_FORMAT == 'compact':
+            _vectorizer = get_compact_model().vectorizer
+        else:
+            _vectorizer = _load_artifact('tfidf_vectorizer_v2.pkl')
+    return _vectorizer
+
+def get_label_encoder():
+    global _label_encoder
+    if _label_encoder is None:
+        if FEATURIZER == 'hashing':
+            _label_encoder = get_streaming_model()["label_encoder"]
+        elif MODEL_FORMAT == 'compact':
+            _label_encoder = get_compact_model().label_encoder
+        else:
+            _label_encoder = _load_artifact('label_encoder_v2.pkl')
+    return _label_encoder
+
+def get_skill_bank():
+    global _skill_bank
+    if _skill_bank is None:
+        skills_path = os.path.join(MODELS_DIR, 'skills.json')
         try:
-            # Fix: Use absolute path relative to this file
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            models_dir = os.path.join(base_dir, 'models')
-            
-            _classifier = joblib.load(os.path.join(models_dir, 'resume_classifier_v2.pkl'))
-            _vectorizer = joblib.load(os.path.join(models_dir, 'tfidf_vectorizer_v2.pkl'))
-            _label_encoder = joblib.load(os.path.join(models_dir, 'label_encoder_v2.pkl'))
-            
-            skills_path = os.path.join(models_dir, 'skills.json')
-            with open(skills_path, 'r') as f:
-                _skill_bank = json.load(f)
-                
-            print(f"Resources loaded successfully from {models_dir}")
+            def _load():
+                with open(skills_path, 'r') as f:
+                    return json.load(f)
+            _skill_bank = _timed('skills.json', _load)
         except Exception as e:
             print(f"Error loading resources: {e}")
-            _skill_bank = []
             raise RuntimeError(f"Engine resources failed to load: {e}")
-    return _classifier, _vectorizer, _label_encoder, _skill_bank
+    return _skill_bank
+
+def __getattr__(name):
+    # `nlp_engine.nlp` used to be a module-level spaCy object; keep it
+    # reachable without loading spaCy at import time.
+    if name == 'nlp':
+        return get_nlp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+def artifact_fingerprint(filename):
+    # Changes whenever the artifact is retrained/replaced; used to invalidate
+    # anything derived from it (e.g. cached TF-IDF rows)
+    st = os.stat(os.path.join(MODELS_DIR, filename))
+    return f"{filename}:{st.st_size}:{st.st_mtime_ns}"
+
+def vectorizer_fingerprint():
+    # Identifies what get_vectorizer() returns; feature rows cached or
+    # indexed elsewhere are keyed on it
+    if FEATURIZER == 'hashing':
+        return 'hashing:' + artifact_fingerprint(STREAMING_MODEL_FILE)
+    return artifact_fingerprint('tfidf_vectorizer_v2.pkl')
+
+def load_resources():
+    return get_classifier(), get_vectorizer(), get_label_encoder(), get_skill_bank()
+
+def startup_report():
+    # Human readable breakdown of where startup time went so far
+    lines = ["Startup phases:"]
+    for phase, seconds in _startup_timings.items():
+        lines.append(f"  {phase:<28} {seconds * 1000:8.1f} ms")
+    lines.append(f"  {'total':<28} {sum(_startup_timings.values()) * 1000:8.1f} ms")
+    return "\n".join(lines)
+
+# clean_text patterns, compiled once. The punctuation and non-ASCII steps
+# both map single characters to a space, so they share one character class:
+# string.punctuation is exactly the ranges \x21-\x2f, \x3a-\x40, \x5b-\x60
+# and \x7b-\x7e.
+_URL_RE = re.compile(r'http\S+\s*')
+_RT_CC_RE = re.compile(r'RT|cc')
+_HASHTAG_RE = re.compile(r'#\S+')
+_MENTION_RE = re.compile(r'@\S+')
+_PUNCT_NON_ASCII_RE = re.compile(r'[\x21-\x2f\x3a-\x40\x5b-\x60\x7b-\x7e\x80-\U0010ffff]')
+
+@instrumented("clean_text")
 def clean_text(text):
-    text = re.sub('http\S+\s*', ' ', text)
-    text = re.sub('RT|cc', ' ', text)
-    text = re.sub('#\S+', ' ', text)
-    text = re.sub('@\S+', ' ', text)
-    text = re.sub('[%s]' % re.escape("""!"#$%&'()*+,-./:;<=>?@[\]^_`{|}~"""), ' ', text)
-    text = re.sub(r'[^\x00-\x7f]',r' ', text) 
-    text = re.sub('\s+', ' ', text)
-    return text.lower().strip()
-
-def extract_text_universal(file_obj, filename):
+    text = _URL_RE.sub(' ', text)
+    text = _RT_CC_RE.sub(' ', text)
+    text = _HASHTAG_RE.sub(' ', text)
+    text = _MENTION_RE.sub(' ', text)
+    text = _PUNCT_NON_ASCII_RE.sub(' ', text)
+    # Only ASCII is left, where str.split() and \s+ agree on whitespace
+    return " ".join(text.split()).lower()
+
+def clean_texts(texts):
+    return [clean_text(t) for t in texts]
+
+# Extraction budget: oversized uploads (e.g. scanned portfolios) are cut
+# off after this many PDF pages / characters instead of being parsed in
+# full. None disables a limit.
+MAX_PDF_PAGES = 50
+MAX_TEXT_CHARS = 200000
+
+def iter_text_universal(file_obj, filename, max_pages=None, max_chars=None):
+    # Yields the document text incrementally (one chunk per PDF page) and
+    # stops as soon as the page or character budget is spent, so callers can
+    # consume a partial stream. Budgets default to MAX_PDF_PAGES and
+    # MAX_TEXT_CHARS, read at call time.
+    max_pages = MAX_PDF_PAGES if max_pages is None else max_pages
+    max_chars = MAX_TEXT_CHARS if max_chars is None else max_chars
     ext = os.path.splitext(filename)[1].lower()
-    text = ""
+    pages, chars = None, 0
     try:
         if ext == '.txt':
-            text = file_obj.read().decode('utf-8')
+            import io
+            reader = io.TextIOWrapper(file_obj, encoding='utf-8', newline='')
+            try:
+                text = reader.read(-1 if max_chars is None else max_chars)
+            finally:
+                reader.detach()
+            chars = len(text)
+            yield text
         elif ext == '.pdf':
+            import PyPDF2
             reader = PyPDF2.PdfReader(file_obj)
-            for page in reader.pages:
+            remaining = max_chars
+            pages = 0
+            for i, page in enumerate(reader.pages):
+                if max_pages is not None and i >= max_pages:
+                    break
+                pages += 1
                 extracted = page.extract_text()
-                if extracted:
-                    text += extracted + "\n"
+                if not extracted:
+                    continue
+                chunk = extracted + "\n"
+                if remaining is not None:
+                    chunk = chunk[:remaining]
+                    remaining -= len(chunk)
+                chars += len(chunk)
+                yield chunk
+                if remaining is not None and remaining <= 0:
+                    break
         elif ext == '.docx':
+            import docx
             doc = docx.Document(file_obj)
             text = "\n".join([para.text for para in doc.paragraphs])
+            text = text if max_chars is None else text[:max_chars]
+            chars = len(text)
+            yield text
+    finally:
+        if instrumentation.enabled():
+            _record_document(file_obj, filename, ext, pages, chars)
+
+def _stream_size(file_obj):
+    try:
+        return file_obj.getbuffer().nbytes
+    except AttributeError:
+        pos = file_obj.tell()
+        size = file_obj.seek(0, 2)
+        file_obj.seek(pos)
+        return size
+
+def _record_document(file_obj, filename, ext, pages, chars):
+    # Per-document byte / page counts for the instrumentation layer
+    try:
+        size = _stream_size(file_obj)
+    except Exception:
+        size = None
+    instrumentation.count("extract_documents_total")
+    instrumentation.count("extract_chars_total", chars)
+    if size is not None:
+        instrumentation.count("extract_bytes_total", size)
+    if pages is not None:
+        instrumentation.count("extract_pages_total", pages)
+    instrumentation.event("document", filename=filename, format=ext.lstrip('.'), bytes=size, pages=pages, chars=chars)
+
+@instrumented("extract_text")
+def _extract_text(file_obj, filename, max_pages=None, max_chars=None):
+    # Join once instead of growing a string page by page
+    return "".join(iter_text_universal(file_obj, filename, max_pages, max_chars))
+
+def extract_text_universal(file_obj, filename, max_pages=None, max_chars=None):
+    try:
+        return _extract_text(file_obj, filename, max_pages, max_chars)
     except Exception as e:
         print(f"Error reading {filename}: {e}")
-    return text
+    return ""
+
+def _extract_task(data, filename):
+    # Process pool entry point: errors travel back with the result
+    from io import BytesIO
+    try:
+        return filename, _extract_text(BytesIO(data), filename), None
+    except Exception as e:
+        return filename, "", str(e)
 
-def get_skills_matcher(skills_list):
+def _pooled_extract_task(data, filename):
+    # _extract_task in a worker process; metrics recorded there come back
+    # with the result (None while instrumentation is disabled)
+    with instrumentation.collect() as metrics:
+        result = _extract_task(data, filename)
+    return result, metrics.snapshot() if metrics is not None else None
+
+def extract_many(items, workers=None, executor=None, indexed=False):
+    # Extracts (bytes, filename) pairs on a pool of worker processes and
+    # yields (filename, text, error) as each document finishes. PDF parsing
+    # is pure Python and CPU bound, so processes (not threads) are needed.
+    # Long-running callers can pass their own executor to reuse its workers.
+    # With `indexed`, yields (position in items, filename, text, error), for
+    # callers whose filenames are not unique.
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    items = list(items)
+    workers = workers or os.cpu_count() or 1
+    if executor is None and (workers == 1 or len(items) <= 1):
+        for i, (data, filename) in enumerate(items):
+            result = _extract_task(data, filename)
+            yield (i, *result) if indexed else result
+        return
+    pool = executor or ProcessPoolExecutor(max_workers=min(workers, len(items)))
+    try:
+        futures = {pool.submit(_pooled_extract_task, data, filename): i for i, (data, filename) in enumerate(items)}
+        for future in as_completed(futures):
+            result, metrics = future.result()
+            instrumentation.merge(metrics)
+            yield (futures[future], *result) if indexed else result
+    finally:
+        if executor is None:
+            pool.shutdown()
+
+# "phrase" uses spaCy's PhraseMatcher, "automaton" the compiled Aho-Corasick
+# matcher from scripts/skill_automaton.py, meant for very large taxonomies
+SKILL_MATCHER_BACKEND = os.environ.get('PROSCREEN_SKILL_MATCHER', 'phrase')
+
+# Optional compiled skill taxonomy (python -m scripts.skill_automaton), a
+# path relative to models/. When set it is the bank matcher: JD skill
+# inference and scoring without target skills use it, and aliases are
+# reported under their canonical names.
+SKILL_AUTOMATON = os.environ.get('PROSCREEN_SKILL_AUTOMATON', '')
+
+def get_skill_automaton():
+    global _skill_automaton
+    if _skill_automaton is None:
+        path = os.path.join(MODELS_DIR, SKILL_AUTOMATON)
+        def _load():
+            from scripts.skill_automaton import SkillAutomaton
+            return SkillAutomaton.load(path)
+        try:
+            _skill_automaton = _timed('skill automaton', _load)
+        except Exception as e:
+            print(f"Error loading {path}: {e}")
+            raise RuntimeError(f"Engine resources failed to load: {e}")
+    return _skill_automaton
+
+def get_bank_matcher():
+    # Matcher over the whole skill bank, built once per process
+    global _bank_matcher
+    if _bank_matcher is None:
+        _bank_matcher = get_skill_automaton() if SKILL_AUTOMATON else get_skills_matcher(get_skill_bank())
+    return _bank_matcher
+
+def get_skills_matcher(skills_list, backend=None):
+    if (backend or SKILL_MATCHER_BACKEND) == 'automaton':
+        from scripts.skill_automaton import SkillAutomaton
+        return SkillAutomaton.build(skills_list)
+    from spacy.matcher import PhraseMatcher
+    nlp = get_nlp()
     matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
     patterns = [nlp.make_doc(text) for text in skills_list]
     matcher.add("SkillsMatcher", patterns)
     return matcher
 
-def extract_skills(text, matcher):
-    doc = nlp(text)
+def _match_skills(doc, matcher):
     matches = matcher(doc)
     found = set()
     for match_id, start, end in matches:
         found.add(doc[start:end].text.lower().title())
     return list(found)
 
+@instrumented("extract_skills")
+def extract_skills(text, matcher):
+    # Compiled automata tokenize on their own and skip spaCy entirely
+    if hasattr(matcher, 'extract'):
+        return matcher.extract(text)
+    # The PhraseMatcher works on LOWER, which only needs the tokenizer, so
+    # skip the tagger/parser/NER and just tokenize.
+    return _match_skills(get_nlp().make_doc(text), matcher)
+
+@instrumented("extract_skills_batch")
+def extract_skills_batch(texts, matcher, n_process=1, batch_size=64):
+    # Bulk variant of extract_skills: tokenizes through nlp.pipe with every
+    # pipeline component disabled, optionally across n_process workers.
+    # Matching happens here so the matcher never has to be pickled.
+    if hasattr(matcher, 'extract'):
+        return [matcher.extract(text) for text in texts]
+    nlp = get_nlp()
+    docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=nlp.pipe_names)
+    return [_match_skills(doc, matcher) for doc in docs]
+
+# LinkedIn PDF markers, the most common first. Plain words are substring
+# checks; a single alternation regex would lose the literal fast path of
+# str/re searches and scan many times slower.
+_LINKEDIN_MARKERS = ["Experience", "Education", "Summary", "Certifications", "Languages",
+                     re.compile(r"Top\s+Skills"), re.compile(r"Contact\s+www\.linkedin\.com")]
+
 def is_linkedin_pdf(text):
-    # LinkedIn PDFs often contain specific patterns
-    patterns = [
-        r"Contact\s+www\.linkedin\.com",
-        r"Top\s+Skills",
-        r"Languages",
-        r"Certifications",
-        r"Summary",
-        r"Experience",
-        r"Education"
-    ]
+    # LinkedIn PDFs often contain specific patterns; three are enough, so
+    # the remaining markers are not searched for
     matches = 0
-    for p in patterns:
-        if re.search(p, text): matches += 1
-    return matches >= 3
+    for marker in _LINKEDIN_MARKERS:
+        if (marker in text) if isinstance(marker, str) else marker.search(text):
+            matches += 1
+            if matches >= 3:
+                return True
+    return False
 
 def extract_linkedin_sections(text):
+    from scripts.sections import segment
     sections = {
         "Summary": "",
         "Experience": "",
         "Skills": ""
     }
-    
-    # LinkedIn PDF structure is often hierarchical
-    # Let's try to extract Skills specifically
-    skill_match = re.search(r"Top\s+Skills\s+(.*?)(?:\n\n|\n[A-Z]|$)", text, re.DOTALL)
-    if skill_match:
-        sections["Skills"] = skill_match.group(1).strip()
-        
-    exp_match = re.search(r"Experience\s+(.*?)(?:Education|Certifications|$)", text, re.DOTALL)
-    if exp_match:
-        sections["Experience"] = exp_match.group(1).strip()
-        
+    # First occurrence of each, from the single-pass segmenter
+    for name, start, end in segment(text):
+        key = name.title()
+        if key in sections and not sections[key]:
+            sections[key] = text[start:end].strip()
     return sections
 
+def focus_sections(texts, sections):
+    # Each text reduced to the chosen sections (whole when it has none)
+    from scripts.sections import parse_sections, section_text
+    names = parse_sections(sections)
+    return [section_text(text, names) for text in texts]
+
 # Helper function to load ML models specifically for prediction
 def load_ml_models():
-    clf, vect, le, _ = load_resources()
-    return clf, vect, le
+    return get_classifier(), get_vectorizer(), get_label_encoder()
 
 # Helper function for cleaning text for ML prediction
 def clean_for_ml(text):
     return clean_text(text)
 
-def predict_category(text):
+@instrumented("predict_category")
+def predict_category(text, cleaned=None):
     # If it's LinkedIn, maybe we can give it more weight in parsing
     is_li = is_linkedin_pdf(text)
     if is_li:
@@ -137,41 +494,191 @@ def predict_category(text):
     # Try ML prediction
     clf, vect, le = load_ml_models()
     if clf and vect and le:
-        clean_txt = clean_for_ml(text)
+        clean_txt = cleaned if cleaned is not None else clean_for_ml(text)
         features = vect.transform([clean_txt])
-        prediction = clf.predict(features)[0]
-        # Get probability/confidence
-        probs = clf.predict_proba(features)[0]
-        confidence = round(np.max(probs) * 100, 2)
-        return le.inverse_transform([prediction])[0], confidence
+        # Label and confidence both come from a single predict_proba call
+        roles, confidences, _ = predict_roles(features, top_k=1)
+        return roles[0], confidences[0]
     return "Unknown", 0.0 # Default return if models not loaded
 
+@instrumented("predict_roles")
+def predict_roles(features, top_k=3, n_jobs=None):
+    # Fused inference over a TF-IDF matrix: one predict_proba call gives the
+    # label, its confidence and the top_k roles of every row. predict() would
+    # walk every tree of the forest a second time just to take the argmax.
+    # n_jobs (for classifiers that have it) sets how many cores evaluate the
+    # trees. Returns (roles, confidences, top_roles) where top_roles[i] is a
+    # list of (role, confidence %) pairs, best first.
+    import numpy as np
+    import copy
+    clf, _, le = load_ml_models()
+    if n_jobs is not None and hasattr(clf, 'n_jobs'):
+        # The cached classifier is shared across threads, so the override
+        # goes on a shallow copy (the fitted trees are not copied)
+        clf = copy.copy(clf)
+        clf.n_jobs = n_jobs
+    probs = clf.predict_proba(features)
+    # Stable sort keeps argmax's choice (first index) on ties
+    order = np.argsort(-probs, axis=1, kind='stable')[:, :max(top_k, 1)]
+    ranked_probs = np.round(np.take_along_axis(probs, order, axis=1) * 100, 2)
+    ranked_roles = le.inverse_transform(clf.classes_[order].ravel()).reshape(order.shape)
+    top_roles = [[(str(role), float(pct)) for role, pct in zip(row_roles, row_probs)]
+                 for row_roles, row_probs in zip(ranked_roles, ranked_probs)]
+    return ranked_roles[:, 0], ranked_probs[:, 0], top_roles
+
+def predict_top_roles(text, top_k=3):
+    _, vect, _ = load_ml_models()
+    return predict_roles(vect.transform([clean_for_ml(text)]), top_k)[2][0]
+
+def predict_category_batch(features, n_jobs=None):
+    # predict_category over a whole TF-IDF matrix with one predict_proba call
+    roles, confidences, _ = predict_roles(features, top_k=1, n_jobs=n_jobs)
+    return roles, confidences
+
 def get_ml_prediction(text):
     # This function now calls the new predict_category for consistency
     return predict_category(text)
 
-def calculate_match_score(jd_text, resume_text, jd_skills, resume_skills):
+def skill_match_ratio(jd_skills, resume_skills):
+    if not jd_skills:
+        return 1.0
+    matched = set(jd_skills) & set(resume_skills)
+    return len(matched) / len(jd_skills)
+
+def combine_scores(sim, skill_score):
+    # 50% semantic similarity + 50% skill match
+    final_score = (sim * 50) + (skill_score * 50)
+    return round(final_score, 2), round(sim * 100, 2), round(skill_score * 100, 2)
+
+def embed(features):
+    # TF-IDF rows -> L2-normalized float32 LSA vectors, so a dot product is
+    # the cosine
+    import numpy as np
+    from sklearn.preprocessing import normalize
+    return normalize(get_lsa().transform(features)).astype(np.float32)
+
+def semantic_similarity_matrix(features, jd_features):
+    # Similarity of every row of `features` to every JD row, a dense
+    # (rows, JDs) array in [0, 1]
+    import numpy as np
+    if SEMANTIC == 'lsa':
+        return np.clip(embed(features) @ embed(jd_features).T, 0.0, 1.0).astype(np.float64)
+    from sklearn.metrics.pairwise import cosine_similarity
+    # cosine_similarity normalizes both sides and does one sparse product
+    return cosine_similarity(features, jd_features)
+
+def semantic_similarity(features, jd_features):
+    # Similarity of every row of `features` to the single JD row, in [0, 1]
+    return semantic_similarity_matrix(features, jd_features)[:, 0]
+
+@instrumented("calculate_match_score")
+def calculate_match_score(jd_text, resume_text, jd_skills, resume_skills, jd_cleaned=None, resume_cleaned=None):
     # 1. Semantic Similarity (50%)
     # Use the trained vectorizer for consistency
-    _, vect, _, _ = load_resources()
-    jd_cleaned = clean_text(jd_text)
-    res_cleaned = clean_text(resume_text)
+    vect = get_vectorizer()
+    # Callers that already cleaned the documents pass them in to skip a pass
+    if jd_cleaned is None:
+        jd_cleaned = clean_text(jd_text)
+    if resume_cleaned is None:
+        resume_cleaned = clean_text(resume_text)
     
     jd_vec = vect.transform([jd_cleaned])
-    res_vec = vect.transform([res_cleaned])
+    res_vec = vect.transform([resume_cleaned])
     
-    sim = cosine_similarity(jd_vec, res_vec).flatten()[0]
+    sim = semantic_similarity(res_vec, jd_vec)[0]
     
     # 2. Skill Match (50%)
-    if not jd_skills:
-        skill_score = 1.0
-    else:
-        matched = set(jd_skills) & set(resume_skills)
-        skill_score = len(matched) / len(jd_skills)
+    skill_score = skill_match_ratio(jd_skills, resume_skills)
         
-    final_score = (sim * 50) + (skill_score * 50)
-    return round(final_score, 2), round(sim * 100, 2), round(skill_score * 100, 2)
+    return combine_scores(sim, skill_score)
 
 def identify_gap(jd_skills, resume_skills):
-    gap = list(set(jd_skills) - set(resume_skills))
+    # Missing JD skills in JD order (as SkillMatrix.gaps)
+    found = set(resume_skills)
+    gap = [s for s in dict.fromkeys(jd_skills) if s not in found]
     return gap
+
+@instrumented("screen_batch")
+def screen_batch(jd_text, target_skills, texts, matcher=None, n_process=1, features=None, cleaned=None,
+                 top_roles_k=3, n_jobs=None, dedup=None):
+    # Screens N resumes against one JD in a single vectorized pass:
+    # the JD is cleaned and vectorized once, the resumes become one sparse
+    # matrix, the classifier runs once and all similarities come from one
+    # sparse mat-vec. Returns one result dict per text, in input order.
+    # `features` may carry precomputed TF-IDF rows and `cleaned` the
+    # clean_text output (e.g. from the extraction cache) so the resumes are
+    # not cleaned or vectorized again.
+    # With `dedup` (default DEDUP) near-duplicate texts are only scored once,
+    # see _screen_deduplicated.
+    texts = list(texts)
+    if not texts:
+        return []
+    if DEDUP if dedup is None else dedup:
+        return _screen_deduplicated(jd_text, target_skills, texts, matcher, n_process, features, cleaned,
+                                    top_roles_k, n_jobs)
+    return _screen(jd_text, target_skills, texts, matcher, n_process, features, cleaned, top_roles_k, n_jobs)
+
+def _screen_deduplicated(jd_text, target_skills, texts, matcher, n_process, features, cleaned, top_roles_k, n_jobs):
+    # Only the first text of each near-duplicate cluster (MinHash/LSH, see
+    # scripts/near_duplicates.py) is classified and scored; its result is
+    # copied to the others. Every result gets "Duplicate Of": the input
+    # position of its representative, or None for representatives.
+    from scripts.near_duplicates import find_duplicates
+    if cleaned is None:
+        cleaned = clean_texts(texts)
+    reps = find_duplicates(cleaned, DEDUP_THRESHOLD)
+    unique = [i for i, rep in enumerate(reps) if rep is None]
+    instrumentation.count("duplicates_skipped_total", len(texts) - len(unique))
+    scored = _screen(jd_text, target_skills, [texts[i] for i in unique], matcher, n_process,
+                     features[unique] if features is not None else None, [cleaned[i] for i in unique],
+                     top_roles_k, n_jobs)
+    by_position = dict(zip(unique, scored))
+    results = []
+    for i, rep in enumerate(reps):
+        res = by_position[i if rep is None else rep]
+        results.append({**res, "Skills": list(res["Skills"]), "Gaps": list(res["Gaps"]), "Duplicate Of": rep})
+    return results
+
+def _screen(jd_text, target_skills, texts, matcher, n_process, features, cleaned, top_roles_k, n_jobs):
+    vect = get_vectorizer()
+    if matcher is None:
+        matcher = get_skills_matcher(target_skills) if target_skills else get_bank_matcher()
+
+    jd_vec = vect.transform([clean_text(jd_text)])
+    if TFIDF_SECTIONS:
+        # Precomputed rows and cleaned text cover the whole document
+        res_matrix = vect.transform(clean_texts(focus_sections(texts, TFIDF_SECTIONS)))
+    elif features is not None:
+        res_matrix = features
+    else:
+        res_matrix = vect.transform(cleaned if cleaned is not None else clean_texts(texts))
+
+    sims = semantic_similarity(res_matrix, jd_vec)
+
+    roles, confidences, top_roles = predict_roles(res_matrix, top_k=top_roles_k, n_jobs=n_jobs)
+
+    skill_texts = focus_sections(texts, SKILL_SECTIONS) if SKILL_SECTIONS else texts
+    all_skills = extract_skills_batch(skill_texts, matcher, n_process=n_process)
+
+    # Match ratios and gaps of the whole batch from one packed skill matrix
+    from scripts.skill_bits import SkillMatrix
+    skill_bits = SkillMatrix.encode(all_skills)
+    ratios = skill_bits.match_ratio(target_skills)
+    gaps = skill_bits.gaps(target_skills)
+
+    results = []
+    for i, res_skills in enumerate(all_skills):
+        score, semantic_sim, skill_pct = combine_scores(sims[i], float(ratios[i]))
+        results.append({
+            "Rank Score": score,
+            "Predicted Role": roles[i],
+            "ML Conf %": float(confidences[i]),
+            "Top Roles": top_roles[i],
+            "Semantic Sim %": semantic_sim,
+            "Skill Match %": skill_pct,
+            "Skills": res_skills,
+            "Gaps": gaps[i]
+        })
+    return results
+
+_startup_timings['import nlp_engine'] = time.perf_counter() - _IMPORT_START
@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+# Approximate nearest-neighbour search over L2-normalized float32 vectors
+# (nlp.embed output, so inner product = cosine). CPU only, plain NumPy: an
+# inverted file (IVF).
+#
+# build() clusters the vectors with spherical k-means into ~4*sqrt(n)
+# lists and stores them grouped by list, each list one contiguous slice. A
+# query scores the centroids, scans only the `nprobe` closest lists and
+# keeps the top k, so it costs about n_lists + nprobe * n / n_lists dot
+# products instead of n: ~8,000 instead of 1,000,000 for a 1M pool at
+# nprobe=16.
+#
+# nprobe is the recall / latency knob (PROSCREEN_ANN_NPROBE): 1 scans a
+# single list, n_lists is exact search. To see the trade-off on a built
+# index:
+#   python -m scripts.ann_index --index indexes/pool/ann --k 200 --nprobe 1,4,16,64
+#
+# Layout of an index directory (arrays opened with mmap_mode='r'):
+#   centroids.npy    (n_lists, dim) unit vectors
+#   vectors.npy      (n, dim) the vectors, grouped by list
+#   ids.npy          original row number of each stored vector
+#   offsets.npy      list i is vectors[offsets[i]:offsets[i + 1]]
+#   meta.json
+
+DEFAULT_NPROBE = int(os.environ.get('PROSCREEN_ANN_NPROBE', 16))
+FORMAT_VERSION = 1
+
+def default_n_lists(n):
+    return max(1, min(n, int(4 * n ** 0.5)))
+
+def top_k(scores, k):
+    # Positions of the k largest scores, best first
+    import numpy as np
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind='stable')]
+
+def assign(vectors, centroids, block=16384):
+    # Closest centroid of every vector, a block of rows at a time
+    import numpy as np
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), block):
+        labels[start:start + block] = (np.asarray(vectors[start:start + block]) @ centroids.T).argmax(axis=1)
+    return labels
+
+def spherical_kmeans(vectors, n_lists, n_iter=10, sample_per_list=64, seed=42):
+    # k-means under cosine similarity, trained on at most sample_per_list
+    # points per list; the full set is only assigned afterwards
+    import numpy as np
+    import scipy.sparse as sp
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    if n > n_lists * sample_per_list:
+        train = np.asarray(vectors[np.sort(rng.choice(n, n_lists * sample_per_list, replace=False))])
+    else:
+        train = np.asarray(vectors)
+    centroids = train[rng.choice(len(train), n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = assign(train, centroids)
+        # Per-list sums as one sparse indicator product
+        members = sp.csr_matrix((np.ones(len(train), dtype=np.float32), (labels, np.arange(len(train)))),
+                                shape=(n_lists, len(train)))
+        sums = np.asarray(members @ train)
+        empty = np.bincount(labels, minlength=n_lists) == 0
+        sums[empty] = train[rng.choice(len(train), int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+class IVFIndex:
+    def __init__(self, centroids, vectors, ids, offsets):
+        self.centroids = centroids
+        self.vectors = vectors
+        self.ids = ids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors, n_lists=None, n_iter=10, seed=42):
+        import numpy as np
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            raise ValueError("Cannot build an index without vectors.")
+        n_lists = n_lists or default_n_lists(len(vectors))
+        centroids = spherical_kmeans(vectors, n_lists, n_iter, seed=seed)
+        return cls(centroids, *_group(vectors, np.arange(len(vectors)), assign(vectors, centroids), n_lists))
+
+    def add(self, vectors, ids):
+        # New vectors join their closest existing list, without
+        # re-clustering; rebuild once the pool has grown several times over
+        import numpy as np
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        labels = np.concatenate([np.repeat(np.arange(self.n_lists), np.diff(self.offsets)),
+                                 assign(vectors, self.centroids)])
+        self.vectors, self.ids, self.offsets = _group(
+            np.concatenate([self.vectors, vectors]), np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)]),
+            labels, self.n_lists)
+
+    def search(self, query, k=10, nprobe=None):
+        # (scores, ids) of the k best stored vectors for one query vector,
+        # best first; fewer than k when the probed lists hold fewer
+        import numpy as np
+        query = np.asarray(query, dtype=np.float32).ravel()
+        nprobe = max(1, min(nprobe or DEFAULT_NPROBE, self.n_lists))
+        lists = np.sort(top_k(self.centroids @ query, nprobe))
+        blocks = [(self.offsets[i], self.offsets[i + 1]) for i in lists if self.offsets[i + 1] > self.offsets[i]]
+        if not blocks:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        scores = np.concatenate([self.vectors[start:end] @ query for start, end in blocks])
+        rows = np.concatenate([np.arange(start, end) for start, end in blocks])
+        best = top_k(scores, k)
+        return scores[best], np.asarray(self.ids[rows[best]])
+
+    def search_exact(self, query, k=10):
+        # Brute force over every stored vector, the reference for recall
+        import numpy as np
+        scores = self.vectors @ np.asarray(query, dtype=np.float32).ravel()
+        best = top_k(scores, k)
+        return scores[best], np.asarray(self.ids[best])
+
+    def save(self, directory):
+        import numpy as np
+        os.makedirs(directory, exist_ok=True)
+        for name in ('centroids', 'vectors', 'ids', 'offsets'):
+            tmp = os.path.join(directory, name + '.tmp.npy')
+            np.save(tmp, np.ascontiguousarray(getattr(self, name)))
+            os.replace(tmp, os.path.join(directory, name + '.npy'))
+        meta = {"format_version": FORMAT_VERSION, "count": len(self), "n_lists": self.n_lists,
+                "dim": int(self.centroids.shape[1])}
+        tmp = os.path.join(directory, 'meta.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(directory, 'meta.json'))
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        import numpy as np
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta["format_version"] != FORMAT_VERSION:
+            raise RuntimeError(f"Unsupported ANN index version {meta['format_version']}, rebuild it.")
+        mode = 'r' if mmap else None
+        return cls(*(np.load(os.path.join(directory, name + '.npy'), mmap_mode=mode)
+                     for name in ('centroids', 'vectors', 'ids', 'offsets')))
+
+def _group(vectors, ids, labels, n_lists):
+    # Reorders vectors and ids by list; returns them with the list offsets
+    import numpy as np
+    order = np.argsort(labels, kind='stable')
+    offsets = np.zeros(n_lists + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(labels, minlength=n_lists))
+    return vectors[order], ids[order], offsets
+
+def measure(index, k=200, nprobes=(1, 4, 16, 64), queries=200, seed=0):
+    # Recall@k against exact search and mean latency per query for each
+    # nprobe, using stored vectors as queries
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(index), min(queries, len(index)), replace=False)
+    sample = [np.array(index.vectors[i]) for i in picks]
+    start = time.perf_counter()
+    exact = [set(index.search_exact(q, k)[1].tolist()) for q in sample]
+    rows = [{"nprobe": "exact", "recall": 1.0,
+             "ms_per_query": round((time.perf_counter() - start) / len(sample) * 1000, 3)}]
+    for nprobe in nprobes:
+        start = time.perf_counter()
+        found = [index.search(q, k, nprobe)[1] for q in sample]
+        elapsed = time.perf_counter() - start
+        recall = np.mean([len(truth.intersection(f.tolist())) / len(truth) for truth, f in zip(exact, found)])
+        rows.append({"nprobe": nprobe, "recall": round(float(recall), 4),
+                     "ms_per_query": round(elapsed / len(sample) * 1000, 3)})
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure recall and latency of an ANN index per nprobe.")
+    parser.add_argument("--index", required=True, help="ANN index directory (e.g. <resume index>/ann)")
+    parser.add_argument("--k", type=int, default=200)
+    parser.add_argument("--nprobe", default="1,4,16,64", help="Comma separated nprobe values")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    index = IVFIndex.load(args.index)
+    print(f"{len(index)} vectors in {index.n_lists} lists", file=sys.stderr)
+    print(f"{'nprobe':>8}{'recall@' + str(args.k):>12}{'ms/query':>10}")
+    for row in measure(index, args.k, [int(n) for n in args.nprobe.split(",")], args.queries):
+        print(f"{row['nprobe']:>8}{row['recall']:>12}{row['ms_per_query']:>10}")
+
+if __name__ == "__main__":
+    main()
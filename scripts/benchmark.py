@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import nlp_engine as nlp
+
+# Reproducible benchmark of the screening pipeline, stage by stage:
+#   python -m scripts.benchmark --save benchmarks/baseline.json
+#   python -m scripts.benchmark --compare benchmarks/baseline.json
+#
+# Documents come from data/ and datasets/data/data and are picked evenly
+# across the sorted corpus, so every run of a given size sees the same
+# files. Each size runs in its own worker process, which keeps peak RSS
+# per size and starts every run with cold model caches.
+#
+# The per-document stages (extract, clean, vectorize, classify, skills,
+# score) are timed one document at a time, which gives latency
+# percentiles. "screen_batch" times the vectorized batch path over the
+# same texts, "gap_analysis" the bitset skill scoring of all of them
+# (scripts/skill_bits.py), "report" the PDF generation and "export" the CSV
+# export, each as a single sample.
+
+CORPORA = [os.path.join(nlp.BASE_DIR, 'data'), os.path.join(nlp.BASE_DIR, 'datasets', 'data', 'data')]
+DEFAULT_SIZES = [1, 100, 2484]
+DEFAULT_JD = ("We are seeking a Senior Accountant with expertise in financial reporting, tax preparation, "
+              "and QuickBooks. Experience with auditing and general ledger management is a plus.")
+DEFAULT_SKILLS = ["Accounting", "Financial Reporting", "Tax Preparation", "Quickbooks", "Auditing"]
+STAGES = ["extract", "clean", "vectorize", "classify", "skills", "score", "screen_batch", "gap_analysis", "report",
+          "export"]
+
+def corpus_documents(roots=CORPORA):
+    from scripts.screen_cli import find_documents
+    docs = []
+    for root in roots:
+        if os.path.isdir(root):
+            docs += [os.path.join(root, p) for p in find_documents(root)]
+    return docs
+
+def pick(docs, n):
+    # n documents spread evenly over the corpus (all categories, not the
+    # first n files of the first one)
+    n = min(n, len(docs))
+    return [docs[i * len(docs) // n] for i in range(n)]
+
+def percentile(samples, q):
+    import numpy as np
+    return float(np.percentile(samples, q)) if samples else 0.0
+
+def summarize(samples, docs):
+    total = sum(samples)
+    return {
+        "docs": docs,
+        "seconds": round(total, 4),
+        "docs_per_s": round(docs / total, 2) if total else None,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+def _rss_mb(peak=False):
+    import resource
+    if peak:
+        # KiB on Linux, bytes on macOS
+        scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except OSError:
+        return None
+
+def run_size(paths, jd_text, target_skills):
+    # Runs in a fresh worker process, see main()
+    from sklearn.metrics.pairwise import cosine_similarity
+    from scripts.reporting import generate_pdf_report, export_csv
+    from scripts.skill_bits import SkillMatrix
+    rss_start = _rss_mb()
+    samples = {stage: [] for stage in STAGES}
+
+    def timed(stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        samples[stage].append(time.perf_counter() - start)
+        return result
+
+    load_start = time.perf_counter()
+    nlp.load_resources()
+    vect = nlp.get_vectorizer()
+    matcher = nlp.get_skills_matcher(target_skills)
+    nlp.extract_skills("warm up", matcher)
+    jd_vec = vect.transform([nlp.clean_text(jd_text)])
+    load_seconds = time.perf_counter() - load_start
+
+    names, texts, failed = [], [], 0
+    run_start = time.perf_counter()
+    for path in paths:
+        with open(path, 'rb') as f:
+            text = timed("extract", nlp.extract_text_universal, f, os.path.basename(path))
+        if not text:
+            failed += 1
+            continue
+        names.append(os.path.basename(path))
+        texts.append(text)
+        cleaned = timed("clean", nlp.clean_text, text)
+        row = timed("vectorize", vect.transform, [cleaned])
+        timed("classify", nlp.predict_roles, row)
+        skills = timed("skills", nlp.extract_skills, text, matcher)
+
+        def score():
+            sim = cosine_similarity(row, jd_vec)[0, 0]
+            nlp.identify_gap(target_skills, skills)
+            return nlp.combine_scores(sim, nlp.skill_match_ratio(target_skills, skills))
+        timed("score", score)
+    sequential_seconds = time.perf_counter() - run_start
+
+    results = timed("screen_batch", nlp.screen_batch, jd_text, target_skills, texts, matcher)
+    ranked = [{"Candidate": name, **r} for name, r in zip(names, results)]
+
+    def gap_analysis():
+        skill_bits = SkillMatrix.encode([r["Skills"] for r in results])
+        return skill_bits.match_ratio(target_skills), skill_bits.gaps(target_skills), skill_bits.coverage(target_skills)
+    timed("gap_analysis", gap_analysis)
+    timed("report", generate_pdf_report, jd_text, target_skills, ranked)
+    timed("export", export_csv, ranked)
+
+    stages = {}
+    for stage in STAGES:
+        # Batch stages cover every text in one sample
+        docs = len(texts) if stage in ("screen_batch", "gap_analysis", "report", "export") else len(samples[stage])
+        stages[stage] = summarize(samples[stage], docs)
+    return {
+        "docs": len(paths),
+        "failed": failed,
+        "model_load_seconds": round(load_seconds, 4),
+        "sequential_seconds": round(sequential_seconds, 4),
+        "sequential_docs_per_s": round(len(paths) / sequential_seconds, 2) if sequential_seconds else None,
+        "rss_start_mb": round(rss_start, 1) if rss_start is not None else None,
+        "peak_rss_mb": round(_rss_mb(peak=True), 1),
+        "stages": stages,
+    }
+
+def _fingerprint(filename):
+    # Which model artifacts produced the numbers
+    try:
+        return nlp.artifact_fingerprint(filename)
+    except OSError:
+        return None
+
+def run_benchmark(sizes=DEFAULT_SIZES, jd_text=DEFAULT_JD, target_skills=DEFAULT_SKILLS, roots=CORPORA):
+    docs = corpus_documents(roots)
+    if not docs:
+        raise RuntimeError("No documents found in the benchmark corpora.")
+    report = {
+        "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "corpus_docs": len(docs),
+        "classifier": _fingerprint(nlp.CLASSIFIER_FILES[nlp.CLASSIFIER_BACKEND]),
+        "classifier_backend": nlp.CLASSIFIER_BACKEND,
+        "model_format": nlp.MODEL_FORMAT,
+        "featurizer": nlp.FEATURIZER,
+        "semantic": nlp.SEMANTIC,
+        "vectorizer": _fingerprint('tfidf_vectorizer_v2.pkl'),
+        "target_skills": target_skills,
+        "runs": {},
+    }
+    for size in sizes:
+        paths = pick(docs, size)
+        print(f"Benchmarking {len(paths)} documents...", file=sys.stderr)
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            report["runs"][str(size)] = pool.submit(run_size, paths, jd_text, target_skills).result()
+    return report
+
+def compare(baseline, current, threshold=1.2):
+    # Lists (size, stage, metric, baseline, current) for every stage whose
+    # p50/p99 latency grew, or throughput fell, by more than `threshold`x
+    regressions = []
+    for size, run in current["runs"].items():
+        base_run = baseline.get("runs", {}).get(size)
+        if not base_run:
+            continue
+        for stage, stats in run["stages"].items():
+            base = base_run["stages"].get(stage)
+            if not base:
+                continue
+            for metric in ("p50_ms", "p99_ms"):
+                if base[metric] and stats[metric] > base[metric] * threshold:
+                    regressions.append((size, stage, metric, base[metric], stats[metric]))
+            if base["docs_per_s"] and stats["docs_per_s"] and stats["docs_per_s"] * threshold < base["docs_per_s"]:
+                regressions.append((size, stage, "docs_per_s", base["docs_per_s"], stats["docs_per_s"]))
+        if base_run["peak_rss_mb"] and run["peak_rss_mb"] > base_run["peak_rss_mb"] * threshold:
+            regressions.append((size, "process", "peak_rss_mb", base_run["peak_rss_mb"], run["peak_rss_mb"]))
+    return regressions
+
+def print_report(report, baseline=None):
+    for size, run in report["runs"].items():
+        print(f"\n{run['docs']} documents ({run['failed']} unreadable), peak RSS {run['peak_rss_mb']} MB, "
+              f"models loaded in {run['model_load_seconds']}s")
+        print(f"  {'stage':<14}{'docs/s':>10}{'p50 ms':>12}{'p99 ms':>12}{'vs base p50':>14}")
+        base_run = (baseline or {}).get("runs", {}).get(size, {})
+        for stage, stats in run["stages"].items():
+            base = base_run.get("stages", {}).get(stage)
+            delta = f"{stats['p50_ms'] / base['p50_ms']:.2f}x" if base and base["p50_ms"] else "-"
+            print(f"  {stage:<14}{stats['docs_per_s'] or 0:>10}{stats['p50_ms']:>12}{stats['p99_ms']:>12}{delta:>14}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the screening pipeline.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Comma separated document counts")
+    parser.add_argument("--jd", default=None, help="Path to a JD text file (default: the demo accountant JD)")
+    parser.add_argument("--skills", default=None, help="Comma separated target skills")
+    parser.add_argument("--save", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    jd_text = DEFAULT_JD
+    if args.jd:
+        with open(args.jd, 'r', encoding='utf-8') as f:
+            jd_text = f.read()
+    target_skills = [s.strip() for s in args.skills.split(",") if s.strip()] if args.skills else DEFAULT_SKILLS
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    report = run_benchmark(sizes, jd_text, target_skills)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.save}", file=sys.stderr)
+
+    if baseline is not None:
+        regressions = compare(baseline, report, args.threshold)
+        for size, stage, metric, before, after in regressions:
+            print(f"REGRESSION [{size} docs] {stage} {metric}: {before} -> {after}")
+        if regressions:
+            return 1
+        print("\nNo regressions against the baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import argparse
+
+# Compact, memory-mappable export of the trained models, loaded by
+# nlp_engine when PROSCREEN_MODEL_FORMAT=compact.
+#
+# A directory of plain .npy arrays plus meta.json instead of three
+# pickles:
+#   vocab.npy / idf.npy          TF-IDF vocabulary (terms by column) and idf.
+#                                The vectorizer is rebuilt from these and
+#                                the stored parameters, so transform() is
+#                                sklearn's own code. The pickled
+#                                vectorizer's stop_words_ (every pruned
+#                                term) is dropped.
+#   tree_*.npy                   all trees of the forest as one flat node
+#                                table: children (leaves encoded as
+#                                -(leaf row) - 1), split feature and
+#                                threshold, plus the leaf class
+#                                probabilities.
+#   classes.npy                  label encoder classes
+#
+# Arrays are opened with mmap_mode='r', so every worker process on a host
+# shares one copy of the pages instead of unpickling its own forest.
+#
+# Predictions are identical to the pickled models: inputs are cast to
+# float32 and compared against float64 thresholds exactly like sklearn's
+# tree code, and per-tree probabilities are summed in estimator order
+# (which is what the forest does with n_jobs=1).
+
+FORMAT_VERSION = 1
+
+def _vectorizer_params(vectorizer):
+    import numpy as np
+    params = vectorizer.get_params()
+    for name in ('tokenizer', 'preprocessor', 'analyzer'):
+        if callable(params.get(name)):
+            raise TypeError(f"Cannot export a vectorizer with a custom {name}.")
+    if params.get('vocabulary') is not None:
+        params['vocabulary'] = None
+    if isinstance(params.get('stop_words'), (set, frozenset)):
+        params['stop_words'] = sorted(params['stop_words'])
+    params['dtype'] = np.dtype(params['dtype']).name
+    params['ngram_range'] = list(params['ngram_range'])
+    return params
+
+def export(directory, classifier, vectorizer, label_encoder):
+    import numpy as np
+    os.makedirs(directory, exist_ok=True)
+
+    def save(name, array):
+        tmp = os.path.join(directory, name + '.tmp.npy')
+        np.save(tmp, np.ascontiguousarray(array))
+        os.replace(tmp, os.path.join(directory, name + '.npy'))
+
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    save('vocab', np.array(terms, dtype=str))
+    save('idf', vectorizer.idf_)
+    # Object arrays cannot be memory-mapped; the dtype is restored on load
+    save('classes', np.asarray(label_encoder.classes_).astype(str))
+
+    if not hasattr(classifier, 'estimators_'):
+        raise TypeError(f"Cannot export {type(classifier).__name__}, expected a fitted random forest.")
+    left, right, feature, threshold, leaves, roots = [], [], [], [], [], []
+    offset, leaf_offset = 0, 0
+    for estimator in classifier.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        # Row of each leaf in the leaf table, in node order
+        leaf_rows = np.cumsum(is_leaf) - 1 + leaf_offset
+        left.append(np.where(is_leaf, -leaf_rows - 1, tree.children_left + offset))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset))
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        # DecisionTreeClassifier.predict_proba: leaf values over their sum
+        value = tree.value[is_leaf, 0, :classifier.n_classes_]
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        leaves.append(value / normalizer)
+        roots.append(offset)
+        offset += tree.node_count
+        leaf_offset += int(is_leaf.sum())
+    save('tree_left', np.concatenate(left).astype(np.int32))
+    save('tree_right', np.concatenate(right).astype(np.int32))
+    save('tree_feature', np.concatenate(feature).astype(np.int32))
+    save('tree_threshold', np.concatenate(threshold).astype(np.float64))
+    save('tree_leaf_proba', np.concatenate(leaves).astype(np.float64))
+    save('tree_roots', np.array(roots, dtype=np.int32))
+    save('classifier_classes', classifier.classes_)
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "classifier": "random_forest",
+        "n_features": int(len(terms)),
+        "n_classes": int(classifier.n_classes_),
+        "classes_dtype": np.asarray(label_encoder.classes_).dtype.str,
+        "vectorizer_params": _vectorizer_params(vectorizer),
+    }
+    tmp = os.path.join(directory, 'meta.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp, os.path.join(directory, 'meta.json'))
+
+class CompactForest:
+    # The subset of RandomForestClassifier used by nlp_engine: classes_,
+    # predict_proba and predict
+
+    def __init__(self, arrays, n_features, chunk_size=256):
+        self.left = arrays['tree_left']
+        self.right = arrays['tree_right']
+        self.feature = arrays['tree_feature']
+        self.threshold = arrays['tree_threshold']
+        self.leaf_proba = arrays['tree_leaf_proba']
+        self.roots = arrays['tree_roots']
+        self.classes_ = arrays['classifier_classes']
+        self.n_classes_ = self.leaf_proba.shape[1]
+        self.n_features_in_ = n_features
+        self.chunk_size = chunk_size
+
+    def predict_proba(self, X):
+        import numpy as np
+        import scipy.sparse as sp
+        X = X.tocsr() if sp.issparse(X) else sp.csr_matrix(X)
+        out = np.empty((X.shape[0], self.n_classes_))
+        for start in range(0, X.shape[0], self.chunk_size):
+            # Dense float32 block, the dtype sklearn's trees compare in
+            block = X[start:start + self.chunk_size].toarray().astype(np.float32)
+            out[start:start + block.shape[0]] = self._proba_block(block)
+        return out
+
+    def _proba_block(self, block):
+        # Walks every (document, tree) pair down its tree at once
+        import numpy as np
+        n, n_trees = block.shape[0], len(self.roots)
+        rows = np.repeat(np.arange(n), n_trees)
+        nodes = np.tile(np.asarray(self.roots, dtype=np.int64), n)
+        active = np.arange(n * n_trees)
+        left, right, feature, threshold = self.left, self.right, self.feature, self.threshold
+        while active.size:
+            idx = nodes[active]
+            children = left[idx]
+            internal = children >= 0
+            active, idx, children = active[internal], idx[internal], children[internal]
+            go_left = block[rows[active], feature[idx]] <= threshold[idx]
+            nodes[active] = np.where(go_left, children, right[idx])
+        per_tree = self.leaf_proba[-left[nodes] - 1].reshape(n, n_trees, self.n_classes_)
+        proba = np.zeros((n, self.n_classes_))
+        for t in range(n_trees):
+            proba += per_tree[:, t]
+        proba /= n_trees
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+class CompactModel:
+    def __init__(self, classifier, vectorizer, label_encoder):
+        self.classifier = classifier
+        self.vectorizer = vectorizer
+        self.label_encoder = label_encoder
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        import numpy as np
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.preprocessing import LabelEncoder
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta["format_version"] != FORMAT_VERSION:
+            raise RuntimeError(f"Unsupported compact model version {meta['format_version']}, re-export it.")
+        mode = 'r' if mmap else None
+        arrays = {name[:-4]: np.load(os.path.join(directory, name), mmap_mode=mode)
+                  for name in os.listdir(directory) if name.endswith('.npy')}
+
+        params = dict(meta["vectorizer_params"])
+        params['dtype'] = np.dtype(params['dtype']).type
+        params['ngram_range'] = tuple(params['ngram_range'])
+        vectorizer = TfidfVectorizer(**params)
+        vectorizer.vocabulary_ = {term: i for i, term in enumerate(arrays['vocab'].tolist())}
+        vectorizer.idf_ = np.asarray(arrays['idf'])
+
+        label_encoder = LabelEncoder()
+        label_encoder.classes_ = np.asarray(arrays['classes']).astype(np.dtype(meta["classes_dtype"]))
+        return cls(CompactForest(arrays, meta["n_features"]), vectorizer, label_encoder)
+
+def main(argv=None):
+    import joblib
+    import nlp_engine as nlp
+    parser = argparse.ArgumentParser(description="Convert the pickled models into the compact format.")
+    parser.add_argument("--models-dir", default=nlp.MODELS_DIR)
+    parser.add_argument("--output", default=None, help="Default: <models-dir>/compact")
+    args = parser.parse_args(argv)
+
+    load = lambda name: joblib.load(os.path.join(args.models_dir, name))
+    output = args.output or os.path.join(args.models_dir, 'compact')
+    export(output, load('resume_classifier_v2.pkl'), load('tfidf_vectorizer_v2.pkl'), load('label_encoder_v2.pkl'))
+    print(f"Compact model written to {output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
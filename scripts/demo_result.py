@@ -27,27 +27,26 @@ def run_demo():
     jd_matcher = nlp.get_skills_matcher(target_skills)
     
     print("Processing resumes...")
+    names, contents = [], []
     for filename in resumes:
         filepath = os.path.join(data_dir, filename)
         with open(filepath, 'rb') as f:
             content = nlp.extract_text_universal(f, filename)
             
             if not content: continue
-            
-            role, conf = nlp.get_ml_prediction(content)
-            found_skills = nlp.extract_skills(content, jd_matcher)
-            score, semantic, skill_pct = nlp.calculate_match_score(jd_txt, content, target_skills, found_skills)
-            gaps = nlp.identify_gap(target_skills, found_skills)
-            
-            results.append({
-                "Candidate": filename,
-                "Match%": score,
-                "Role": role,
-                "Conf%": conf,
-                "Sim%": semantic,
-                "Skills": ", ".join(found_skills),
-                "Missing": ", ".join(gaps)
-            })
+            names.append(filename)
+            contents.append(content)
+
+    for filename, res in zip(names, nlp.screen_batch(jd_txt, target_skills, contents, jd_matcher)):
+        results.append({
+            "Candidate": filename,
+            "Match%": res["Rank Score"],
+            "Role": res["Predicted Role"],
+            "Conf%": res["ML Conf %"],
+            "Sim%": res["Semantic Sim %"],
+            "Skills": ", ".join(res["Skills"]),
+            "Missing": ", ".join(res["Gaps"])
+        })
 
     # 4. Display Results Table
     df = pd.DataFrame(results).sort_values("Match%", ascending=False)
@@ -0,0 +1,193 @@
+import os
+import json
+import hashlib
+import threading
+from io import BytesIO
+import nlp_engine as nlp
+
+DEFAULT_CACHE_DIR = os.path.join(nlp.BASE_DIR, '.cache', 'extraction')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+class ExtractionCache:
+    # On-disk cache of extracted documents keyed by the hash of the uploaded
+    # bytes. Each entry is a <key>.json file (raw text and, optionally, the
+    # cleaned text) plus an optional <key>.npz holding the TF-IDF row.
+    # Hits refresh the file mtime, so evicting the oldest mtimes first gives
+    # LRU behaviour once the directory grows past max_bytes. One instance may
+    # be shared by several threads (the app serves every session from one),
+    # so writes, size bookkeeping and eviction happen under a lock.
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = sum(e.stat().st_size for e in os.scandir(cache_dir) if e.is_file())
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(data, filename):
+        # The extension decides which parser runs and the extraction budget
+        # decides how much text comes out, so both are part of the key
+        ext = os.path.splitext(filename)[1].lower()
+        budget = f"p{nlp.MAX_PDF_PAGES}c{nlp.MAX_TEXT_CHARS}"
+        return hashlib.sha256(data).hexdigest() + ext.replace('.', '_') + budget
+
+    def _path(self, key, suffix):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _write(self, path, write_fn):
+        tmp = path + '.tmp'
+        write_fn(tmp)
+        try:
+            self._size -= os.path.getsize(path)
+        except OSError:
+            pass
+        os.replace(tmp, path)
+        self._size += os.path.getsize(path)
+        self._evict()
+
+    def get(self, key):
+        path = self._path(key, '.json')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._touch(path)
+        return entry
+
+    def _write_entry(self, key, entry):
+        def write_fn(tmp):
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+        self._write(self._path(key, '.json'), write_fn)
+
+    def put(self, key, text, cleaned=None, row_tag=None):
+        # Pass the entry's row_tag along when only filling in `cleaned`, or
+        # its stored TF-IDF row is treated as stale
+        entry = {"text": text, "cleaned": cleaned}
+        if row_tag is not None:
+            entry["row_tag"] = row_tag
+        with self._lock:
+            self._write_entry(key, entry)
+
+    def get_row(self, key, tag):
+        # `tag` identifies the vectorizer; rows built by another one are stale
+        import scipy.sparse as sp
+        path = self._path(key, '.npz')
+        entry = self.get(key)
+        if entry is None or entry.get("row_tag") != tag or not os.path.exists(path):
+            return None
+        try:
+            row = sp.load_npz(path)
+        except (OSError, ValueError):
+            return None
+        self._touch(path)
+        return row
+
+    def put_row(self, key, row, tag):
+        import scipy.sparse as sp
+        def write_row(tmp):
+            # save_npz appends ".npz" to bare paths, so hand it a file object
+            with open(tmp, 'wb') as f:
+                sp.save_npz(f, row.tocsr(), compressed=False)
+        with self._lock:
+            entry = self.get(key)
+            if entry is None:
+                return
+            self._write(self._path(key, '.npz'), write_row)
+            entry["row_tag"] = tag
+            self._write_entry(key, entry)
+
+    def _evict(self):
+        if self._size <= self.max_bytes:
+            return
+        entries = {}
+        for e in os.scandir(self.cache_dir):
+            if not e.is_file() or e.name.endswith('.tmp'):
+                continue
+            key = os.path.splitext(e.name)[0]
+            st = e.stat()
+            mtime, size = entries.get(key, (0, 0))
+            entries[key] = (max(mtime, st.st_mtime), size + st.st_size)
+        self._size = sum(size for _, size in entries.values())
+        for key, (_, size) in sorted(entries.items(), key=lambda kv: kv[1][0]):
+            if self._size <= self.max_bytes:
+                break
+            for suffix in ('.json', '.npz'):
+                try:
+                    os.remove(self._path(key, suffix))
+                except OSError:
+                    pass
+            self._size -= size
+
+    def clear(self):
+        with self._lock:
+            for e in os.scandir(self.cache_dir):
+                if e.is_file():
+                    os.remove(e.path)
+            self._size = 0
+
+def _fill_entry(cache, key, entry, clean, vectorize):
+    if clean and entry.get("cleaned") is None:
+        entry["cleaned"] = nlp.clean_text(entry["text"])
+        cache.put(key, entry["text"], entry["cleaned"], entry.get("row_tag"))
+
+    row = None
+    if vectorize and entry["text"]:
+        tag = nlp.vectorizer_fingerprint()
+        row = cache.get_row(key, tag)
+        if row is None:
+            cleaned = entry["cleaned"] if entry.get("cleaned") is not None else nlp.clean_text(entry["text"])
+            row = nlp.get_vectorizer().transform([cleaned])
+            cache.put_row(key, row, tag)
+    return entry["text"], entry.get("cleaned"), row
+
+def extract_cached(cache, data, filename, clean=True, vectorize=True):
+    # Returns (text, cleaned, row). A repeat upload of the same bytes skips
+    # PDF parsing, and if the row is cached, TF-IDF vectorization as well.
+    # Failed extractions are not cached, so a transient error is retried
+    key = cache.key_for(data, filename)
+    entry = cache.get(key)
+    if entry is None:
+        try:
+            text = nlp._extract_text(BytesIO(data), filename)
+        except Exception as e:
+            print(f"Error reading {filename}: {e}")
+            return "", None, None
+        entry = {"text": text, "cleaned": None}
+        cache.put(key, text)
+    return _fill_entry(cache, key, entry, clean, vectorize)
+
+def extract_many_cached(cache, items, workers=None, clean=True, vectorize=True, indexed=False):
+    # Parallel counterpart of extract_cached for (bytes, filename) pairs.
+    # Cache hits are yielded straight away, misses go through
+    # nlp.extract_many. Yields (filename, text, cleaned, row, error) in
+    # completion order, prefixed with the item's position when `indexed`.
+    # Misses are matched back to their cache key by position, since two
+    # uploads can share a filename.
+    misses, keys = [], []
+    for i, (data, filename) in enumerate(items):
+        key = cache.key_for(data, filename)
+        entry = cache.get(key)
+        if entry is None:
+            misses.append((data, filename))
+            keys.append((i, key))
+        else:
+            result = (filename, *_fill_entry(cache, key, entry, clean, vectorize), None)
+            yield (i, *result) if indexed else result
+
+    for miss, filename, text, error in nlp.extract_many(misses, workers, indexed=True):
+        i, key = keys[miss]
+        if error:
+            result = (filename, "", None, None, error)
+        else:
+            cache.put(key, text)
+            result = (filename, *_fill_entry(cache, key, {"text": text, "cleaned": None}, clean, vectorize), None)
+        yield (i, *result) if indexed else result
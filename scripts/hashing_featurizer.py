@@ -0,0 +1,26 @@
+# Stateless featurizer shared by the out-of-core trainer
+# (python -m scripts.train_v2 --streaming) and nlp_engine's
+# PROSCREEN_FEATURIZER=hashing inference path.
+#
+# Hashed word (1,2)-gram counts with sublinear tf and l2 normalization: the
+# TF-IDF vectorizer without the idf and the vocabulary. Nothing is fitted,
+# so any chunk of any corpus maps to the same columns and no vocabulary has
+# to be held in memory.
+
+DEFAULT_PARAMS = dict(n_features=2 ** 18, ngram_range=(1, 2), stop_words='english')
+
+class HashingFeaturizer:
+    def __init__(self, **params):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self.params = dict(DEFAULT_PARAMS, **params)
+        self.params['ngram_range'] = tuple(self.params['ngram_range'])
+        self.vectorizer = HashingVectorizer(alternate_sign=False, norm=None, **self.params)
+
+    def transform(self, texts):
+        import numpy as np
+        from sklearn.preprocessing import normalize
+        X = self.vectorizer.transform(texts)
+        # Same sublinear tf (1 + log count) as the TF-IDF vectorizer
+        np.log(X.data, out=X.data)
+        X.data += 1.0
+        return normalize(X, copy=False)
@@ -0,0 +1,100 @@
+import zlib
+
+# Near-duplicate detection for resume pools (re-submissions, template
+# resumes), run on clean_text output before anything is scored.
+#
+# Every document becomes a MinHash signature over its word 5-shingles: the
+# fraction of equal signature entries estimates the Jaccard similarity of
+# the shingle sets. Signatures are split into LSH bands and documents
+# sharing any band bucket become candidates; a candidate counts as a
+# duplicate when the estimated Jaccard reaches `threshold`. With 16 bands of
+# 8 rows a pair at Jaccard 0.8 is found with ~95% probability, one at 0.5
+# only ~4% of the time, and each document is compared only with the few
+# representatives in its buckets, so the whole pass is roughly linear.
+#
+# Clusters are formed greedily in input order: the first document of a
+# cluster is its representative and later ones point at it.
+
+NUM_PERM = 128
+BANDS = 16
+SHINGLE = 5
+
+def _permutations(num_perm, seed):
+    # Multiply-shift hash family: h(x) = (a*x + b) mod 2^64 >> 32, a odd
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    return a, b
+
+def shingle_hashes(cleaned, k=SHINGLE):
+    # 32-bit hashes of the word k-grams (the whole text when shorter)
+    import numpy as np
+    tokens = cleaned.split()
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    h = np.array([zlib.crc32(t.encode('utf-8')) for t in tokens], dtype=np.uint64)
+    k = min(k, len(h))
+    # Polynomial combination of k consecutive token hashes (wraps mod 2^64)
+    combined = np.zeros(len(h) - k + 1, dtype=np.uint64)
+    for j in range(k):
+        combined = combined * np.uint64(1000003) + h[j:len(h) - k + 1 + j]
+    return np.unique((combined ^ (combined >> np.uint64(32))) & np.uint64(0xFFFFFFFF))
+
+class NearDuplicateIndex:
+    # Streaming clusterer: add() each document once; only representatives
+    # are kept (one signature and BANDS bucket entries each)
+
+    def __init__(self, threshold=0.8, num_perm=NUM_PERM, bands=BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.a, self.b = _permutations(num_perm, seed)
+        self.signatures = {}
+        self.buckets = {}
+
+    def signature(self, cleaned, block=4096):
+        # Per permutation, the minimum hash over the shingles
+        import numpy as np
+        shingles = shingle_hashes(cleaned)
+        if not len(shingles):
+            return None
+        sig = np.full(len(self.a), 0xFFFFFFFF, dtype=np.uint32)
+        for start in range(0, len(shingles), block):
+            x = shingles[start:start + block, None]
+            hashed = ((x * self.a + self.b) >> np.uint64(32)).astype(np.uint32)
+            np.minimum(sig, hashed.min(axis=0), out=sig)
+        return sig
+
+    def _band_keys(self, sig):
+        return [(band, sig[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def add(self, key, cleaned):
+        # Returns the representative `key` this document duplicates, or None
+        # when it starts a cluster of its own (empty texts always do and are
+        # not indexed)
+        sig = self.signature(cleaned)
+        if sig is None:
+            return None
+        band_keys = self._band_keys(sig)
+        candidates = []
+        for band_key in band_keys:
+            candidates.extend(self.buckets.get(band_key, ()))
+        best, best_score = None, self.threshold
+        for candidate in dict.fromkeys(candidates):
+            score = float((self.signatures[candidate] == sig).mean())
+            if score >= best_score:
+                best, best_score = candidate, score
+        if best is not None:
+            return best
+        self.signatures[key] = sig
+        for band_key in band_keys:
+            self.buckets.setdefault(band_key, []).append(key)
+        return None
+
+def find_duplicates(cleaned_texts, threshold=0.8):
+    # For each text: the position of the earlier text it duplicates, or None
+    index = NearDuplicateIndex(threshold)
+    return [index.add(i, text) for i, text in enumerate(cleaned_texts)]
@@ -1,5 +1,42 @@
 from fpdf import FPDF
+import os
+import io
+import csv
 import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Reports for a screening run, in three formats:
+#   pdf       the best DETAIL_TOP_K candidates in detail (ranking table and
+#             skill analysis), everyone else as one summary page. The cost
+#             of the PDF no longer grows with the size of the pool.
+#   csv       every candidate, ranked; milliseconds for thousands of rows
+#   parquet   the same, with Skills / Gaps / Top Roles as list columns
+#             (needs pyarrow)
+#
+# write_report() renders one synchronously; submit_report() renders it on a
+# background thread and returns a Future, so neither the Streamlit script
+# nor the service's event loop waits for fpdf.
+
+DETAIL_TOP_K = int(os.environ.get('PROSCREEN_REPORT_TOP_K', 50))
+REPORT_WORKERS = int(os.environ.get('PROSCREEN_REPORT_WORKERS', 2))
+EXPORT_FIELDS = ["Rank", "Candidate", "Rank Score", "Predicted Role", "ML Conf %", "Top Roles",
+                 "Semantic Sim %", "Skill Match %", "Skills", "Gaps", "Duplicate Of"]
+# (lower bound, label) of the score bands in the PDF summary
+SCORE_BANDS = [(75, "75-100%"), (50, "50-75%"), (25, "25-50%"), (0, "0-25%")]
+MEDIA_TYPES = {"pdf": "application/pdf", "csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+_executor = None
+
+def _latin1(text):
+    # The core PDF fonts only cover latin-1
+    return str(text).encode('latin-1', 'replace').decode('latin-1')
+
+def _score(res):
+    return res.get('Rank Score', 0)
+
+def ranked(results):
+    return sorted((r for r in results if 'Rank Score' in r), key=_score, reverse=True)
 
 class ScreeningReport(FPDF):
     def header(self):
@@ -8,7 +45,7 @@ class ScreeningReport(FPDF):
         self.cell(0, 10, 'ProScreen AI - Advanced Screening Report', 0, 1, 'C')
         self.set_font('Arial', '', 10)
         self.set_text_color(100, 116, 139) # Gray
-        self.cell(0, 5, f'Generated on: {datetime.datetime.now().strftime("%Y-%m-d %H:%M")}', 0, 1, 'C')
+        self.cell(0, 5, f'Generated on: {datetime.datetime.now().strftime("%Y-%m-%d %H:%M")}', 0, 1, 'C')
         self.ln(10)
 
     def footer(self):
@@ -25,60 +62,155 @@ class ScreeningReport(FPDF):
         self.line(10, self.get_y(), 200, self.get_y())
         self.ln(5)
 
-def generate_pdf_report(jd_text, target_skills, results):
+def _pool_summary(pdf, rest):
+    # One block for everyone outside the top k, whatever their number
+    pdf.set_font('Arial', '', 10)
+    pdf.set_text_color(51, 65, 85)
+    scores = [_score(r) for r in rest]
+    pdf.cell(0, 7, f"{len(rest)} more candidates, mean fit {sum(scores) / len(scores):.1f}%, "
+                   f"best {max(scores)}%. Full ranking in the CSV / Parquet export.", 0, 1)
+    pdf.ln(2)
+    bands = Counter()
+    for score in scores:
+        bands[next(label for bound, label in SCORE_BANDS if score >= bound)] += 1
+    pdf.set_font('Arial', 'B', 10)
+    pdf.set_fill_color(241, 245, 249)
+    pdf.cell(60, 8, 'Fit Score Band', 1, 0, 'C', True)
+    pdf.cell(40, 8, 'Candidates', 1, 1, 'C', True)
+    pdf.set_font('Arial', '', 10)
+    for _, label in SCORE_BANDS:
+        pdf.cell(60, 8, label, 1, 0, 'C')
+        pdf.cell(40, 8, str(bands[label]), 1, 1, 'C')
+    pdf.ln(4)
+    pdf.set_font('Arial', 'B', 10)
+    pdf.cell(60, 8, 'Predicted Role', 1, 0, 'C', True)
+    pdf.cell(40, 8, 'Candidates', 1, 1, 'C', True)
+    pdf.set_font('Arial', '', 10)
+    for role, n in Counter(str(r['Predicted Role']) for r in rest).most_common(10):
+        pdf.cell(60, 8, _latin1(role)[:30], 1, 0, 'C')
+        pdf.cell(40, 8, str(n), 1, 1, 'C')
+
+def generate_pdf_report(jd_text, target_skills, results, top_k=DETAIL_TOP_K, path=None):
+    # Returns the PDF bytes, or writes it to `path` and returns the path
+    # Near-duplicates repeat their representative's scores; the exports keep
+    # them, the PDF ranks each resume once. One sort, so ties at the cut
+    # cannot land in both the detailed top and the rest of the pool.
+    scored = [r for r in ranked(results) if r.get('Duplicate Of') is None]
+    top, rest = scored[:top_k], scored[top_k:]
     pdf = ScreeningReport()
     pdf.add_page()
-    
+
     # 1. Job Description Summary
     pdf.add_section_header("Job Requirement Overview")
     pdf.set_font('Arial', 'B', 10)
     pdf.set_text_color(51, 65, 85)
     pdf.cell(40, 7, "Extracted Target Skills:", 0, 1)
     pdf.set_font('Arial', '', 10)
-    pdf.multi_cell(0, 6, ", ".join(target_skills) if target_skills else "General screening", 0, 'L')
+    pdf.multi_cell(0, 6, _latin1(", ".join(target_skills)) if target_skills else "General screening", 0, 'L')
     pdf.ln(5)
 
     # 2. Results Table
-    pdf.add_section_header("Candidate Rankings")
+    title = "Candidate Rankings" if len(top) == len(scored) else f"Top {len(top)} of {len(scored)} Candidates"
+    pdf.add_section_header(title)
     pdf.set_font('Arial', 'B', 10)
     pdf.set_fill_color(241, 245, 249)
     pdf.cell(80, 10, 'Candidate Name', 1, 0, 'C', True)
     pdf.cell(50, 10, 'Predicted Role', 1, 0, 'C', True)
     pdf.cell(30, 10, 'Fit Score', 1, 0, 'C', True)
     pdf.cell(30, 10, 'Confidence', 1, 1, 'C', True)
-    
+
     pdf.set_font('Arial', '', 10)
-    for res in sorted(results, key=lambda x: x['Rank Score'], reverse=True):
-        pdf.cell(80, 10, str(res['Candidate'])[:40], 1, 0, 'L')
-        pdf.cell(50, 10, str(res['Predicted Role']), 1, 0, 'C')
+    for res in top:
+        pdf.cell(80, 10, _latin1(res['Candidate'])[:40], 1, 0, 'L')
+        pdf.cell(50, 10, _latin1(res['Predicted Role']), 1, 0, 'C')
         pdf.cell(30, 10, f"{res['Rank Score']}%", 1, 0, 'C')
         pdf.cell(30, 10, f"{res['ML Conf %']}%", 1, 1, 'C')
-    
+
+    if rest:
+        pdf.ln(5)
+        pdf.add_section_header("Rest of the Pool")
+        _pool_summary(pdf, rest)
+
     pdf.add_page()
     # 3. Detailed Gaps
     pdf.add_section_header("In-Depth Skill Analysis")
-    for res in results:
+    for res in top:
         pdf.set_font('Arial', 'B', 11)
         pdf.set_text_color(30, 58, 138)
-        pdf.cell(0, 10, f"Candidate: {res['Candidate']}", 0, 1)
-        
+        pdf.cell(0, 10, _latin1(f"Candidate: {res['Candidate']}"), 0, 1)
+
         pdf.set_font('Arial', 'B', 9)
         pdf.set_text_color(22, 101, 52) # Dark green
         pdf.cell(35, 6, "Skills Found:", 0, 0)
         pdf.set_font('Arial', '', 9)
-        pdf.multi_cell(155, 6, ", ".join(res['Skills']) if res['Skills'] else "None detected", 0, 'L')
-        
+        pdf.multi_cell(155, 6, _latin1(", ".join(res['Skills'])) if res['Skills'] else "None detected", 0, 'L')
+
         pdf.set_font('Arial', 'B', 9)
         pdf.set_text_color(153, 27, 27) # Dark red
         pdf.cell(35, 6, "Skill Gaps:", 0, 0)
         pdf.set_font('Arial', '', 9)
-        pdf.multi_cell(155, 6, ", ".join(res['Gaps']) if res['Gaps'] else "No critical gaps identified", 0, 'L')
-        
+        pdf.multi_cell(155, 6, _latin1(", ".join(res['Gaps'])) if res['Gaps'] else "No critical gaps identified", 0, 'L')
+
         pdf.ln(5)
         pdf.set_draw_color(241, 245, 249)
         pdf.line(15, pdf.get_y(), 195, pdf.get_y())
         pdf.ln(5)
-        
+
         if pdf.get_y() > 250: pdf.add_page()
 
-    return pdf.output()
+    if path:
+        pdf.output(path)
+        return path
+    # str with PyFPDF 1.7, bytearray with fpdf2
+    data = pdf.output(dest='S')
+    return data.encode('latin-1') if isinstance(data, str) else bytes(data)
+
+def _export_row(rank, res):
+    return {
+        "Rank": rank,
+        **{field: res.get(field) for field in EXPORT_FIELDS[1:]},
+        "Top Roles": [f"{r} ({p}%)" for r, p in res.get('Top Roles', [])],
+    }
+
+def export_csv(results, path=None):
+    # Returns the CSV bytes, or writes it to `path` and returns the path
+    f = open(path, 'w', encoding='utf-8', newline='') if path else io.StringIO()
+    try:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for rank, res in enumerate(ranked(results), 1):
+            row = _export_row(rank, res)
+            for field in ("Top Roles", "Skills", "Gaps"):
+                row[field] = ", ".join(row[field] or [])
+            writer.writerow(row)
+        return path or f.getvalue().encode('utf-8')
+    finally:
+        f.close()
+
+def export_parquet(results, path=None):
+    import pandas as pd
+    rows = [_export_row(rank, res) for rank, res in enumerate(ranked(results), 1)]
+    df = pd.DataFrame(rows, columns=EXPORT_FIELDS)
+    if path:
+        df.to_parquet(path, index=False)
+        return path
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+def write_report(fmt, jd_text, target_skills, results, path=None, top_k=DETAIL_TOP_K):
+    if fmt == "pdf":
+        return generate_pdf_report(jd_text, target_skills, results, top_k, path)
+    if fmt == "csv":
+        return export_csv(results, path)
+    if fmt == "parquet":
+        return export_parquet(results, path)
+    raise ValueError(f"Unknown report format {fmt!r}, expected one of {sorted(MEDIA_TYPES)}")
+
+def submit_report(fmt, jd_text, target_skills, results, path=None, top_k=DETAIL_TOP_K):
+    # Off-thread write_report(); `results` is copied so the caller may keep
+    # appending to its list
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+    return _executor.submit(write_report, fmt, jd_text, target_skills, list(results), path, top_k)
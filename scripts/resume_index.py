@@ -0,0 +1,363 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+import nlp_engine as nlp
+
+# Persistent index of a candidate pool. Everything that does not depend on
+# the JD is computed once per document (keyed by the SHA-256 of its bytes):
+# the TF-IDF row, the classifier output and the skills found from the full
+# skill bank. Ranking a new JD is then one sparse mat-vec plus a top-k
+# selection.
+#
+# Layout of an index directory:
+#   meta.json                      ids, names, roles, confidences, skills
+#   data.npy / indices.npy / indptr.npy
+#                                  the CSR TF-IDF matrix. Stored as separate
+#                                  .npy files rather than one .npz because
+#                                  .npz members cannot be memory-mapped.
+#   embeddings.npy, ann/           with PROSCREEN_SEMANTIC=lsa: the LSA
+#                                  embedding of every row and an IVF index
+#                                  over them (scripts/ann_index.py), so
+#                                  nearest() and rank(shortlist=N) only scan
+#                                  a few lists instead of the whole pool.
+#                                  Computed from the stored TF-IDF rows at
+#                                  save(), so switching an existing index to
+#                                  LSA needs no re-extraction.
+#   skill_bits.npy                 every candidate's skills as a packed bit
+#                                  row (scripts/skill_bits.py); the skill
+#                                  names are meta.json's skill_vocab. Lets
+#                                  rank() score skills for the whole pool
+#                                  with bitwise operations.
+#
+# Rows are built by one vectorizer (meta.json's fingerprint); an index built
+# by another one cannot be queried or extended, `build` starts it over. A
+# file indexed again under the same name with new bytes replaces its row.
+
+class ResumeIndex:
+    def __init__(self, path):
+        self.path = path
+        self.ids, self.names, self.roles, self.confidences, self.skills = [], [], [], [], []
+        self.vectorizer_tag = None
+        self.matrix = None
+        self.lsa_tag = None
+        self.embeddings = None
+        self.ann = None
+        self.skill_bits = None
+        if os.path.exists(os.path.join(path, 'meta.json')):
+            self._load()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def is_stale(self):
+        # Built with a vectorizer other than the current one
+        return self.vectorizer_tag not in (None, nlp.vectorizer_fingerprint())
+
+    def _check_vectorizer(self):
+        if self.is_stale():
+            raise RuntimeError("Index was built with a different vectorizer, rebuild it.")
+
+    def reset(self):
+        # Empties the index; files are overwritten by the next save()
+        self.ids, self.names, self.roles, self.confidences, self.skills = [], [], [], [], []
+        self.vectorizer_tag = self.matrix = self.lsa_tag = self.embeddings = self.ann = self.skill_bits = None
+
+    def _drop_rows(self, drop):
+        # Removes the given row positions. The LSA embeddings and ANN index
+        # are recomputed at the next save().
+        import numpy as np
+        from scripts.skill_bits import SkillMatrix
+        keep = [i for i in range(len(self.ids)) if i not in drop]
+        for field in ('ids', 'names', 'roles', 'confidences', 'skills'):
+            values = getattr(self, field)
+            setattr(self, field, [values[i] for i in keep])
+        self.matrix = self.matrix[keep]
+        if self.skill_bits is not None and len(self.skill_bits) == len(keep) + len(drop):
+            self.skill_bits = SkillMatrix(self.skill_bits.vocabulary, np.asarray(self.skill_bits.bits)[keep])
+        self.embeddings = self.ann = None
+
+    def _load(self):
+        import numpy as np
+        import scipy.sparse as sp
+        with open(os.path.join(self.path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.ids, self.names = meta["ids"], meta["names"]
+        self.roles, self.confidences, self.skills = meta["roles"], meta["confidences"], meta["skills"]
+        self.vectorizer_tag = meta["vectorizer"]
+        arrays = [np.load(os.path.join(self.path, name + '.npy'), mmap_mode='r')
+                  for name in ('data', 'indices', 'indptr')]
+        self.matrix = sp.csr_matrix(tuple(arrays), shape=(len(self.ids), meta["n_features"]), copy=False)
+        self.lsa_tag = meta.get("lsa")
+        if self.lsa_tag is not None:
+            from scripts.ann_index import IVFIndex
+            self.embeddings = np.load(os.path.join(self.path, 'embeddings.npy'), mmap_mode='r')
+            self.ann = IVFIndex.load(os.path.join(self.path, 'ann'))
+        self.skill_bits = None
+        if meta.get("skill_vocab") is not None:
+            from scripts.skill_bits import SkillMatrix, SkillVocabulary
+            self.skill_bits = SkillMatrix(SkillVocabulary(meta["skill_vocab"]),
+                                          np.load(os.path.join(self.path, 'skill_bits.npy'), mmap_mode='r'))
+
+    def save(self):
+        import numpy as np
+        os.makedirs(self.path, exist_ok=True)
+        matrix = self.matrix.tocsr()
+        for name in ('data', 'indices', 'indptr'):
+            tmp = os.path.join(self.path, name + '.tmp.npy')
+            np.save(tmp, np.asarray(getattr(matrix, name)))
+            os.replace(tmp, os.path.join(self.path, name + '.npy'))
+        if nlp.SEMANTIC == 'lsa' or self.lsa_tag is not None:
+            self._update_embeddings(matrix)
+        skill_bits = self._skill_matrix()
+        tmp = os.path.join(self.path, 'skill_bits.tmp.npy')
+        np.save(tmp, np.asarray(skill_bits.bits))
+        os.replace(tmp, os.path.join(self.path, 'skill_bits.npy'))
+        meta = {
+            "ids": self.ids, "names": self.names, "roles": self.roles,
+            "confidences": self.confidences, "skills": self.skills,
+            "vectorizer": self.vectorizer_tag, "n_features": matrix.shape[1],
+            "lsa": self.lsa_tag, "skill_vocab": skill_bits.vocabulary.names
+        }
+        tmp = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, 'meta.json'))
+        # Re-open so the matrix is memory-mapped again
+        self._load()
+
+    def _update_embeddings(self, matrix, block=4096):
+        # Embeds the rows added since the last save and files them into the
+        # ANN index. Everything is rebuilt when the LSA model changed or the
+        # pool outgrew the index's list count.
+        import numpy as np
+        from scripts.ann_index import IVFIndex, default_n_lists
+        tag = nlp.artifact_fingerprint(nlp.LSA_FILE)
+        done = len(self.embeddings) if self.embeddings is not None and self.lsa_tag == tag else 0
+        new = [nlp.embed(matrix[start:start + block]) for start in range(done, matrix.shape[0], block)]
+        if not new:
+            return
+        new = np.concatenate(new)
+        embeddings = np.concatenate([self.embeddings, new]) if done else new
+        if done and self.ann is not None and default_n_lists(len(embeddings)) < 2 * self.ann.n_lists:
+            ann = self.ann
+            ann.add(new, np.arange(done, len(embeddings)))
+        else:
+            ann = IVFIndex.build(embeddings)
+        tmp = os.path.join(self.path, 'embeddings.tmp.npy')
+        np.save(tmp, embeddings)
+        os.replace(tmp, os.path.join(self.path, 'embeddings.npy'))
+        ann.save(os.path.join(self.path, 'ann'))
+        self.lsa_tag = tag
+
+    def _skill_matrix(self):
+        # The stored bit matrix while it covers every row, else re-encoded
+        # (indexes saved before skill_bits.npy existed, rows added since)
+        from scripts.skill_bits import SkillMatrix
+        if self.skill_bits is None or len(self.skill_bits) != len(self.skills):
+            self.skill_bits = SkillMatrix.encode(self.skills)
+        return self.skill_bits
+
+    def add_texts(self, docs):
+        # docs: iterable of (doc_id, name, text). Already indexed ids are
+        # skipped. Returns the number of documents added.
+        import scipy.sparse as sp
+        self._check_vectorizer()
+        tag = nlp.vectorizer_fingerprint()
+        known = set(self.ids)
+        new = []
+        for doc_id, name, text in docs:
+            if doc_id not in known and text:
+                known.add(doc_id)
+                new.append((doc_id, name, text))
+        if not new:
+            return 0
+        # A changed file replaces the row indexed under its name
+        renamed = {name for _, name, _ in new}
+        replaced = {i for i, name in enumerate(self.names) if name in renamed}
+        if replaced:
+            self._drop_rows(replaced)
+
+        texts = [text for _, _, text in new]
+        rows = nlp.get_vectorizer().transform([nlp.clean_text(t) for t in texts])
+        roles, confidences = nlp.predict_category_batch(rows)
+        bank_matcher = nlp.get_bank_matcher()
+        skills = nlp.extract_skills_batch(texts, bank_matcher)
+
+        self.ids += [doc_id for doc_id, _, _ in new]
+        self.names += [name for _, name, _ in new]
+        self.roles += [str(r) for r in roles]
+        self.confidences += [float(c) for c in confidences]
+        self.skills += skills
+        self.matrix = rows if self.matrix is None else sp.vstack([self.matrix, rows]).tocsr()
+        self.vectorizer_tag = tag
+        return len(new)
+
+    def add_files(self, items, workers=None):
+        # items: iterable of (bytes, filename), extracted on a process pool
+        items = list(items)
+        ids = {filename: hashlib.sha256(data).hexdigest() for data, filename in items}
+        known = set(self.ids)
+        todo = [(data, filename) for data, filename in items if ids[filename] not in known]
+        docs = [(ids[filename], filename, text) for filename, text, _ in nlp.extract_many(todo, workers)]
+        return self.add_texts(docs)
+
+    def _similarities(self, jd_text, shortlist=None, nprobe=None):
+        # (rows, semantic similarity of each) for the whole pool, or for the
+        # `shortlist` nearest rows found through the ANN index
+        import numpy as np
+        from sklearn.preprocessing import normalize
+        self._check_vectorizer()
+        jd_vec = nlp.get_vectorizer().transform([nlp.clean_text(jd_text)])
+        if nlp.SEMANTIC != 'lsa':
+            # Rows are L2-normalized TF-IDF, so the product is the cosine
+            sims = np.asarray((self.matrix @ normalize(jd_vec).T).todense()).ravel()
+            return np.arange(len(sims)), sims
+        if self.lsa_tag != nlp.artifact_fingerprint(nlp.LSA_FILE) or len(self.embeddings) != len(self.ids):
+            raise RuntimeError("Index has no up-to-date LSA embeddings, run build again to refresh it.")
+        query = nlp.embed(jd_vec)[0]
+        if shortlist:
+            sims, rows = self.ann.search(query, shortlist, nprobe)
+        else:
+            sims, rows = np.asarray(self.embeddings) @ query, np.arange(len(self.ids))
+        return rows, np.clip(sims, 0.0, 1.0).astype(np.float64)
+
+    def nearest(self, jd_text, k=200, nprobe=None):
+        # The k resumes semantically closest to the JD, closest first. With
+        # LSA embeddings this goes through the ANN index (nprobe trades
+        # recall for speed), otherwise it scans the TF-IDF matrix.
+        from scripts.ann_index import top_k
+        if not self.ids:
+            return []
+        rows, sims = self._similarities(jd_text, k if nlp.SEMANTIC == 'lsa' else None, nprobe)
+        best = top_k(sims, k)
+        return [{"Candidate": self.names[rows[i]], "Semantic Sim %": round(float(sims[i]) * 100, 2),
+                 "Predicted Role": self.roles[rows[i]], "ML Conf %": self.confidences[rows[i]]} for i in best]
+
+    def rank(self, jd_text, target_skills, top_k=10, shortlist=None, nprobe=None):
+        # Scores the pool against a JD with the calculate_match_score
+        # formula: all of it, or with LSA embeddings and `shortlist`, only
+        # the `shortlist` semantically nearest resumes from the ANN index.
+        # Resume skills come from the skills indexed with the full skill
+        # bank, restricted to the targets (what a matcher built from the
+        # targets would have found), so targets outside the bank never
+        # match.
+        import numpy as np
+        if not self.ids:
+            return []
+        rows, sims = self._similarities(jd_text, shortlist if nlp.SEMANTIC == 'lsa' else None, nprobe)
+
+        # skill_match_ratio of every scored row from the packed skill bits
+        from scripts.skill_bits import SkillMatrix
+        skill_bits = self._skill_matrix()
+        skill_scores = SkillMatrix(skill_bits.vocabulary, skill_bits.bits[rows]).match_ratio(target_skills)
+
+        totals = sims * 50 + skill_scores * 50
+        k = min(top_k or len(totals), len(totals))
+        if not k:
+            return []
+        top = np.argpartition(-totals, k - 1)[:k]
+        top = top[np.argsort(-totals[top], kind='stable')]
+
+        wanted = {s.lower() for s in target_skills}
+        results = []
+        for i in top:
+            score, semantic_sim, skill_pct = nlp.combine_scores(sims[i], skill_scores[i])
+            r = rows[i]
+            found = [s for s in self.skills[r] if s.lower() in wanted]
+            results.append({
+                "Candidate": self.names[r],
+                "Rank Score": score,
+                "Predicted Role": self.roles[r],
+                "ML Conf %": self.confidences[r],
+                "Semantic Sim %": semantic_sim,
+                "Skill Match %": skill_pct,
+                "Skills": found,
+                "Gaps": nlp.identify_gap(target_skills, found)
+            })
+        return results
+
+    def rank_requisitions(self, requisitions, top_k=10, top_jobs=3, block_rows=None):
+        # The whole pool against many JDs at once, see scripts/requisitions.py;
+        # requisitions are (id, jd_text, target_skills or None). Similarities
+        # come from the stored TF-IDF rows, or the stored LSA embeddings.
+        import numpy as np
+        from sklearn.preprocessing import normalize
+        from scripts.requisitions import cross_rank, resolve
+        requisitions = resolve(requisitions)
+        self._check_vectorizer()
+        if not requisitions or not self.ids:
+            return cross_rank(None, len(self.ids), [skills for _, _, skills in requisitions], self._skill_matrix(),
+                              top_k, top_jobs)
+        jd_features = nlp.get_vectorizer().transform(nlp.clean_texts([jd for _, jd, _ in requisitions]))
+        if nlp.SEMANTIC == 'lsa':
+            if self.lsa_tag != nlp.artifact_fingerprint(nlp.LSA_FILE) or len(self.embeddings) != len(self.ids):
+                raise RuntimeError("Index has no up-to-date LSA embeddings, run build again to refresh it.")
+            queries = nlp.embed(jd_features)
+            def similarity(start, end):
+                return np.clip(np.asarray(self.embeddings[start:end]) @ queries.T, 0.0, 1.0).astype(np.float64)
+        else:
+            # Rows are L2-normalized TF-IDF, so the product is the cosine
+            queries = normalize(jd_features).T.tocsc()
+            def similarity(start, end):
+                return (self.matrix[start:end] @ queries).toarray()
+        return cross_rank(similarity, len(self.ids), [skills for _, _, skills in requisitions],
+                          self._skill_matrix(), top_k, top_jobs, block_rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query a persistent resume index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Index every resume under a directory (incremental)")
+    build.add_argument("--index", required=True)
+    build.add_argument("--input", required=True)
+    build.add_argument("--workers", type=int, default=None)
+    rank = sub.add_parser("rank", help="Rank the indexed pool against a JD")
+    rank.add_argument("--index", required=True)
+    rank.add_argument("--jd", required=True, help="Path to a text file holding the job description")
+    rank.add_argument("--skills", default=None, help="Comma separated target skills (default: inferred from the JD)")
+    rank.add_argument("--top-k", type=int, default=10)
+    rank.add_argument("--shortlist", type=int, default=None,
+                      help="With PROSCREEN_SEMANTIC=lsa: only score the N nearest resumes from the ANN index")
+    rank.add_argument("--nprobe", type=int, default=None, help="ANN lists scanned per query (recall vs latency)")
+    nearest = sub.add_parser("nearest", help="List the resumes semantically closest to a JD")
+    nearest.add_argument("--index", required=True)
+    nearest.add_argument("--jd", required=True, help="Path to a text file holding the job description")
+    nearest.add_argument("--k", type=int, default=200)
+    nearest.add_argument("--nprobe", type=int, default=None, help="ANN lists scanned per query (recall vs latency)")
+    args = parser.parse_args(argv)
+
+    index = ResumeIndex(args.index)
+    if args.command == "build":
+        from scripts.screen_cli import find_documents
+        if index.is_stale():
+            print("Index was built with a different vectorizer, rebuilding it.", file=sys.stderr)
+            index.reset()
+        paths = find_documents(args.input)
+        added = 0
+        # Chunked so only a slice of the raw bytes is held at once
+        for start in range(0, len(paths), 256):
+            items = []
+            for rel_path in paths[start:start + 256]:
+                with open(os.path.join(args.input, rel_path), 'rb') as f:
+                    items.append((f.read(), rel_path))
+            added += index.add_files(items, args.workers)
+        index.save()
+        print(f"Added {added} documents, index holds {len(index)}.", file=sys.stderr)
+    elif args.command == "nearest":
+        with open(args.jd, 'r', encoding='utf-8') as f:
+            jd_text = f.read()
+        for res in index.nearest(jd_text, args.k, args.nprobe):
+            print(json.dumps(res))
+    else:
+        with open(args.jd, 'r', encoding='utf-8') as f:
+            jd_text = f.read()
+        if args.skills:
+            target_skills = [s.strip() for s in args.skills.split(",") if s.strip()]
+        else:
+            target_skills = nlp.extract_skills(jd_text, nlp.get_bank_matcher())
+        for res in index.rank(jd_text, target_skills, args.top_k, args.shortlist, args.nprobe):
+            print(json.dumps(res))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import nlp_engine as nlp
+import instrumentation
+
+# Headless bulk screener for overnight batch jobs:
+#   python -m scripts.screen_cli --jd jd.txt --input datasets/data/data --output results.csv
+# Results are appended to the output file chunk by chunk and every finished
+# document is recorded in <output>.checkpoint, so re-running the same
+# command after an interruption picks up where it stopped. Documents whose
+# rows reached the output before a crash stopped the checkpoint write are
+# skipped too, so resuming never writes a row twice.
+# --report out.pdf|.csv|.parquet renders a report of the whole results file
+# once screening is done (the PDF details the top --report-top-k only).
+# --dedup scores each cluster of near-duplicate resumes once across the
+# whole run (not just within a batch); the copies get the representative's
+# scores and its path in "Duplicate Of".
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+CSV_FIELDS = ["Candidate", "Rank Score", "Predicted Role", "ML Conf %", "Top Roles",
+              "Semantic Sim %", "Skill Match %", "Skills", "Gaps", "Duplicate Of", "Error"]
+
+def find_documents(root):
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                found.append(os.path.relpath(os.path.join(dirpath, filename), root))
+    return sorted(found)
+
+def load_checkpoint(path):
+    done = set()
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                # A line without its newline was cut off mid-write
+                if line.endswith("\n"):
+                    done.add(line[:-1])
+    return done
+
+def trim_partial_row(path):
+    # Drops a last row cut off mid-write, so appended rows start on a line
+    # of their own
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            size = min(65536, pos)
+            f.seek(pos - size)
+            block = f.read(size)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                pos = pos - size + newline + 1
+                break
+            pos -= size
+        if pos < end:
+            f.truncate(pos)
+
+def load_written(path):
+    # Candidates that already have a row in the results file
+    if not os.path.exists(path):
+        return set()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.jsonl'):
+            return {json.loads(line)["Candidate"] for line in f if line.strip()}
+        return {row["Candidate"] for row in csv.DictReader(f)}
+
+class ResultWriter:
+    # Appends rows to a .csv or .jsonl file and fsyncs after every chunk so
+    # the checkpoint never runs ahead of the results on disk
+
+    def __init__(self, path):
+        self.jsonl = path.lower().endswith('.jsonl')
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.f = open(path, 'a', encoding='utf-8', newline='')
+        if not self.jsonl:
+            self.writer = csv.DictWriter(self.f, fieldnames=CSV_FIELDS)
+            if new_file:
+                self.writer.writeheader()
+
+    def write(self, rows):
+        for row in rows:
+            if self.jsonl:
+                self.f.write(json.dumps(row) + "\n")
+            else:
+                flat = dict(row)
+                flat["Skills"] = ", ".join(row.get("Skills", []))
+                flat["Gaps"] = ", ".join(row.get("Gaps", []))
+                flat["Top Roles"] = ", ".join(f"{r} ({p}%)" for r, p in row.get("Top Roles", []))
+                self.writer.writerow(flat)
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self):
+        self.f.close()
+
+def load_results(path):
+    # Reads a results file back into screen_batch-style rows (scored rows
+    # only), e.g. for a report covering every resumed run
+    rows = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.jsonl'):
+            rows = [json.loads(line) for line in f if line.strip()]
+            return [r for r in rows if "Rank Score" in r]
+        for row in csv.DictReader(f):
+            if row.get("Error") or not row.get("Rank Score"):
+                continue
+            for field in ("Rank Score", "ML Conf %", "Semantic Sim %", "Skill Match %"):
+                row[field] = float(row[field])
+            for field in ("Skills", "Gaps"):
+                row[field] = row[field].split(", ") if row[field] else []
+            top_roles = []
+            for entry in row["Top Roles"].split("%), ") if row["Top Roles"] else []:
+                role, _, p = entry.rstrip("%)").rpartition(" (")
+                top_roles.append((role, float(p)))
+            row["Top Roles"] = top_roles
+            del row["Error"]
+            rows.append(row)
+    return rows
+
+def _chunks(seq, size):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+def screen_directory(jd_text, target_skills, root, output, workers=None, batch_size=256, dedup=False):
+    checkpoint_path = output + ".checkpoint"
+    trim_partial_row(output)
+    done = load_checkpoint(checkpoint_path) | load_written(output)
+    pending = [p for p in find_documents(root) if p not in done]
+    total = len(done) + len(pending)
+    print(f"{len(done)} documents already screened, {len(pending)} to go.", file=sys.stderr)
+    if not pending:
+        return
+
+    matcher = nlp.get_skills_matcher(target_skills) if target_skills else nlp.get_bank_matcher()
+    writer = ResultWriter(output)
+    if dedup:
+        from scripts.near_duplicates import NearDuplicateIndex
+        # Documents screened before a restart are not in the index
+        duplicates = NearDuplicateIndex(nlp.DEDUP_THRESHOLD)
+        representatives = {}
+    processed = len(done)
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool, open(checkpoint_path, 'a', encoding='utf-8') as ckpt:
+            for chunk in _chunks(pending, batch_size):
+                items = []
+                for rel_path in chunk:
+                    with open(os.path.join(root, rel_path), 'rb') as f:
+                        items.append((f.read(), rel_path))
+
+                names, contents, rows = [], [], []
+                for rel_path, text, error in nlp.extract_many(items, workers, executor=pool):
+                    if text:
+                        names.append(rel_path)
+                        contents.append(text)
+                    else:
+                        rows.append({"Candidate": rel_path, "Error": error or "no text extracted"})
+
+                # A batch that fails to score gets error rows, like unreadable
+                # files, and the run carries on
+                if dedup:
+                    cleaned = nlp.clean_texts(contents)
+                    reps = [duplicates.add(name, text) for name, text in zip(names, cleaned)]
+                    unique = [i for i, rep in enumerate(reps) if rep is None]
+                    try:
+                        results = nlp.screen_batch(jd_text, target_skills, [contents[i] for i in unique], matcher,
+                                                   cleaned=[cleaned[i] for i in unique], dedup=False)
+                    except Exception as e:
+                        results = [{"Error": f"scoring failed: {e}"}] * len(unique)
+                    for i, res in zip(unique, results):
+                        representatives[names[i]] = res
+                    for name, rep in zip(names, reps):
+                        res = representatives[name] if rep is None else {**representatives[rep], "Duplicate Of": rep}
+                        rows.append({"Candidate": name, **{k: _plain(v) for k, v in res.items()}})
+                else:
+                    try:
+                        results = nlp.screen_batch(jd_text, target_skills, contents, matcher)
+                    except Exception as e:
+                        results = [{"Error": f"scoring failed: {e}"}] * len(contents)
+                    for name, res in zip(names, results):
+                        if res.get("Duplicate Of") is not None:
+                            res["Duplicate Of"] = names[res["Duplicate Of"]]
+                        rows.append({"Candidate": name, **{k: _plain(v) for k, v in res.items()}})
+
+                writer.write(rows)
+                ckpt.write("".join(p + "\n" for p in chunk))
+                ckpt.flush()
+                os.fsync(ckpt.fileno())
+
+                processed += len(chunk)
+                rate = (processed - len(done)) / (time.perf_counter() - start)
+                print(f"[{processed}/{total}] {rate:.1f} docs/s", file=sys.stderr)
+    finally:
+        writer.close()
+
+def _plain(value):
+    # numpy scalars -> built-in types so rows serialize cleanly
+    return value.item() if hasattr(value, 'item') else value
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen a directory of resumes against a job description.")
+    parser.add_argument("--jd", required=True, help="Path to a text file holding the job description")
+    parser.add_argument("--input", required=True, help="Directory searched recursively for .pdf/.docx/.txt resumes")
+    parser.add_argument("--output", required=True, help="Results file, .csv or .jsonl")
+    parser.add_argument("--skills", default=None, help="Comma separated target skills (default: inferred from the JD)")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction worker processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Documents screened per vectorized batch")
+    parser.add_argument("--dedup", action="store_true", help="Score near-duplicate resumes once across the run")
+    parser.add_argument("--report", default=None, help="Also write a report of all results: .pdf, .csv or .parquet")
+    parser.add_argument("--report-top-k", type=int, default=None, help="Candidates detailed in a PDF report")
+    parser.add_argument("--metrics", default=None, help="Write per-stage metrics here (.prom for Prometheus text, else JSON)")
+    parser.add_argument("--profile", default=None, help="Write a cProfile dump here (open with pstats or snakeviz)")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak memory and top allocation sites (slow)")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        instrumentation.enable()
+
+    with open(args.jd, 'r', encoding='utf-8') as f:
+        jd_text = f.read()
+
+    if args.skills:
+        target_skills = [s.strip() for s in args.skills.split(",") if s.strip()]
+    else:
+        # Same default as the UI: skills from the bank that appear in the JD
+        target_skills = nlp.extract_skills(jd_text, nlp.get_bank_matcher())
+    print(f"Target skills: {', '.join(target_skills) or 'none'}", file=sys.stderr)
+
+    if args.profile or args.trace_memory:
+        # cProfile and tracemalloc only see this process, not the extraction workers
+        with instrumentation.capture(cpu=bool(args.profile), memory=args.trace_memory) as cap:
+            screen_directory(jd_text, target_skills, args.input, args.output, args.workers, args.batch_size, args.dedup)
+        if args.profile:
+            cap.profile.dump_stats(args.profile)
+            print(cap.cpu_report(top=15), file=sys.stderr)
+        if args.trace_memory:
+            print(f"Peak traced memory: {cap.peak_bytes / 1e6:.1f} MB\n{cap.allocations}", file=sys.stderr)
+    else:
+        screen_directory(jd_text, target_skills, args.input, args.output, args.workers, args.batch_size, args.dedup)
+
+    if args.report:
+        from scripts import reporting
+        fmt = os.path.splitext(args.report)[1].lstrip('.').lower()
+        top_k = args.report_top_k or reporting.DETAIL_TOP_K
+        reporting.write_report(fmt, jd_text, target_skills, load_results(args.output), args.report, top_k)
+        print(f"Report written to {args.report}", file=sys.stderr)
+
+    if args.metrics:
+        instrumentation.write_metrics(args.metrics)
+        print(f"Metrics written to {args.metrics}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import re
+
+# Resume section segmentation in one linear pass.
+#
+# A header is a line holding nothing but a known section title (any case,
+# optionally followed by a colon), or a title and a colon followed by the
+# content itself ("Skills: Python, SQL"). All titles are compiled into a
+# single alternation anchored at line starts and scanned once with
+# finditer; nothing can match across a line break, so there is no
+# backtracking over the document. A section runs from the end of its header
+# to the next header. Text before the first header is the "preamble".
+#
+# The titles cover the generic resumes of the training data and LinkedIn
+# PDF exports ("Top Skills", "Contact", ...).
+
+TITLES = {
+    "summary": ["summary", "professional summary", "executive summary", "career summary", "profile",
+                "professional profile", "executive profile", "objective", "career objective", "career overview",
+                "about", "about me"],
+    "skills": ["skills", "top skills", "technical skills", "key skills", "skill highlights", "highlights",
+               "core qualifications", "qualifications", "core competencies", "competencies", "areas of expertise",
+               "expertise"],
+    "experience": ["experience", "professional experience", "work experience", "relevant experience", "work history",
+                   "employment history", "employment", "career history"],
+    "education": ["education", "education and training", "education & training", "academic background",
+                  "educational background", "academic qualifications"],
+    "certifications": ["certifications", "certificates", "licenses", "licenses and certifications",
+                       "licenses & certifications", "certifications and licenses"],
+    "accomplishments": ["accomplishments", "core accomplishments", "achievements", "awards", "honors",
+                        "awards and honors", "honors and awards"],
+    "projects": ["projects", "key projects"],
+    "publications": ["publications"],
+    "languages": ["languages"],
+    "affiliations": ["affiliations", "professional affiliations"],
+    "interests": ["interests", "hobbies"],
+    "additional": ["additional information", "personal information"],
+    "contact": ["contact", "contact information"],
+}
+NAMES = tuple(TITLES) + ("preamble",)
+
+def _compile():
+    groups = []
+    for name, titles in TITLES.items():
+        # Longest first so "skills" does not stop short of "skills highlights"
+        alts = "|".join(r"[ \t]+".join(map(re.escape, t.split())) for t in sorted(titles, key=len, reverse=True))
+        groups.append(f"(?P<{name}>{alts})")
+    return re.compile(r"^[ \t]*(?:" + "|".join(groups) + r")[ \t]*(?::|$)", re.IGNORECASE | re.MULTILINE)
+
+_HEADER_RE = _compile()
+
+def segment(text):
+    # [(section, start, end)] in document order; text[start:end] is the
+    # section body. A section may occur more than once.
+    sections = []
+    name, start = "preamble", 0
+    for match in _HEADER_RE.finditer(text):
+        if name != "preamble" or text[start:match.start()].strip():
+            sections.append((name, start, match.start()))
+        name, start = match.lastgroup, match.end()
+    if name != "preamble" or text[start:].strip():
+        sections.append((name, start, len(text)))
+    return sections
+
+def parse_sections(spec):
+    # "skills, experience" -> ("skills", "experience")
+    names = tuple(s.strip().lower() for s in spec.split(",") if s.strip()) if isinstance(spec, str) else tuple(spec)
+    unknown = [s for s in names if s not in NAMES]
+    if unknown:
+        raise ValueError(f"Unknown resume sections {unknown}, expected some of {list(NAMES)}.")
+    return names
+
+def section_text(text, names):
+    # The bodies of the chosen sections, in document order. Documents with
+    # none of them (no recognizable headers, say) are returned whole, so
+    # they are still scored on something.
+    parts = [text[start:end] for name, start, end in segment(text) if name in names]
+    return "\n".join(parts) if parts else text
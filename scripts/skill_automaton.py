@@ -0,0 +1,167 @@
+import re
+import sys
+import json
+import pickle
+import argparse
+from array import array
+from bisect import bisect_left
+
+# Aho-Corasick automaton over normalized (lower-cased) tokens, for skill
+# taxonomies far larger than a PhraseMatcher handles comfortably (ESCO/O*NET
+# sized, 30k-100k skills and aliases). Build it once, save it next to the
+# models and load it in milliseconds; matching is a single linear scan over
+# the document tokens (one binary search per step) no matter how many
+# patterns there are.
+#
+# extract() keeps the extract_skills contract: a list of distinct title-cased
+# skill names. Aliases are reported under their canonical name.
+
+# Words and single punctuation marks, like the spaCy tokenizer for the
+# plain-text skill names this is used with
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+def load_taxonomy(path):
+    # Either a list of skills (like models/skills.json) or a mapping of
+    # canonical skill -> list of aliases
+    with open(path, 'r', encoding='utf-8') as f:
+        taxonomy = json.load(f)
+    if isinstance(taxonomy, list):
+        return {skill: [] for skill in taxonomy}
+    return taxonomy
+
+class SkillAutomaton:
+    # While building, transitions live in a dict keyed by
+    # (state << 32) | token id. build() then freezes everything into flat
+    # arrays: sorted transition keys searched with bisect, failure links,
+    # and a CSR-style output table. Arrays unpickle as raw bytes, which is
+    # what makes loading a 100k-pattern automaton take milliseconds.
+
+    def __init__(self):
+        self.token_ids = {}
+        self.canonical = []
+        self.goto_keys = array('q')
+        self.goto_next = array('i')
+        self.fail = array('i')
+        self.out_ptr = array('i', [0, 0])
+        self.out_ids = array('i')
+
+    @classmethod
+    def build(cls, taxonomy):
+        if not isinstance(taxonomy, dict):
+            taxonomy = {skill: [] for skill in taxonomy}
+        automaton = cls()
+        goto, output = {}, [()]
+        for canonical, aliases in taxonomy.items():
+            canonical_id = len(automaton.canonical)
+            automaton.canonical.append(canonical.lower().title())
+            for pattern in [canonical, *aliases]:
+                automaton._add(goto, output, tokenize(pattern), canonical_id)
+        fail = automaton._link(goto, output)
+        automaton._freeze(goto, fail, output)
+        return automaton
+
+    def _add(self, goto, output, tokens, canonical_id):
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            token_id = self.token_ids.setdefault(token, len(self.token_ids))
+            key = (state << 32) | token_id
+            nxt = goto.get(key)
+            if nxt is None:
+                nxt = len(output)
+                goto[key] = nxt
+                output.append(())
+            state = nxt
+        if canonical_id not in output[state]:
+            output[state] = output[state] + (canonical_id,)
+
+    def _link(self, goto, output):
+        # Breadth-first failure links; each state's output is merged with the
+        # output of its failure state so matching never walks the chain
+        fail = [0] * len(output)
+        children = {}
+        for key, child in goto.items():
+            children.setdefault(key >> 32, []).append((key & 0xFFFFFFFF, child))
+        queue = [child for _, child in children.get(0, [])]
+        for state in queue:
+            for token_id, child in children.get(state, []):
+                queue.append(child)
+                f = fail[state]
+                while f and ((f << 32) | token_id) not in goto:
+                    f = fail[f]
+                fail[child] = goto.get((f << 32) | token_id, 0)
+                output[child] = output[child] + tuple(c for c in output[fail[child]] if c not in output[child])
+        return fail
+
+    def _freeze(self, goto, fail, output):
+        keys = sorted(goto)
+        self.goto_keys = array('q', keys)
+        self.goto_next = array('i', [goto[k] for k in keys])
+        self.fail = array('i', fail)
+        self.out_ptr = array('i', [0])
+        self.out_ids = array('i')
+        for ids in output:
+            self.out_ids.extend(ids)
+            self.out_ptr.append(len(self.out_ids))
+
+    def _step(self, state, token_id):
+        key = (state << 32) | token_id
+        i = bisect_left(self.goto_keys, key)
+        if i < len(self.goto_keys) and self.goto_keys[i] == key:
+            return self.goto_next[i]
+        return None
+
+    def extract(self, text):
+        token_ids, fail, out_ptr, out_ids = self.token_ids, self.fail, self.out_ptr, self.out_ids
+        found = set()
+        state = 0
+        for token in tokenize(text):
+            token_id = token_ids.get(token)
+            if token_id is None:
+                # No pattern contains this token, so nothing can span it
+                state = 0
+                continue
+            while True:
+                nxt = self._step(state, token_id)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+            start, end = out_ptr[state], out_ptr[state + 1]
+            if start != end:
+                found.update(out_ids[start:end])
+        return [self.canonical[c] for c in found]
+
+    def save(self, path):
+        state = (self.token_ids, self.canonical, self.goto_keys, self.goto_next,
+                 self.fail, self.out_ptr, self.out_ids)
+        with open(path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        automaton = cls()
+        with open(path, 'rb') as f:
+            (automaton.token_ids, automaton.canonical, automaton.goto_keys, automaton.goto_next,
+             automaton.fail, automaton.out_ptr, automaton.out_ids) = pickle.load(f)
+        return automaton
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile a skill taxonomy into a serialized automaton.")
+    parser.add_argument("--taxonomy", required=True, help="JSON list of skills or {canonical: [aliases]} mapping")
+    parser.add_argument("--output", required=True, help="Where to write the compiled automaton (.pkl)")
+    args = parser.parse_args(argv)
+
+    taxonomy = load_taxonomy(args.taxonomy)
+    automaton = SkillAutomaton.build(taxonomy)
+    automaton.save(args.output)
+    print(f"Compiled {len(taxonomy)} skills into {len(automaton.fail)} states -> {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Candidate skill sets as packed bit arrays.
+#
+# Skill names are interned to dense integer ids (SkillVocabulary) and each
+# candidate becomes one row of a (n, ceil(vocabulary / 8)) uint8 matrix,
+# bit j of a row set when the candidate has skill j (np.packbits order,
+# most significant bit first). 2,000 skills take 250 bytes per candidate,
+# 25 MB for 100k candidates, instead of a Python list of strings each.
+#
+# Scoring against a JD only reads the bit columns of its target skills, so
+# match percentages, gap masks and coverage counts over the whole pool are
+# a handful of vectorized NumPy operations: no per-candidate set() is built.
+# Names are compared exactly, as the set operations in nlp_engine do.
+
+def _popcount_table():
+    import numpy as np
+    return np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+class SkillVocabulary:
+    def __init__(self, names=()):
+        self.names = []
+        self.ids = {}
+        for name in names:
+            self.intern(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        sid = self.ids.get(name)
+        if sid is None:
+            sid = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return sid
+
+    def lookup(self, names):
+        # Ids of `names`, -1 for names never seen
+        import numpy as np
+        return np.array([self.ids.get(name, -1) for name in names], dtype=np.int64)
+
+class SkillMatrix:
+    def __init__(self, vocabulary, bits):
+        self.vocabulary = vocabulary
+        self.bits = bits
+
+    def __len__(self):
+        return len(self.bits)
+
+    @classmethod
+    def encode(cls, skill_lists, vocabulary=None):
+        # One row per list of skill names; names missing from `vocabulary`
+        # are interned into it
+        import numpy as np
+        from itertools import chain
+        vocabulary = vocabulary if vocabulary is not None else SkillVocabulary()
+        skill_lists = list(skill_lists)
+        names = list(chain.from_iterable(skill_lists))
+        # Dict lookups first; only unseen names take the interning path
+        get = vocabulary.ids.get
+        cols = [get(name) for name in names]
+        for i, sid in enumerate(cols):
+            if sid is None:
+                cols[i] = vocabulary.intern(names[i])
+        rows = np.repeat(np.arange(len(skill_lists), dtype=np.int64), [len(skills) for skills in skill_lists])
+        width = (len(vocabulary) + 7) // 8
+        bits = np.zeros((len(skill_lists), width), dtype=np.uint8)
+        if cols:
+            # Sorted flat bit positions are OR-ed into their bytes one run of
+            # equal bytes at a time (repeated skills just OR twice). A sort,
+            # not np.unique, which is many times slower on large inputs.
+            positions = np.sort(rows * (width * 8) + np.asarray(cols, dtype=np.int64))
+            byte_index = positions >> 3
+            values = (np.uint8(128) >> (positions & 7).astype(np.uint8)).astype(np.uint8)
+            starts = np.flatnonzero(np.r_[True, byte_index[1:] != byte_index[:-1]])
+            bits.reshape(-1)[byte_index[starts]] = np.bitwise_or.reduceat(values, starts)
+        return cls(vocabulary, bits)
+
+    def has(self, skills):
+        # (n, len(skills)) bool: which candidates have each skill
+        import numpy as np
+        ids = self.vocabulary.lookup(skills)
+        found = np.zeros((len(self), len(ids)), dtype=bool)
+        known = np.flatnonzero((ids >= 0) & (ids < self.bits.shape[1] * 8))
+        if len(known) and len(self):
+            cols = ids[known]
+            shifts = (7 - (cols & 7)).astype(np.uint8)
+            found[:, known] = (np.asarray(self.bits[:, cols >> 3]) >> shifts) & 1
+        return found
+
+    def match_ratio(self, target_skills):
+        # nlp_engine.skill_match_ratio for every row: distinct targets found
+        # over len(target_skills)
+        import numpy as np
+        if not target_skills:
+            return np.ones(len(self))
+        return self.has(list(dict.fromkeys(target_skills))).sum(axis=1) / len(target_skills)
+
+    def gaps(self, target_skills):
+        # nlp_engine.identify_gap for every row, targets in their given order
+        import numpy as np
+        targets = list(dict.fromkeys(target_skills))
+        if not targets:
+            return [[] for _ in range(len(self))]
+        missing = ~self.has(targets)
+        names = np.array(targets, dtype=object)
+        return [names[row].tolist() for row in missing]
+
+    def coverage(self, skills=None, block=8192):
+        # {skill: number of candidates with it}, for `skills` or the whole
+        # vocabulary (popcounts over blocks of rows)
+        import numpy as np
+        if skills is not None:
+            return dict(zip(skills, self.has(skills).sum(axis=0).tolist()))
+        counts = np.zeros(self.bits.shape[1] * 8, dtype=np.int64)
+        for start in range(0, len(self), block):
+            counts += np.unpackbits(np.asarray(self.bits[start:start + block]), axis=1).sum(axis=0, dtype=np.int64)
+        return dict(zip(self.vocabulary.names, counts[:len(self.vocabulary)].tolist()))
+
+    def counts(self):
+        # Number of skills of every candidate
+        import numpy as np
+        bits = np.asarray(self.bits)
+        if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+            return np.bitwise_count(bits).sum(axis=1, dtype=np.int64)
+        return _popcount_table()[bits].sum(axis=1, dtype=np.int64)
+
+    def skills_of(self, row):
+        import numpy as np
+        ids = np.flatnonzero(np.unpackbits(np.asarray(self.bits[row])))
+        return [self.vocabulary.names[i] for i in ids]
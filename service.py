@@ -0,0 +1,307 @@
+import os
+import json
+import uuid
+import time
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+import nlp_engine as nlp
+import instrumentation
+from scripts import reporting
+
+# Standalone screening service, so scoring no longer runs inside the
+# Streamlit request thread:
+#   uvicorn service:app --host 0.0.0.0 --port 8000
+#
+#   POST /jobs                  multipart form: jd, skills (comma separated,
+#                               optional), files (repeated). 202 + job id, or
+#                               429 when the queue is full.
+#   GET  /jobs/{id}             status and progress
+#   GET  /jobs/{id}/results     NDJSON stream of per-resume results as they
+#                               are scored, ends when the job finishes.
+#                               "Index" is the file's position in the upload
+#   GET  /jobs/{id}/ranking     results sorted by Rank Score (?top_k=N)
+#   GET  /jobs/{id}/report      ?format=pdf|csv|parquet (default pdf) of a
+#                               finished job, rendered to a temp file on the
+#                               report thread pool; ?top_k=N detailed PDF
+#                               entries
+#   GET  /metrics               per-stage timers and counters in Prometheus
+#                               text format (PROSCREEN_INSTRUMENT=1)
+#
+# Jobs wait in a bounded queue. One dispatcher per worker process takes a
+# job and submits its chunks to the pool, at most PROSCREEN_JOB_INFLIGHT of
+# them at a time, publishing rows as each chunk finishes. Concurrent
+# recruiters share the cores instead of queueing behind one big upload.
+
+WORKERS = int(os.environ.get('PROSCREEN_SERVICE_WORKERS', os.cpu_count() or 1))
+QUEUE_SIZE = int(os.environ.get('PROSCREEN_QUEUE_SIZE', 32))
+CHUNK_SIZE = int(os.environ.get('PROSCREEN_CHUNK_SIZE', 16))
+MAX_FINISHED_JOBS = int(os.environ.get('PROSCREEN_MAX_FINISHED_JOBS', 1000))
+JOB_INFLIGHT = int(os.environ.get('PROSCREEN_JOB_INFLIGHT', WORKERS))
+
+def _init_worker():
+    # Models load once per worker process, not once per job
+    nlp.load_resources()
+    nlp.get_nlp()
+
+def _screen_chunk(jd_text, target_skills, items, offset=0):
+    # Runs in a worker: extract and score one chunk of (bytes, filename)
+    # starting at upload position `offset`. Metrics recorded in the worker
+    # travel back with the rows.
+    with instrumentation.collect() as metrics:
+        rows = _screen_rows(jd_text, target_skills, items, offset)
+    return rows, metrics.snapshot() if metrics is not None else None
+
+def _screen_rows(jd_text, target_skills, items, offset=0):
+    # Filenames need not be unique, so every row carries its upload position
+    from scripts.screen_cli import _plain
+    names, positions, contents, rows = [], [], [], []
+    for i, filename, text, error in nlp.extract_many(items, workers=1, indexed=True):
+        if text:
+            names.append(filename)
+            positions.append(offset + i)
+            contents.append(text)
+        else:
+            rows.append({"Candidate": filename, "Index": offset + i, "Error": error or "no text extracted"})
+    # With PROSCREEN_DEDUP on, near-duplicates are only detected within a chunk
+    for name, position, res in zip(names, positions, nlp.screen_batch(jd_text, target_skills, contents)):
+        if res.get("Duplicate Of") is not None:
+            res["Duplicate Of"] = names[res["Duplicate Of"]]
+        rows.append({"Candidate": name, "Index": position, **{k: _plain(v) for k, v in res.items()}})
+    return sorted(rows, key=lambda row: row["Index"])
+
+def _infer_skills(jd_text):
+    return nlp.extract_skills(jd_text, nlp.get_bank_matcher())
+
+class Job:
+    def __init__(self, jd_text, target_skills, items):
+        self.id = uuid.uuid4().hex
+        self.jd_text = jd_text
+        self.target_skills = target_skills
+        self.items = items
+        self.total = len(items)
+        self.status = "queued"
+        self.error = None
+        self.results = []
+        self.created = time.time()
+        self.finished = None
+        self.changed = asyncio.Condition()
+
+    def summary(self):
+        return {
+            "job_id": self.id, "status": self.status, "total": self.total,
+            "processed": len(self.results), "error": self.error,
+            "created": self.created, "finished": self.finished
+        }
+
+    async def publish(self, rows=None, status=None):
+        async with self.changed:
+            if rows:
+                self.results.extend(rows)
+            if status:
+                self.status = status
+            self.changed.notify_all()
+
+class ScreeningService:
+    def __init__(self):
+        self.jobs = OrderedDict()
+        self.queue = None
+        self.pool = None
+        self.dispatchers = []
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.pool = ProcessPoolExecutor(max_workers=WORKERS, initializer=_init_worker)
+        self.dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(WORKERS)]
+
+    async def stop(self):
+        for task in self.dispatchers:
+            task.cancel()
+        # shutdown() waits for running chunks; keep the loop responsive
+        await asyncio.get_running_loop().run_in_executor(None, partial(self.pool.shutdown, cancel_futures=True))
+
+    def submit(self, job):
+        self.queue.put_nowait(job)  # raises asyncio.QueueFull
+        self.jobs[job.id] = job
+        self._forget_old_jobs()
+
+    def _forget_old_jobs(self):
+        finished = [j for j in self.jobs.values() if j.finished]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job.id]
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            await job.publish(status="running")
+            try:
+                inflight = asyncio.Semaphore(JOB_INFLIGHT)
+
+                async def run_chunk(start):
+                    async with inflight:
+                        chunk = job.items[start:start + CHUNK_SIZE]
+                        rows, metrics = await loop.run_in_executor(self.pool, _screen_chunk, job.jd_text,
+                                                                   job.target_skills, chunk, start)
+                    instrumentation.merge(metrics)
+                    await job.publish(rows)
+
+                tasks = [asyncio.create_task(run_chunk(start)) for start in range(0, job.total, CHUNK_SIZE)]
+                try:
+                    await asyncio.gather(*tasks)
+                except BaseException:
+                    for task in tasks:
+                        task.cancel()
+                    raise
+                job.items = None  # release the uploaded bytes
+                job.finished = time.time()
+                await job.publish(status="done")
+            except Exception as e:
+                job.items = None
+                job.error = str(e)
+                job.finished = time.time()
+                await job.publish(status="failed")
+            finally:
+                self.queue.task_done()
+
+service = ScreeningService()
+
+async def create_job(request):
+    form = await request.form()
+    jd_text = form.get("jd") or ""
+    uploads = form.getlist("files")
+    if not jd_text or not uploads:
+        return JSONResponse({"error": "Provide a jd and at least one file."}, status_code=400)
+    if service.queue.full():
+        # Backpressure: refuse before the uploads are copied into a job
+        return JSONResponse({"error": "Screening queue is full, retry later."}, status_code=429,
+                            headers={"Retry-After": "5"})
+
+    skills = form.get("skills")
+    if skills:
+        target_skills = [s.strip() for s in skills.split(",") if s.strip()]
+    else:
+        # Building the bank matcher the first time loads spaCy; both stay off the event loop
+        target_skills = await asyncio.get_running_loop().run_in_executor(None, _infer_skills, jd_text)
+    items = [(await upload.read(), upload.filename) for upload in uploads]
+
+    job = Job(jd_text, target_skills, items)
+    try:
+        service.submit(job)
+    except asyncio.QueueFull:
+        return JSONResponse({"error": "Screening queue is full, retry later."}, status_code=429,
+                            headers={"Retry-After": "5"})
+    return JSONResponse({**job.summary(), "target_skills": target_skills}, status_code=202)
+
+def _get_job(request):
+    return service.jobs.get(request.path_params["job_id"])
+
+def _top_k(request):
+    # ?top_k=N as a non-negative int (0 or missing: None); raises ValueError
+    top_k = int(request.query_params.get("top_k", 0))
+    if top_k < 0:
+        raise ValueError(top_k)
+    return top_k or None
+
+async def job_status(request):
+    job = _get_job(request)
+    if job is None:
+        return JSONResponse({"error": "Unknown job."}, status_code=404)
+    summary = job.summary()
+    if job.status == "queued":
+        summary["queue_depth"] = service.queue.qsize()
+    return JSONResponse(summary)
+
+async def job_results(request):
+    job = _get_job(request)
+    if job is None:
+        return JSONResponse({"error": "Unknown job."}, status_code=404)
+
+    async def stream():
+        sent = 0
+        while True:
+            async with job.changed:
+                await job.changed.wait_for(lambda: len(job.results) > sent or job.finished)
+                rows = job.results[sent:]
+                finished = job.finished
+            for row in rows:
+                yield json.dumps(row) + "\n"
+            sent += len(rows)
+            if finished and sent >= len(job.results):
+                break
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+async def job_ranking(request):
+    job = _get_job(request)
+    if job is None:
+        return JSONResponse({"error": "Unknown job."}, status_code=404)
+    try:
+        top_k = _top_k(request)
+    except ValueError:
+        return JSONResponse({"error": "top_k must be a non-negative integer."}, status_code=400)
+    scored = [r for r in job.results if "Rank Score" in r]
+    ranking = sorted(scored, key=lambda r: r["Rank Score"], reverse=True)[:top_k]
+    errors = [r for r in job.results if "Error" in r]
+    return JSONResponse({**job.summary(), "ranking": ranking, "errors": errors})
+
+async def job_report(request):
+    import tempfile
+    job = _get_job(request)
+    if job is None:
+        return JSONResponse({"error": "Unknown job."}, status_code=404)
+    if not job.finished:
+        return JSONResponse({"error": "Job is still running."}, status_code=409)
+    fmt = request.query_params.get("format", "pdf")
+    if fmt not in reporting.MEDIA_TYPES:
+        return JSONResponse({"error": f"Unknown format, expected one of {sorted(reporting.MEDIA_TYPES)}."}, status_code=400)
+    try:
+        top_k = _top_k(request) or reporting.DETAIL_TOP_K
+    except ValueError:
+        return JSONResponse({"error": "top_k must be a non-negative integer."}, status_code=400)
+
+    fd, path = tempfile.mkstemp(suffix="." + fmt)
+    os.close(fd)
+    try:
+        await asyncio.wrap_future(reporting.submit_report(fmt, job.jd_text, job.target_skills, job.results, path, top_k))
+    except Exception as e:
+        os.unlink(path)
+        return JSONResponse({"error": f"Report failed: {e}"}, status_code=500)
+    return FileResponse(path, media_type=reporting.MEDIA_TYPES[fmt], filename=f"screening_{job.id}.{fmt}",
+                        background=BackgroundTask(os.unlink, path))
+
+async def health(request):
+    return JSONResponse({"status": "ok", "workers": WORKERS, "queued": service.queue.qsize(),
+                         "queue_size": QUEUE_SIZE, "jobs": len(service.jobs)})
+
+async def metrics(request):
+    return PlainTextResponse(instrumentation.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+@asynccontextmanager
+async def lifespan(app):
+    await service.start()
+    yield
+    await service.stop()
+
+app = Starlette(
+    routes=[
+        Route("/health", health),
+        Route("/metrics", metrics),
+        Route("/jobs", create_job, methods=["POST"]),
+        Route("/jobs/{job_id}", job_status),
+        Route("/jobs/{job_id}/results", job_results),
+        Route("/jobs/{job_id}/ranking", job_ranking),
+        Route("/jobs/{job_id}/report", job_report),
+    ],
+    lifespan=lifespan,
+)
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.environ.get('PROSCREEN_HOST', '127.0.0.1'), port=int(os.environ.get('PROSCREEN_PORT', 8000)))
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import numpy as np
+import nlp_engine as nlp
+from sklearn.decomposition import TruncatedSVD
+from scripts.ann_index import IVFIndex, measure
+
+def _clustered(n=3000, dim=32, clusters=40, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    X = centers[rng.integers(clusters, size=n)] + rng.normal(scale=0.5, size=(n, dim))
+    return (X / np.linalg.norm(X, axis=1, keepdims=True)).astype(np.float32)
+
+def test_full_nprobe_is_exact_and_recall_grows():
+    X = _clustered()
+    index = IVFIndex.build(X)
+    query = X[7]
+    exact_scores, exact_ids = index.search_exact(query, 50)
+    scores, ids = index.search(query, 50, nprobe=index.n_lists)
+    assert np.array_equal(np.sort(ids), np.sort(exact_ids))
+    assert np.allclose(scores, exact_scores)
+    assert ids[0] == 7
+    rows = {row["nprobe"]: row["recall"] for row in measure(index, k=50, nprobes=(1, 8), queries=50)}
+    assert rows[8] >= 0.9 and rows[8] >= rows[1]
+
+def test_save_load_and_add():
+    X = _clustered()
+    index = IVFIndex.build(X[:2000])
+    with tempfile.TemporaryDirectory() as tmp:
+        index.save(tmp)
+        loaded = IVFIndex.load(tmp)
+        assert len(loaded) == 2000
+        loaded.add(X[2000:], np.arange(2000, len(X)))
+        _, ids = loaded.search(X[2500], 1, nprobe=loaded.n_lists)
+        assert ids[0] == 2500
+        del loaded
+
+def test_lsa_semantic_similarity():
+    vect = nlp.get_vectorizer()
+    data_dir = os.path.join(nlp.BASE_DIR, "data")
+    texts = []
+    for filename in sorted(os.listdir(data_dir)):
+        with open(os.path.join(data_dir, filename), 'rb') as f:
+            texts.append(nlp.extract_text_universal(f, filename))
+    X = vect.transform(nlp.clean_texts(texts))
+    saved = (nlp.SEMANTIC, nlp._lsa)
+    try:
+        nlp._lsa = TruncatedSVD(n_components=8, random_state=0).fit(X)
+        nlp.SEMANTIC = 'lsa'
+        jd = vect.transform([nlp.clean_text(texts[0])])
+        sims = nlp.semantic_similarity(X, jd)
+        E = nlp.embed(X)
+        assert E.dtype == np.float32 and np.allclose(np.linalg.norm(E, axis=1), 1.0, atol=1e-5)
+        assert sims.shape == (len(texts),) and sims.min() >= 0.0 and sims.max() <= 1.0
+        assert np.argmax(sims) == 0 or sims[0] >= sims.max() - 1e-6
+    finally:
+        nlp.SEMANTIC, nlp._lsa = saved
+
+if __name__ == "__main__":
+    test_full_nprobe_is_exact_and_recall_grows()
+    test_save_load_and_add()
+    test_lsa_semantic_similarity()
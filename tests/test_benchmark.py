@@ -0,0 +1,61 @@
+import os
+import json
+import copy
+import tempfile
+import nlp_engine as nlp
+from sklearn.ensemble import RandomForestClassifier
+from scripts import benchmark
+
+RUN_KEYS = {"docs", "failed", "model_load_seconds", "sequential_seconds", "sequential_docs_per_s", "rss_start_mb",
+            "peak_rss_mb", "stages"}
+STAGE_KEYS = {"docs", "seconds", "docs_per_s", "p50_ms", "p99_ms"}
+
+def _classifier():
+    le = nlp.get_label_encoder()
+    texts = ["general ledger tax audit payroll accountant", "kitchen menu chef cooking restaurant pastry"]
+    X = nlp.get_vectorizer().transform(nlp.clean_texts(texts))
+    return RandomForestClassifier(n_estimators=5, random_state=0).fit(X, le.transform(list(le.classes_[:2])))
+
+def test_benchmark_saves_baseline_and_flags_regressions():
+    # The size runs in a forked worker, which inherits the stubbed models:
+    # a tiny forest and the automaton skill matcher (no spaCy model)
+    saved = nlp._classifier, nlp.SKILL_MATCHER_BACKEND
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "baseline.json")
+        try:
+            nlp._classifier, nlp.SKILL_MATCHER_BACKEND = _classifier(), 'automaton'
+            assert benchmark.main(["--sizes", "2", "--save", path]) == 0
+            with open(path, 'r', encoding='utf-8') as f:
+                report = json.load(f)
+            assert {"created", "python", "platform", "cpu_count", "corpus_docs", "classifier", "classifier_backend",
+                    "model_format", "featurizer", "semantic", "vectorizer", "target_skills", "runs"} <= set(report)
+            assert list(report["runs"]) == ["2"]
+            run = report["runs"]["2"]
+            assert set(run) == RUN_KEYS and run["docs"] == 2
+            assert list(run["stages"]) == benchmark.STAGES
+            for stage, stats in run["stages"].items():
+                assert set(stats) == STAGE_KEYS, stage
+            assert run["stages"]["screen_batch"]["docs"] == 2 - run["failed"]
+
+            # A baseline that was 10x faster makes --compare fail
+            fast = copy.deepcopy(report)
+            for stats in fast["runs"]["2"]["stages"].values():
+                stats["p50_ms"] /= 10
+                stats["p99_ms"] /= 10
+                stats["docs_per_s"] = stats["docs_per_s"] and stats["docs_per_s"] * 10
+            fast_path = os.path.join(tmp, "fast.json")
+            with open(fast_path, 'w', encoding='utf-8') as f:
+                json.dump(fast, f)
+            assert benchmark.main(["--sizes", "2", "--compare", fast_path]) == 1
+        finally:
+            nlp._classifier, nlp.SKILL_MATCHER_BACKEND = saved
+
+    regressions = benchmark.compare(fast, report)
+    assert {(size, metric) for size, _, metric, _, _ in regressions} >= {("2", "p50_ms"), ("2", "p99_ms")}
+    assert all(after > before for _, _, metric, before, after in regressions if metric.endswith("_ms"))
+    # Compared with itself, or a slower baseline, nothing is flagged
+    assert benchmark.compare(report, report) == []
+    assert benchmark.compare(report, fast) == []
+
+if __name__ == "__main__":
+    test_benchmark_saves_baseline_and_flags_regressions()
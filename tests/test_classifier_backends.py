@@ -0,0 +1,62 @@
+import os
+import json
+import tempfile
+import numpy as np
+import pandas as pd
+import nlp_engine as nlp
+from scripts import train_v2
+
+VOCAB = {
+    "ACCOUNTANT": ["ledger", "tax", "audit", "reconciliation", "quickbooks", "payroll", "invoices"],
+    "CHEF": ["kitchen", "menu", "culinary", "cooking", "restaurant", "pastry", "sauces"],
+    "TEACHER": ["classroom", "curriculum", "students", "lesson", "grading", "tutoring", "school"],
+}
+BACKENDS = ["random_forest", "logreg", "linear_svc"]
+
+def _write_csv(path, per_category=15):
+    rng = np.random.default_rng(0)
+    rows = []
+    for category, words in VOCAB.items():
+        for i in range(per_category):
+            text = " ".join(rng.choice(words, size=10)) + f" resume number {i}"
+            rows.append({"ID": len(rows), "Resume_str": text, "Category": category})
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+def test_every_backend_serves_calibrated_probabilities():
+    saved = (nlp.MODELS_DIR, nlp.CLASSIFIER_BACKEND, nlp.MODEL_FORMAT, nlp.FEATURIZER,
+             nlp._classifier, nlp._vectorizer, nlp._label_encoder, nlp._compact_model)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, models_dir = os.path.join(tmp, "Resume.csv"), os.path.join(tmp, "models")
+        _write_csv(csv_path)
+        report = train_v2.train_ml_system(csv_path, models_dir, n_estimators=10, ngram_range=(1, 1), n_jobs=1,
+                                          use_cache=False, backends=BACKENDS, lsa_components=0)
+        assert [r["backend"] for r in report["backends"]] == \
+            ["random_forest", "random_forest (compact)", "logreg", "linear_svc"]
+        with open(os.path.join(models_dir, "training_report.json"), 'r', encoding='utf-8') as f:
+            assert json.load(f)["backends"] == report["backends"]
+        with open(os.path.join(models_dir, "classifier_report.md"), 'r', encoding='utf-8') as f:
+            table = f.read()
+        for r in report["backends"]:
+            assert f"| {r['backend']} | {r['accuracy']:.4f} |" in table
+
+        texts = ["audit of the general ledger and tax returns", "pastry chef running a restaurant kitchen",
+                 "lesson plans and grading for the classroom", ""]
+        try:
+            nlp.MODELS_DIR, nlp.MODEL_FORMAT, nlp.FEATURIZER = models_dir, 'pickle', 'tfidf'
+            for backend in BACKENDS:
+                nlp.CLASSIFIER_BACKEND = backend
+                nlp._classifier = nlp._vectorizer = nlp._label_encoder = nlp._compact_model = None
+                features = nlp.get_vectorizer().transform(nlp.clean_texts(texts))
+                roles, confidences, top_roles = nlp.predict_roles(features, top_k=len(VOCAB))
+                assert list(roles[:3]) == list(VOCAB), backend
+                for row, confidence in zip(top_roles, confidences):
+                    assert sorted(role for role, _ in row) == sorted(VOCAB)
+                    # Rounded to 2 decimals per class
+                    assert abs(sum(pct for _, pct in row) - 100) <= 0.01 * len(VOCAB), (backend, row)
+                    assert row[0][1] == confidence
+        finally:
+            (nlp.MODELS_DIR, nlp.CLASSIFIER_BACKEND, nlp.MODEL_FORMAT, nlp.FEATURIZER,
+             nlp._classifier, nlp._vectorizer, nlp._label_encoder, nlp._compact_model) = saved
+
+if __name__ == "__main__":
+    test_every_backend_serves_calibrated_probabilities()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import numpy as np
+import nlp_engine as nlp
+from sklearn.ensemble import RandomForestClassifier
+from scripts.compact_model import export, CompactModel
+
+def _training_data():
+    # The sample resumes, labelled by the category in their file name
+    vect, le = nlp.get_vectorizer(), nlp.get_label_encoder()
+    data_dir = os.path.join(nlp.BASE_DIR, "data")
+    texts, labels = [], []
+    for filename in sorted(os.listdir(data_dir)):
+        category = filename.rsplit("_", 1)[0]
+        if category not in le.classes_:
+            continue
+        with open(os.path.join(data_dir, filename), 'rb') as f:
+            texts.append(nlp.extract_text_universal(f, filename))
+        labels.append(category)
+    X = vect.transform(nlp.clean_texts(texts))
+    clf = RandomForestClassifier(n_estimators=25, random_state=0, n_jobs=1).fit(X, le.transform(labels))
+    return texts, X, clf
+
+def test_compact_model_matches_pickled_models():
+    texts, X, clf = _training_data()
+    vect, le = nlp.get_vectorizer(), nlp.get_label_encoder()
+    extra = ["senior accountant with general ledger and tax experience", "", "python sql aws docker"]
+    with tempfile.TemporaryDirectory() as tmp:
+        export(tmp, clf, vect, le)
+        compact = CompactModel.load(tmp)
+        cleaned = nlp.clean_texts(texts + extra)
+        X_all = vect.transform(cleaned)
+        assert (compact.vectorizer.transform(cleaned) != X_all).nnz == 0
+        assert np.array_equal(compact.classifier.predict_proba(X_all), clf.predict_proba(X_all))
+        assert np.array_equal(compact.classifier.predict(X_all), clf.predict(X_all))
+        assert list(compact.label_encoder.inverse_transform(clf.classes_)) == list(le.inverse_transform(clf.classes_))
+        del compact
+
+def test_nlp_engine_compact_format():
+    texts, X, clf = _training_data()
+    saved = (nlp.MODEL_FORMAT, nlp.COMPACT_MODEL_DIR, nlp._classifier, nlp._vectorizer, nlp._label_encoder, nlp._compact_model)
+    try:
+        nlp._classifier = clf
+        expected = nlp.predict_roles(X, top_k=3)
+        with tempfile.TemporaryDirectory() as tmp:
+            export(tmp, clf, nlp.get_vectorizer(), nlp.get_label_encoder())
+            nlp.MODEL_FORMAT, nlp.COMPACT_MODEL_DIR = 'compact', tmp
+            nlp._classifier = nlp._vectorizer = nlp._label_encoder = nlp._compact_model = None
+            roles, confidences, top_roles = nlp.predict_roles(nlp.get_vectorizer().transform(nlp.clean_texts(texts)), top_k=3)
+            nlp._classifier = nlp._vectorizer = nlp._label_encoder = nlp._compact_model = None
+        assert list(roles) == list(expected[0])
+        assert np.array_equal(confidences, expected[1])
+        assert top_roles == expected[2]
+    finally:
+        (nlp.MODEL_FORMAT, nlp.COMPACT_MODEL_DIR, nlp._classifier, nlp._vectorizer,
+         nlp._label_encoder, nlp._compact_model) = saved
+
+if __name__ == "__main__":
+    test_compact_model_matches_pickled_models()
+    test_nlp_engine_compact_format()
+    print("Compact model predictions match the pickled models.")
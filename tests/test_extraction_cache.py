@@ -0,0 +1,76 @@
+import io
+import os
+import tempfile
+import threading
+import nlp_engine as nlp
+from scripts.extraction_cache import ExtractionCache, extract_cached, extract_many_cached
+
+def test_same_filename_different_bytes():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ExtractionCache(cache_dir)
+        items = [(b"first resume", "cv.txt"), (b"second resume", "cv.txt"), (b"third resume", "cv.txt")]
+        for workers in (1, 2):
+            cache.clear()
+            results = list(extract_many_cached(cache, items, workers=workers, clean=False, vectorize=False,
+                                               indexed=True))
+            assert sorted((i, text) for i, _, text, _, _, _ in results) == \
+                [(0, "first resume"), (1, "second resume"), (2, "third resume")]
+        # Served from the cache now, still one text per upload
+        assert [extract_cached(cache, data, name, clean=False, vectorize=False)[0] for data, name in items] == \
+            ["first resume", "second resume", "third resume"]
+
+def test_failed_extraction_is_not_cached():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ExtractionCache(cache_dir)
+        data = b"not a pdf"
+        assert extract_cached(cache, data, "cv.pdf", clean=False, vectorize=False) == ("", None, None)
+        assert cache.get(cache.key_for(data, "cv.pdf")) is None
+
+def test_txt_keeps_line_endings():
+    data = b"a\r\nb\rc\n\xc3\xa9"
+    assert nlp.extract_text_universal(io.BytesIO(data), "cv.txt") == data.decode('utf-8')
+    assert "".join(nlp.iter_text_universal(io.BytesIO(data), "cv.txt")) == data.decode('utf-8')
+
+def test_filling_cleaned_text_keeps_the_stored_row():
+    vect = nlp.get_vectorizer()
+    calls = []
+    class CountingVectorizer:
+        def transform(self, texts):
+            calls.append(len(texts))
+            return vect.transform(texts)
+    saved = nlp.get_vectorizer
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ExtractionCache(cache_dir)
+        data = b"Senior accountant, general ledger and tax"
+        try:
+            nlp.get_vectorizer = lambda: CountingVectorizer()
+            _, cleaned, row = extract_cached(cache, data, "cv.txt", clean=False, vectorize=True)
+            assert cleaned is None and calls == [1]
+            # Only the cleaned text is new: the TF-IDF row is still valid
+            _, cleaned, again = extract_cached(cache, data, "cv.txt", clean=True, vectorize=True)
+            assert cleaned == nlp.clean_text(data.decode()) and calls == [1]
+            assert (again != row).nnz == 0
+            assert cache.get(cache.key_for(data, "cv.txt"))["row_tag"] == nlp.vectorizer_fingerprint()
+        finally:
+            nlp.get_vectorizer = saved
+
+def test_concurrent_writes_keep_size_accounting():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ExtractionCache(cache_dir, max_bytes=20_000)
+        def writer(n):
+            for i in range(100):
+                cache.put(f"k{n}_{i}", "x" * 500)
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        on_disk = sum(e.stat().st_size for e in os.scandir(cache_dir) if e.is_file())
+        assert cache._size == on_disk <= 20_000
+
+if __name__ == "__main__":
+    test_same_filename_different_bytes()
+    test_failed_extraction_is_not_cached()
+    test_txt_keeps_line_endings()
+    test_filling_cleaned_text_keeps_the_stored_row()
+    test_concurrent_writes_keep_size_accounting()
@@ -0,0 +1,89 @@
+import os
+import io
+import json
+import logging
+import instrumentation
+import nlp_engine as nlp
+
+DATA_DIR = os.path.join(nlp.BASE_DIR, "data")
+
+def _pdfs(n):
+    items = []
+    for filename in sorted(os.listdir(DATA_DIR))[:n]:
+        with open(os.path.join(DATA_DIR, filename), 'rb') as f:
+            items.append((f.read(), filename))
+    return items
+
+def test_disabled_records_nothing():
+    instrumentation.disable()
+    instrumentation.reset()
+    nlp.clean_text("Python, SQL & AWS")
+    nlp.extract_text_universal(io.BytesIO(b"plain text resume"), "cv.txt")
+    assert instrumentation.snapshot() == {"stages": {}, "counters": {}}
+
+def test_stage_timers_and_document_counters():
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        for _ in range(3):
+            nlp.clean_text("Python, SQL & AWS")
+        text = nlp.extract_text_universal(io.BytesIO("résumé text".encode('utf-8')), "cv.txt")
+        data, filename = _pdfs(1)[0]
+        nlp.extract_text_universal(io.BytesIO(data), filename)
+        nlp.extract_text_universal(io.BytesIO(b"not a pdf"), "broken.pdf")
+    finally:
+        instrumentation.disable()
+    snap = instrumentation.snapshot()
+    assert text == "résumé text"
+    assert snap["stages"]["clean_text"]["count"] == 3
+    assert sum(snap["stages"]["clean_text"]["buckets"]) == 3
+    assert snap["stages"]["extract_text"]["count"] == 3
+    counters = snap["counters"]
+    assert counters["extract_documents_total"] == 3
+    assert counters["extract_bytes_total"] == len("résumé text".encode('utf-8')) + len(data) + len(b"not a pdf")
+    assert counters["extract_pages_total"] >= 1
+    assert counters["extract_text_errors_total"] == 1
+
+def test_worker_metrics_are_merged():
+    items = _pdfs(3)
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        results = list(nlp.extract_many(items, workers=2))
+    finally:
+        instrumentation.disable()
+    snap = instrumentation.snapshot()
+    assert len(results) == 3
+    assert snap["stages"]["extract_text"]["count"] == 3
+    assert snap["counters"]["extract_bytes_total"] == sum(len(data) for data, _ in items)
+
+def test_exports():
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        nlp.clean_text("a b c")
+        instrumentation.count("documents_total", 2)
+    finally:
+        instrumentation.disable()
+    text = instrumentation.prometheus_text()
+    assert 'proscreen_stage_seconds_count{stage="clean_text"} 1' in text
+    assert 'proscreen_stage_seconds_bucket{stage="clean_text",le="+Inf"} 1' in text
+    assert "proscreen_documents_total 2" in text
+
+    records = []
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            records.append(json.loads(record.getMessage()))
+    log = logging.getLogger("test_instrumentation")
+    log.addHandler(ListHandler())
+    log.setLevel(logging.INFO)
+    instrumentation.log_metrics(log)
+    assert records[0]["stage"] == "clean_text" and records[0]["count"] == 1
+    assert records[-1] == {"counters": {"documents_total": 2}}
+
+if __name__ == "__main__":
+    test_disabled_records_nothing()
+    test_stage_timers_and_document_counters()
+    test_worker_metrics_are_merged()
+    test_exports()
+    print("Instrumentation records and exports the pipeline stages.")
@@ -0,0 +1,58 @@
+import os
+import nlp_engine as nlp
+from sklearn.ensemble import RandomForestClassifier
+from scripts.near_duplicates import NearDuplicateIndex, find_duplicates
+from scripts.skill_automaton import SkillAutomaton
+
+def _resumes():
+    data_dir = os.path.join(nlp.BASE_DIR, "data")
+    texts = []
+    for filename in sorted(os.listdir(data_dir)):
+        with open(os.path.join(data_dir, filename), 'rb') as f:
+            texts.append(nlp.extract_text_universal(f, filename))
+    return texts
+
+def _mutate(text, every=50):
+    # Replaces every `every`-th word, a light re-submission edit
+    words = text.split()
+    return " ".join("changed" if i % every == 0 else w for i, w in enumerate(words))
+
+def test_find_duplicates_clusters_copies_only():
+    cleaned = nlp.clean_texts(_resumes()[:8])
+    texts = cleaned + [cleaned[2], _mutate(cleaned[5]), "", ""]
+    reps = find_duplicates(texts)
+    assert reps[:8] == [None] * 8
+    assert reps[8] == 2 and reps[9] == 5
+    # Empty texts are never clustered together
+    assert reps[10] is None and reps[11] is None
+    index = NearDuplicateIndex(threshold=0.8)
+    assert index.add("a", cleaned[0]) is None
+    assert index.add("b", cleaned[0]) == "a"
+    assert index.add("c", cleaned[1]) is None
+
+def test_screen_batch_scores_duplicates_once():
+    texts = _resumes()
+    le = nlp.get_label_encoder()
+    labelled = [(t, f.rsplit("_", 1)[0]) for t, f in zip(texts, sorted(os.listdir(os.path.join(nlp.BASE_DIR, "data"))))
+                if f.rsplit("_", 1)[0] in le.classes_]
+    X = nlp.get_vectorizer().transform(nlp.clean_texts([t for t, _ in labelled]))
+    clf = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, le.transform([c for _, c in labelled]))
+    saved = nlp._classifier
+    try:
+        nlp._classifier = clf
+        batch = texts[:4] + [texts[1], texts[3]]
+        matcher = SkillAutomaton.build(["Accounting", "Python", "Sales", "Teaching"])
+        plain = nlp.screen_batch("accountant with tax experience", ["Accounting"], batch, matcher, dedup=False)
+        results = nlp.screen_batch("accountant with tax experience", ["Accounting"], batch, matcher, dedup=True)
+        assert "Duplicate Of" not in plain[0]
+        assert [r["Duplicate Of"] for r in results] == [None, None, None, None, 1, 3]
+        for res, ref in zip(results, plain):
+            assert res["Rank Score"] == ref["Rank Score"] and res["Skills"] == ref["Skills"]
+        results[4]["Skills"].append("Mutated")
+        assert "Mutated" not in results[1]["Skills"]
+    finally:
+        nlp._classifier = saved
+
+if __name__ == "__main__":
+    test_find_duplicates_clusters_copies_only()
+    test_screen_batch_scores_duplicates_once()
@@ -0,0 +1,89 @@
+import threading
+import numpy as np
+import nlp_engine as nlp
+from sklearn.ensemble import RandomForestClassifier
+
+TEXTS = ["general ledger tax audit payroll accountant", "kitchen menu chef cooking restaurant pastry",
+         "classroom curriculum students lesson teacher", "python sql aws docker developer"]
+
+def _data():
+    le = nlp.get_label_encoder()
+    labels = list(le.classes_[:len(TEXTS)])
+    X = nlp.get_vectorizer().transform(nlp.clean_texts(TEXTS))
+    return X, le.transform(labels)
+
+def _reference(clf, text):
+    # The original predict_category: predict() for the label, max of
+    # predict_proba for the confidence
+    features = nlp.get_vectorizer().transform([nlp.clean_text(text)])
+    prediction = clf.predict(features)[0]
+    confidence = round(np.max(clf.predict_proba(features)[0]) * 100, 2)
+    return nlp.get_label_encoder().inverse_transform([prediction])[0], confidence
+
+def _check(clf, texts):
+    saved = nlp._classifier
+    try:
+        nlp._classifier = clf
+        expected = [_reference(clf, text) for text in texts]
+        assert [nlp.predict_category(text) for text in texts] == expected
+        features = nlp.get_vectorizer().transform(nlp.clean_texts(texts))
+        for n_jobs in (None, 2):
+            roles, confidences = nlp.predict_category_batch(features, n_jobs=n_jobs)
+            assert list(zip(roles, confidences)) == expected
+        return nlp.predict_roles(features, top_k=3)
+    finally:
+        nlp._classifier = saved
+
+def test_fused_inference_matches_predict_and_max_proba():
+    X, y = _data()
+    clf = RandomForestClassifier(n_estimators=15, random_state=0, n_jobs=1).fit(X, y)
+    _check(clf, TEXTS + ["", "ledger and kitchen", "students learning python"])
+
+def test_ties_pick_the_first_class_like_predict():
+    # The same document under two labels: one unbootstrapped tree gives it
+    # 50/50, and the rest of the classes 0, so every top-k slot is a tie
+    X, y = _data()
+    features = nlp.get_vectorizer().transform(nlp.clean_texts([TEXTS[0], TEXTS[0]]))
+    clf = RandomForestClassifier(n_estimators=1, bootstrap=False, random_state=0).fit(features, y[[2, 1]])
+    _, _, top_roles = _check(clf, [TEXTS[0], "anything else"])
+    first, second = nlp.get_label_encoder().inverse_transform(np.sort(y[[2, 1]]))
+    assert top_roles[0] == [(first, 50.0), (second, 50.0)]
+
+class _SharedStateProbe(RandomForestClassifier):
+    # Records the shared instance's n_jobs while any copy predicts
+    shared = None
+    seen = []
+
+    def predict_proba(self, X):
+        _SharedStateProbe.seen.append(_SharedStateProbe.shared.n_jobs)
+        return super().predict_proba(X)
+
+def test_n_jobs_does_not_touch_the_shared_classifier():
+    X, y = _data()
+    clf = _SharedStateProbe(n_estimators=20, random_state=0, n_jobs=1).fit(X, y)
+    _SharedStateProbe.shared = clf
+    saved = nlp._classifier
+    errors = []
+    def worker(n_jobs):
+        try:
+            for _ in range(5):
+                roles, _ = nlp.predict_category_batch(X, n_jobs=n_jobs)
+                assert list(roles) == list(nlp.get_label_encoder().inverse_transform(clf.predict(X)))
+        except Exception as e:
+            errors.append(e)
+    try:
+        nlp._classifier = clf
+        threads = [threading.Thread(target=worker, args=(n,)) for n in (2, 3, None, 2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        nlp._classifier = saved
+    assert not errors and clf.n_jobs == 1
+    assert set(_SharedStateProbe.seen) == {1}
+
+if __name__ == "__main__":
+    test_fused_inference_matches_predict_and_max_proba()
+    test_ties_pick_the_first_class_like_predict()
+    test_n_jobs_does_not_touch_the_shared_classifier()
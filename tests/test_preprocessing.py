@@ -0,0 +1,60 @@
+import os
+import re
+import random
+import nlp_engine as nlp
+
+# The seven-step clean_text as it shipped before the patterns were compiled
+# and merged; nlp.clean_text must stay byte-identical to it since the TF-IDF
+# vectorizer was fitted on this exact output.
+def reference_clean_text(text):
+    text = re.sub(r'http\S+\s*', ' ', text)
+    text = re.sub(r'RT|cc', ' ', text)
+    text = re.sub(r'#\S+', ' ', text)
+    text = re.sub(r'@\S+', ' ', text)
+    text = re.sub('[%s]' % re.escape("""!"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~"""), ' ', text)
+    text = re.sub(r'[^\x00-\x7f]', r' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.lower().strip()
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "Visit http://example.com/path?q=1 now",
+    "RT @user: #Python and ccTLD accounts, RTcc",
+    "naïve café — “quotes” ﬁ ligature nbsp em-space",
+    "tabs\tand\nnewlines\r\nand\x0bvertical\x0cfeed\x1cfile\x1dgroup\x1erecord\x1funit",
+    "C++ / C# / .NET / Node.js / R&D / 100% / $50k",
+    "emoji 🚀 and surrogate-free astral 𝔘𝔫𝔦𝔠𝔬𝔡𝔢",
+    "[brackets] {braces} (parens) back\\slash ^caret_ `tick` |pipe| ~tilde",
+    "httpshttp://a b#c@d",
+]
+
+def test_clean_text_edge_cases():
+    for text in EDGE_CASES:
+        assert nlp.clean_text(text) == reference_clean_text(text), repr(text)
+
+def test_clean_text_every_ascii_char():
+    for i in range(128):
+        text = f"a{chr(i)}b {chr(i)} {chr(i)}{chr(i)}c"
+        assert nlp.clean_text(text) == reference_clean_text(text), i
+
+def test_clean_text_random_strings():
+    rng = random.Random(0)
+    alphabet = [chr(i) for i in range(128)] + list("éü—“”•ï¼​  　😀") + ["http", "RT", "cc", "#", "@"]
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        assert nlp.clean_text(text) == reference_clean_text(text), repr(text)
+
+def test_clean_text_sample_resumes():
+    data_dir = os.path.join(nlp.BASE_DIR, "data")
+    for filename in sorted(os.listdir(data_dir)):
+        with open(os.path.join(data_dir, filename), 'rb') as f:
+            text = nlp.extract_text_universal(f, filename)
+        assert nlp.clean_text(text) == reference_clean_text(text), filename
+
+if __name__ == "__main__":
+    test_clean_text_edge_cases()
+    test_clean_text_every_ascii_char()
+    test_clean_text_random_strings()
+    test_clean_text_sample_resumes()
+    print("clean_text matches the reference implementation.")
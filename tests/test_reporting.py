@@ -0,0 +1,62 @@
+import io
+import os
+import csv
+import tempfile
+from scripts import reporting
+
+def _results(n):
+    roles = ["ACCOUNTANT", "CHEF", "TEACHER"]
+    return [{
+        "Candidate": f"candidate_{i}.pdf", "Rank Score": round((i * 37) % 100 + 0.5, 2),
+        "Semantic Sim %": 50.0, "Skill Match %": 40.0, "Predicted Role": roles[i % 3], "ML Conf %": 60.0,
+        "Top Roles": [(roles[i % 3], 60.0), (roles[(i + 1) % 3], 20.0)],
+        "Skills": ["Accounting"], "Gaps": ["Auditing", "Quickbooks"],
+    } for i in range(n)]
+
+def test_pdf_size_is_bounded_by_top_k():
+    results = _results(600)
+    small = reporting.generate_pdf_report("JD", ["Accounting"], results, top_k=10)
+    full = reporting.generate_pdf_report("JD", ["Accounting"], results, top_k=600)
+    assert small.startswith(b"%PDF")
+    assert len(small) * 10 < len(full)
+    # Names outside latin-1 must not break the core fonts
+    unicode_name = dict(results[0], Candidate="Zoë Łukasz 陈.pdf")
+    assert reporting.generate_pdf_report("JD", [], [unicode_name]).startswith(b"%PDF")
+
+def test_csv_export_is_ranked_and_complete():
+    results = _results(50) + [{"Candidate": "broken.pdf", "Error": "no text extracted"}]
+    rows = list(csv.DictReader(io.StringIO(reporting.export_csv(results).decode("utf-8"))))
+    assert len(rows) == 50
+    scores = [float(r["Rank Score"]) for r in rows]
+    assert scores == sorted(scores, reverse=True)
+    assert [r["Rank"] for r in rows[:3]] == ["1", "2", "3"]
+    assert rows[0]["Gaps"] == "Auditing, Quickbooks"
+
+def test_background_report_writes_to_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.pdf")
+        future = reporting.submit_report("pdf", "JD", ["Accounting"], _results(100), path, top_k=5)
+        assert future.result(timeout=60) == path
+        with open(path, "rb") as f:
+            assert f.read(4) == b"%PDF"
+
+def test_pdf_splits_ties_once():
+    # Equal scores around the cut: every candidate is either detailed or
+    # summarized, never both; duplicates and failed files are left out
+    results = [dict(r, **{"Rank Score": 50.0}) for r in _results(12)]
+    results += [dict(results[0], Candidate="copy.pdf", **{"Duplicate Of": "candidate_0.pdf"}),
+                {"Candidate": "broken.pdf", "Error": "no text extracted"}]
+    summarized = []
+    saved = reporting._pool_summary
+    reporting._pool_summary = lambda pdf, rest: summarized.extend(rest)
+    try:
+        assert reporting.generate_pdf_report("JD", [], results, top_k=5).startswith(b"%PDF")
+    finally:
+        reporting._pool_summary = saved
+    assert [r["Candidate"] for r in summarized] == [f"candidate_{i}.pdf" for i in range(5, 12)]
+
+if __name__ == "__main__":
+    test_pdf_size_is_bounded_by_top_k()
+    test_csv_export_is_ranked_and_complete()
+    test_background_report_writes_to_disk()
+    test_pdf_splits_ties_once()
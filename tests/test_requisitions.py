@@ -0,0 +1,64 @@
+import os
+import numpy as np
+import nlp_engine as nlp
+from scripts.requisitions import cross_rank, rank_requisitions, result_rows
+from scripts.skill_bits import SkillMatrix
+
+def _brute_force(sims, skills, jd_skills):
+    return np.array([[s * 50 + nlp.skill_match_ratio(targets, found) * 50 for targets, s in zip(jd_skills, row)]
+                     for row, found in zip(sims, skills)])
+
+def test_cross_rank_matches_brute_force_in_any_block_size():
+    rng = np.random.default_rng(0)
+    bank = [f"Skill {i}" for i in range(40)]
+    n = 700
+    sims = rng.random((n, 6))
+    skills = [list(rng.choice(bank, rng.integers(0, 10), replace=False)) for _ in range(n)]
+    jd_skills = [list(rng.choice(bank, 4, replace=False)) for _ in range(4)] + [[], ["Skill 1", "Skill 1", "Other"]]
+    totals = _brute_force(sims, skills, jd_skills)
+    skill_bits = SkillMatrix.encode(skills)
+    results = [cross_rank(lambda start, end: sims[start:end], n, jd_skills, skill_bits, top_k=15, top_jobs=2,
+                          block_rows=block) for block in (None, 64, 1)]
+    for by_jd, by_candidate in results:
+        assert by_jd["rows"].shape == (6, 15) and by_candidate["jds"].shape == (n, 2)
+        for j in range(6):
+            assert np.allclose(by_jd["scores"][j], np.sort(totals[:, j])[::-1][:15])
+            assert np.allclose(by_jd["scores"][j], totals[by_jd["rows"][j], j])
+            assert np.allclose(by_jd["semantic"][j], sims[by_jd["rows"][j], j])
+        assert np.allclose(by_candidate["scores"], -np.sort(-totals, axis=1)[:, :2])
+        assert np.allclose(np.take_along_axis(totals, by_candidate["jds"], axis=1), by_candidate["scores"])
+    # A JD without target skills scores skills as a full match
+    assert (results[0][0]["skill"][4] == 1.0).all()
+
+def test_rank_requisitions_on_resumes():
+    data_dir = os.path.join(nlp.BASE_DIR, "data")
+    names = sorted(os.listdir(data_dir))
+    texts = []
+    for filename in names:
+        with open(os.path.join(data_dir, filename), 'rb') as f:
+            texts.append(nlp.extract_text_universal(f, filename))
+    requisitions = [("acc", "Senior accountant, general ledger and tax", ["Accounting", "Excel"]),
+                    ("chef", "Executive chef for a busy kitchen", ["Menu Development"])]
+    saved = nlp.SKILL_MATCHER_BACKEND
+    try:
+        # The automaton needs no spaCy model
+        nlp.SKILL_MATCHER_BACKEND = 'automaton'
+        by_jd, by_candidate = rank_requisitions(requisitions, texts, top_k=3, top_jobs=1)
+        vect = nlp.get_vectorizer()
+        features = vect.transform(nlp.clean_texts(texts))
+        for j, (req_id, jd, targets) in enumerate(requisitions):
+            sims = nlp.semantic_similarity(features, vect.transform([nlp.clean_text(jd)]))
+            found = nlp.extract_skills_batch(texts, nlp.get_skills_matcher(targets))
+            scores = [nlp.combine_scores(s, nlp.skill_match_ratio(targets, f))[0] for s, f in zip(sims, found)]
+            assert [scores[r] for r in by_jd["rows"][j]] == sorted(scores, reverse=True)[:3]
+    finally:
+        nlp.SKILL_MATCHER_BACKEND = saved
+    job_rows, candidate_rows = result_rows(requisitions, names, by_jd, by_candidate)
+    assert [r["Requisition"] for r in job_rows] == ["acc"] * 3 + ["chef"] * 3
+    assert [r["Rank"] for r in job_rows[:3]] == [1, 2, 3] and job_rows[0]["Candidate"] in names
+    assert len(candidate_rows) == len(texts)
+    assert rank_requisitions(requisitions, [])[0]["rows"].shape == (2, 0)
+
+if __name__ == "__main__":
+    test_cross_rank_matches_brute_force_in_any_block_size()
+    test_rank_requisitions_on_resumes()
@@ -0,0 +1,133 @@
+import os
+import hashlib
+import tempfile
+import numpy as np
+import nlp_engine as nlp
+from sklearn.ensemble import RandomForestClassifier
+from scripts import resume_index
+from scripts.resume_index import ResumeIndex
+
+JD = "Python developer with SQL, AWS and Docker; management experience a plus."
+TARGETS = ["Python", "Sql", "Aws", "Docker", "Management"]
+
+def _resumes(n=12):
+    data_dir = os.path.join(nlp.BASE_DIR, "data")
+    items = []
+    for filename in sorted(os.listdir(data_dir))[:n]:
+        with open(os.path.join(data_dir, filename), 'rb') as f:
+            text = nlp.extract_text_universal(f, filename)
+        items.append((text.encode('utf-8'), os.path.splitext(filename)[0] + ".txt"))
+    items.append((b"Python and SQL on AWS with Docker, team management.", "engineer.txt"))
+    return items
+
+def _classifier(items):
+    le = nlp.get_label_encoder()
+    labelled = [(data.decode('utf-8'), name.rsplit("_", 1)[0]) for data, name in items
+                if name.rsplit("_", 1)[0] in le.classes_]
+    X = nlp.get_vectorizer().transform(nlp.clean_texts([t for t, _ in labelled]))
+    return RandomForestClassifier(n_estimators=10, random_state=0, n_jobs=1).fit(X, le.transform([c for _, c in labelled]))
+
+def _is_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+def _with_models(test):
+    def wrapper():
+        saved = nlp._classifier, nlp.SKILL_MATCHER_BACKEND, nlp._bank_matcher, nlp.SEMANTIC
+        try:
+            nlp._classifier = _classifier(_resumes())
+            # The automaton needs no spaCy model
+            nlp.SKILL_MATCHER_BACKEND, nlp._bank_matcher, nlp.SEMANTIC = 'automaton', None, 'tfidf'
+            test()
+        finally:
+            nlp._classifier, nlp.SKILL_MATCHER_BACKEND, nlp._bank_matcher, nlp.SEMANTIC = saved
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+@_with_models
+def test_round_trip_ranks_like_screen_batch():
+    items = _resumes()
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ResumeIndex(tmp)
+        assert index.add_files(items, workers=1) == len(items)
+        index.save()
+        loaded = ResumeIndex(tmp)
+        assert len(loaded) == len(items)
+        assert all(_is_mapped(a) for a in (loaded.matrix.data, loaded.matrix.indices, loaded.matrix.indptr))
+        ranked = loaded.rank(JD, TARGETS, top_k=None)
+        assert len(ranked) == len(items)
+
+        texts = [data.decode('utf-8') for data, _ in items]
+        expected = nlp.screen_batch(JD, TARGETS, texts, dedup=False)
+        by_name = {name: res for (_, name), res in zip(items, expected)}
+        for res in ranked:
+            want = by_name[res["Candidate"]]
+            assert res["Rank Score"] == want["Rank Score"]
+            assert res["Skill Match %"] == want["Skill Match %"]
+            assert res["Gaps"] == want["Gaps"]
+            assert sorted(res["Skills"]) == sorted(want["Skills"])
+            assert (res["Predicted Role"], res["ML Conf %"]) == (want["Predicted Role"], want["ML Conf %"])
+        scores = [res["Rank Score"] for res in ranked]
+        assert scores == sorted(scores, reverse=True) and ranked[0]["Candidate"] == "engineer.txt"
+
+@_with_models
+def test_changed_vectorizer_forces_rebuild():
+    items = _resumes(4)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ResumeIndex(os.path.join(tmp, "index"))
+        index.add_files(items, workers=1)
+        index.save()
+        saved = nlp.vectorizer_fingerprint
+        try:
+            nlp.vectorizer_fingerprint = lambda: "tfidf_vectorizer_v2.pkl:retrained"
+            stale = ResumeIndex(os.path.join(tmp, "index"))
+            assert stale.is_stale()
+            for query in (lambda: stale.rank(JD, TARGETS), lambda: stale.add_files([(b"new resume", "new.txt")]),
+                          lambda: stale.rank_requisitions([("r", JD, TARGETS)])):
+                try:
+                    query()
+                    assert False, "stale index used"
+                except RuntimeError:
+                    pass
+            # build starts over with the current vectorizer
+            input_dir = os.path.join(tmp, "in")
+            os.makedirs(input_dir)
+            for data, name in items[:2]:
+                with open(os.path.join(input_dir, name), 'wb') as f:
+                    f.write(data)
+            resume_index.main(["build", "--index", os.path.join(tmp, "index"), "--input", input_dir, "--workers", "1"])
+            rebuilt = ResumeIndex(os.path.join(tmp, "index"))
+            assert not rebuilt.is_stale() and rebuilt.vectorizer_tag == "tfidf_vectorizer_v2.pkl:retrained"
+            assert sorted(rebuilt.names) == sorted(name for _, name in items[:2])
+        finally:
+            nlp.vectorizer_fingerprint = saved
+
+@_with_models
+def test_add_files_replaces_a_changed_file():
+    items = _resumes(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = ResumeIndex(tmp)
+        index.add_files(items, workers=1)
+        index.save()
+        index = ResumeIndex(tmp)
+        # Unchanged bytes are skipped, new bytes under a known name replace the row
+        assert index.add_files(items[:2], workers=1) == 0
+        assert index.add_files([(b"Python, SQL, AWS and Docker engineer", items[1][1])], workers=1) == 1
+        index.save()
+        index = ResumeIndex(tmp)
+        assert len(index) == len(items) and sorted(index.names) == sorted(name for _, name in items)
+        assert index.matrix.shape[0] == len(index.skill_bits) == len(items)
+        row = index.names.index(items[1][1])
+        assert index.ids[row] == hashlib.sha256(b"Python, SQL, AWS and Docker engineer").hexdigest()
+        assert sorted(index.skills[row]) == ["Aws", "Docker", "Python", "Sql"]
+        assert sorted(index.skill_bits.skills_of(row)) == ["Aws", "Docker", "Python", "Sql"]
+        ranked = {res["Candidate"]: res for res in index.rank(JD, TARGETS, top_k=None)}
+        assert len(ranked) == len(items) and ranked[items[1][1]]["Gaps"] == ["Management"]
+
+if __name__ == "__main__":
+    test_round_trip_ranks_like_screen_batch()
+    test_changed_vectorizer_forces_rebuild()
+    test_add_files_replaces_a_changed_file()
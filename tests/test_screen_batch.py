@@ -0,0 +1,56 @@
+import os
+import spacy
+import nlp_engine as nlp
+from sklearn.ensemble import RandomForestClassifier
+
+JD = "Senior accountant for general ledger, tax and payroll. Excel and QuickBooks, some Python and SQL."
+TARGETS = ["Accounting", "Excel", "Python", "Sql", "Payroll"]
+
+def _resumes():
+    data_dir = os.path.join(nlp.BASE_DIR, "data")
+    names, texts = [], []
+    for filename in sorted(os.listdir(data_dir)):
+        with open(os.path.join(data_dir, filename), 'rb') as f:
+            names.append(filename)
+            texts.append(nlp.extract_text_universal(f, filename))
+    return names, texts
+
+def _classifier(names, texts):
+    le = nlp.get_label_encoder()
+    labelled = [(t, n.rsplit("_", 1)[0]) for n, t in zip(names, texts) if n.rsplit("_", 1)[0] in le.classes_]
+    X = nlp.get_vectorizer().transform(nlp.clean_texts([t for t, _ in labelled]))
+    return RandomForestClassifier(n_estimators=15, random_state=0, n_jobs=1).fit(X, le.transform([c for _, c in labelled]))
+
+def _per_file(jd_text, targets, text, matcher):
+    # The path screen_batch replaced, one resume at a time
+    role, conf = nlp.get_ml_prediction(text)
+    skills = nlp.extract_skills(text, matcher)
+    score, semantic_sim, skill_pct = nlp.calculate_match_score(jd_text, text, targets, skills)
+    return {"Rank Score": score, "Predicted Role": role, "ML Conf %": conf, "Semantic Sim %": semantic_sim,
+            "Skill Match %": skill_pct, "Skills": sorted(skills), "Gaps": nlp.identify_gap(targets, skills)}
+
+def test_screen_batch_matches_per_file_path():
+    names, texts = _resumes()
+    texts += ["", "python sql excel payroll"]
+    saved = nlp._classifier, nlp._nlp
+    try:
+        nlp._classifier = _classifier(names, texts)
+        try:
+            nlp.get_nlp()
+        except OSError:
+            # Only the tokenizer is used for skill matching
+            nlp._nlp = spacy.blank("en")
+        for targets in (TARGETS, []):
+            matcher = nlp.get_skills_matcher(targets if targets else nlp.get_skill_bank())
+            batch = nlp.screen_batch(JD, targets, texts, matcher, dedup=False)
+            assert len(batch) == len(texts)
+            for text, res in zip(texts, batch):
+                expected = _per_file(JD, targets, text, matcher)
+                got = {k: (sorted(res[k]) if k == "Skills" else res[k]) for k in expected}
+                assert got == expected
+                assert res["Top Roles"][0] == (res["Predicted Role"], res["ML Conf %"])
+    finally:
+        nlp._classifier, nlp._nlp = saved
+
+if __name__ == "__main__":
+    test_screen_batch_matches_per_file_path()
@@ -0,0 +1,150 @@
+import os
+import csv
+import json
+import tempfile
+import nlp_engine as nlp
+from sklearn.ensemble import RandomForestClassifier
+from scripts import screen_cli
+
+JD = "Senior accountant: general ledger, tax, payroll, Excel and some Python."
+TARGETS = ["Accounting", "Excel", "Python", "Payroll"]
+
+def _make_tree(root):
+    # The sample resumes as .txt files in two subdirectories, plus two
+    # different resumes under the same filename
+    data_dir = os.path.join(nlp.BASE_DIR, "data")
+    for i, filename in enumerate(sorted(os.listdir(data_dir))[:10]):
+        with open(os.path.join(data_dir, filename), 'rb') as f:
+            text = nlp.extract_text_universal(f, filename)
+        sub = os.path.join(root, "batch_a" if i % 2 else "batch_b")
+        os.makedirs(sub, exist_ok=True)
+        with open(os.path.join(sub, os.path.splitext(filename)[0] + ".txt"), 'w', encoding='utf-8') as f:
+            f.write(text)
+    for sub, text in (("batch_a", "Accountant: general ledger, payroll, Excel."), ("batch_b", "Python developer.")):
+        with open(os.path.join(root, sub, "cv.txt"), 'w', encoding='utf-8') as f:
+            f.write(text)
+    return screen_cli.find_documents(root)
+
+def _fitted_classifier():
+    le = nlp.get_label_encoder()
+    texts = ["general ledger tax audit payroll accountant", "kitchen menu chef cooking restaurant"]
+    labels = [c for c in ("ACCOUNTANT", "CHEF") if c in le.classes_]
+    X = nlp.get_vectorizer().transform(nlp.clean_texts(texts[:len(labels)]))
+    return RandomForestClassifier(n_estimators=5, random_state=0).fit(X, le.transform(labels))
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        return list(csv.DictReader(f))
+
+class _Interrupt(BaseException):
+    pass
+
+def _run(*args, fail_on_call=None, **kwargs):
+    # screen_directory with an interrupt (not an Exception, so the run
+    # really stops) raised on the given screen_batch call
+    calls = []
+    original = nlp.screen_batch
+    def screen_batch(*a, **k):
+        calls.append(1)
+        if len(calls) == fail_on_call:
+            raise _Interrupt()
+        return original(*a, **k)
+    nlp.screen_batch = screen_batch
+    try:
+        screen_cli.screen_directory(JD, TARGETS, *args, **kwargs)
+    except _Interrupt:
+        pass
+    finally:
+        nlp.screen_batch = original
+
+def _with_models(test):
+    def wrapper():
+        saved = nlp._classifier, nlp.SKILL_MATCHER_BACKEND
+        try:
+            nlp._classifier = _fitted_classifier()
+            nlp.SKILL_MATCHER_BACKEND = 'automaton'
+            test()
+        finally:
+            nlp._classifier, nlp.SKILL_MATCHER_BACKEND = saved
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+def test_trim_partial_row():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out.csv")
+        with open(path, 'wb') as f:
+            f.write(b"Candidate,Error\na.txt,x\nb.txt,y\nc.t")
+        screen_cli.trim_partial_row(path)
+        with open(path, 'rb') as f:
+            assert f.read() == b"Candidate,Error\na.txt,x\nb.txt,y\n"
+        screen_cli.trim_partial_row(path)
+        with open(path, 'rb') as f:
+            assert f.read() == b"Candidate,Error\na.txt,x\nb.txt,y\n"
+        with open(path, 'wb') as f:
+            f.write(b"no newline at all")
+        screen_cli.trim_partial_row(path)
+        assert os.path.getsize(path) == 0
+        screen_cli.trim_partial_row(os.path.join(tmp, "missing.csv"))
+
+@_with_models
+def test_resume_after_interrupt_writes_every_file_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "in")
+        documents = _make_tree(root)
+        assert "batch_a/cv.txt" in documents and "batch_b/cv.txt" in documents
+        for ext in ("csv", "jsonl"):
+            reference = os.path.join(tmp, "reference." + ext)
+            _run(root, reference, workers=2, batch_size=3)
+            expected = {r["Candidate"]: r["Rank Score"] for r in _read(reference)}
+            assert sorted(expected) == documents
+
+            output = os.path.join(tmp, "out." + ext)
+            _run(root, output, workers=2, batch_size=3, fail_on_call=3)
+            assert 0 < len(_read(output)) < len(documents)
+            # A crash after the rows reached the disk but before the
+            # checkpoint did, in the middle of writing one more row
+            with open(output + ".checkpoint", 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+            with open(output + ".checkpoint", 'w', encoding='utf-8') as f:
+                f.writelines(lines[:-2])
+            with open(output, 'a', encoding='utf-8') as f:
+                f.write('{"Candidate": "batch_a/cut' if ext == "jsonl" else "batch_a/cut.txt,12.")
+
+            _run(root, output, workers=2, batch_size=3)
+            rows = _read(output)
+            assert sorted(r["Candidate"] for r in rows) == documents
+            assert {r["Candidate"]: r["Rank Score"] for r in rows} == expected
+            assert len(screen_cli.load_results(output)) == len(documents)
+        # Same filename, different resumes: both rows, each with its own score
+        assert expected["batch_a/cv.txt"] != expected["batch_b/cv.txt"]
+
+@_with_models
+def test_scoring_failure_writes_error_rows_and_continues():
+    original = nlp.screen_batch
+    def screen_batch(jd_text, target_skills, texts, *a, **k):
+        if any("Python developer" in t for t in texts):
+            raise ValueError("bad batch")
+        return original(jd_text, target_skills, texts, *a, **k)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "in")
+        documents = _make_tree(root)
+        for dedup in (False, True):
+            output = os.path.join(tmp, f"out_{dedup}.jsonl")
+            nlp.screen_batch = screen_batch
+            try:
+                screen_cli.screen_directory(JD, TARGETS, root, output, workers=1, batch_size=4, dedup=dedup)
+            finally:
+                nlp.screen_batch = original
+            rows = _read(output)
+            assert sorted(r["Candidate"] for r in rows) == documents
+            failed = [r for r in rows if "Error" in r]
+            assert "batch_b/cv.txt" in [r["Candidate"] for r in failed]
+            assert all(r["Error"] == "scoring failed: bad batch" for r in failed)
+            assert 0 < len(failed) <= 4 and len(screen_cli.load_results(output)) == len(documents) - len(failed)
+
+if __name__ == "__main__":
+    test_trim_partial_row()
+    test_resume_after_interrupt_writes_every_file_once()
+    test_scoring_failure_writes_error_rows_and_continues()
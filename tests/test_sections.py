@@ -0,0 +1,83 @@
+import os
+import re
+import nlp_engine as nlp
+from scripts.sections import segment, section_text, parse_sections
+from scripts.skill_automaton import SkillAutomaton
+
+RESUME = """Jane Doe
+jane@example.com
+PROFESSIONAL SUMMARY
+Accountant with ten years of experience.
+Skills: QuickBooks, Excel
+Work History
+Senior Accountant, Acme. Managed general ledger and payroll.
+Education and Training
+B.Sc. Accounting
+Interests
+Python and chess
+"""
+
+LINKEDIN = """Contact
+www.linkedin.com/in/johndoe (LinkedIn)
+Top Skills
+Python
+Machine Learning
+Summary
+Data scientist.
+Experience
+Senior Data Scientist
+Education
+MIT
+"""
+
+def test_segment_offsets_and_titles():
+    sections = segment(RESUME)
+    assert [name for name, _, _ in sections] == ["preamble", "summary", "skills", "experience", "education",
+                                                 "interests"]
+    bodies = {name: RESUME[start:end].strip() for name, start, end in sections}
+    assert bodies["preamble"] == "Jane Doe\njane@example.com"
+    # Inline header: the body starts right after the colon
+    assert bodies["skills"] == "QuickBooks, Excel"
+    assert bodies["experience"].startswith("Senior Accountant")
+    # Section words inside sentences are not headers
+    assert "experience." in bodies["summary"]
+    assert segment("") == [] and segment("no headers here") == [("preamble", 0, 15)]
+
+def test_section_text_and_linkedin():
+    assert section_text(RESUME, ("skills", "experience")).split() == \
+        "QuickBooks, Excel Senior Accountant, Acme. Managed general ledger and payroll.".split()
+    # Without any of the chosen sections the whole document is kept
+    assert section_text("just text", ("skills",)) == "just text"
+    assert parse_sections(" Skills, experience ") == ("skills", "experience")
+    try:
+        parse_sections("skills,hobbyz")
+        assert False, "unknown section accepted"
+    except ValueError:
+        pass
+    li = nlp.extract_linkedin_sections(LINKEDIN)
+    assert li == {"Summary": "Data scientist.", "Experience": "Senior Data Scientist",
+                  "Skills": "Python\nMachine Learning"}
+
+def test_is_linkedin_pdf_matches_regex_scan():
+    patterns = [r"Contact\s+www\.linkedin\.com", r"Top\s+Skills", r"Languages", r"Certifications", r"Summary",
+                r"Experience", r"Education"]
+    data_dir = os.path.join(nlp.BASE_DIR, "data")
+    texts = [LINKEDIN, RESUME, "", "Top  Skills Languages Contact\nwww.linkedin.com"]
+    for filename in sorted(os.listdir(data_dir)):
+        with open(os.path.join(data_dir, filename), 'rb') as f:
+            texts.append(nlp.extract_text_universal(f, filename))
+    for text in texts:
+        assert nlp.is_linkedin_pdf(text) == (sum(1 for p in patterns if re.search(p, text)) >= 3)
+
+def test_skills_on_chosen_sections_only():
+    matcher = SkillAutomaton.build(["Python", "Excel", "Payroll"])
+    full = nlp.extract_skills_batch([RESUME], matcher)[0]
+    focused = nlp.extract_skills_batch(nlp.focus_sections([RESUME], "skills,experience"), matcher)[0]
+    assert sorted(full) == ["Excel", "Payroll", "Python"]
+    assert sorted(focused) == ["Excel", "Payroll"]
+
+if __name__ == "__main__":
+    test_segment_offsets_and_titles()
+    test_section_text_and_linkedin()
+    test_is_linkedin_pdf_matches_regex_scan()
+    test_skills_on_chosen_sections_only()
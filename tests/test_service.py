@@ -0,0 +1,110 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from starlette.testclient import TestClient
+import nlp_engine as nlp
+from sklearn.ensemble import RandomForestClassifier
+import service
+
+JD = "Senior accountant: general ledger, tax, payroll and Excel."
+RESUMES = [
+    ("cv.txt", b"Accountant, general ledger, payroll and Excel."),
+    ("cv.txt", b"Pastry chef running a restaurant kitchen."),
+    ("broken.pdf", b"not a pdf"),
+    ("teacher.txt", b"Classroom teacher, curriculum and lesson plans, some Excel."),
+    ("empty.txt", b""),
+]
+
+def _classifier():
+    le = nlp.get_label_encoder()
+    texts = ["general ledger tax audit payroll accountant", "kitchen menu chef cooking restaurant pastry"]
+    X = nlp.get_vectorizer().transform(nlp.clean_texts(texts))
+    return RandomForestClassifier(n_estimators=5, random_state=0).fit(X, le.transform(list(le.classes_[:2])))
+
+def _with_service(test):
+    # One dispatcher and a thread pool instead of worker processes (which
+    # would load en_core_web_sm), tiny chunks so a job spans several
+    def wrapper():
+        saved = (service.WORKERS, service.CHUNK_SIZE, service.QUEUE_SIZE, service.JOB_INFLIGHT,
+                 service.ProcessPoolExecutor, service._screen_chunk, nlp._classifier, nlp.SKILL_MATCHER_BACKEND,
+                 nlp._bank_matcher)
+        try:
+            service.WORKERS, service.CHUNK_SIZE, service.QUEUE_SIZE, service.JOB_INFLIGHT = 1, 2, 1, 1
+            service.ProcessPoolExecutor = lambda max_workers, initializer: ThreadPoolExecutor(max_workers)
+            nlp._classifier = _classifier()
+            nlp.SKILL_MATCHER_BACKEND, nlp._bank_matcher = 'automaton', None
+            with TestClient(service.app) as client:
+                test(client)
+        finally:
+            (service.WORKERS, service.CHUNK_SIZE, service.QUEUE_SIZE, service.JOB_INFLIGHT,
+             service.ProcessPoolExecutor, service._screen_chunk, nlp._classifier, nlp.SKILL_MATCHER_BACKEND,
+             nlp._bank_matcher) = saved
+    wrapper.__name__ = test.__name__
+    return wrapper
+
+def _post(client, jd=JD, skills="Accounting,Excel,Payroll", resumes=RESUMES):
+    return client.post("/jobs", data={"jd": jd, "skills": skills},
+                       files=[("files", (name, data)) for name, data in resumes])
+
+@_with_service
+def test_job_lifecycle(client):
+    resp = _post(client)
+    assert resp.status_code == 202
+    job = resp.json()
+    assert job["status"] == "queued" and job["total"] == len(RESUMES)
+    assert job["target_skills"] == ["Accounting", "Excel", "Payroll"]
+
+    rows = [json.loads(line) for line in client.get(f"/jobs/{job['job_id']}/results").iter_lines() if line]
+    assert [r["Index"] for r in rows] == list(range(len(RESUMES)))
+    assert [r["Candidate"] for r in rows] == [name for name, _ in RESUMES]
+    assert ["Error" in r for r in rows] == [False, False, True, False, True]
+    # Same filename, different resumes: two distinct results
+    assert rows[0]["Skills"] != rows[1]["Skills"] and rows[0]["Rank Score"] > rows[1]["Rank Score"]
+
+    status = client.get(f"/jobs/{job['job_id']}").json()
+    assert status["status"] == "done" and status["processed"] == len(RESUMES)
+    ranking = client.get(f"/jobs/{job['job_id']}/ranking?top_k=2").json()
+    assert [r["Index"] for r in ranking["ranking"]][0] == 0 and len(ranking["ranking"]) == 2
+    assert len(ranking["errors"]) == 2
+    report = client.get(f"/jobs/{job['job_id']}/report?format=csv&top_k=3")
+    assert report.status_code == 200 and report.text.startswith("Rank,Candidate")
+
+    # Skills inferred from the JD when none are given
+    inferred = _post(client, jd="Python developer with SQL and AWS", skills="", resumes=RESUMES[:1]).json()
+    assert sorted(inferred["target_skills"]) == ["Aws", "Python", "Sql"]
+
+@_with_service
+def test_errors(client):
+    started, release = threading.Event(), threading.Event()
+    screen_chunk = service._screen_chunk
+    def blocked(*args):
+        started.set()
+        release.wait(30)
+        return screen_chunk(*args)
+    service._screen_chunk = blocked
+    try:
+        running = _post(client).json()["job_id"]
+        assert started.wait(30)
+        # The dispatcher holds the first job, the second fills the queue
+        queued = _post(client)
+        assert queued.status_code == 202 and queued.json()["status"] == "queued"
+        full = _post(client)
+        assert full.status_code == 429 and full.headers["Retry-After"] == "5"
+        assert client.get(f"/jobs/{running}").json()["status"] == "running"
+        assert client.get(f"/jobs/{running}/report").status_code == 409
+    finally:
+        release.set()
+    rows = [line for line in client.get(f"/jobs/{queued.json()['job_id']}/results").iter_lines() if line]
+    assert len(rows) == len(RESUMES)
+
+    for path in ("/jobs/nope", "/jobs/nope/results", "/jobs/nope/ranking", "/jobs/nope/report"):
+        assert client.get(path).status_code == 404
+    for query in ("top_k=abc", "top_k=-1", "top_k=1.5"):
+        assert client.get(f"/jobs/{running}/ranking?{query}").status_code == 400
+        assert client.get(f"/jobs/{running}/report?format=csv&{query}").status_code == 400
+    assert client.get(f"/jobs/{running}/report?format=docx").status_code == 400
+    assert _post(client, jd="").status_code == 400
+
+if __name__ == "__main__":
+    test_job_lifecycle()
+    test_errors()
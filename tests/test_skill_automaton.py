@@ -0,0 +1,73 @@
+import os
+import json
+import tempfile
+import spacy
+from spacy.matcher import PhraseMatcher
+import nlp_engine as nlp
+from scripts.skill_automaton import SkillAutomaton
+
+SKILLS = json.load(open(os.path.join(nlp.MODELS_DIR, 'skills.json'))) + [
+    "Financial Reporting", "QuickBooks", "Microsoft Excel", "excel", "general ledger",
+    "accounts payable", "project management", "customer service", "c++", "node.js",
+]
+
+def phrase_matcher_skills(text, skills):
+    # extract_skills' PhraseMatcher path; only the tokenizer is involved, so
+    # a blank English pipeline stands in for en_core_web_sm here
+    blank = spacy.blank("en")
+    matcher = PhraseMatcher(blank.vocab, attr="LOWER")
+    matcher.add("SkillsMatcher", [blank.make_doc(s) for s in skills])
+    return nlp._match_skills(blank.make_doc(text), matcher)
+
+def test_automaton_matches_phrase_matcher_on_resumes():
+    automaton = SkillAutomaton.build(SKILLS)
+    data_dir = os.path.join(nlp.BASE_DIR, "data")
+    for filename in sorted(os.listdir(data_dir)):
+        with open(os.path.join(data_dir, filename), 'rb') as f:
+            # Whitespace is collapsed because spaCy keeps line breaks as
+            # tokens, so "Microsoft\nExcel" only matches in the automaton
+            text = " ".join(nlp.extract_text_universal(f, filename).split())
+        assert sorted(automaton.extract(text)) == sorted(phrase_matcher_skills(text, SKILLS)), filename
+
+def test_overlapping_matches_and_aliases():
+    automaton = SkillAutomaton.build({
+        "machine learning": ["ML", "statistical learning"],
+        "learning": [],
+        "deep learning": [],
+        "JavaScript": ["js", "ECMAScript"],
+    })
+    found = automaton.extract("Deep learning and machine learning, ML and ecmascript (JS) since 2019")
+    assert sorted(found) == ["Deep Learning", "Javascript", "Learning", "Machine Learning"]
+    assert automaton.extract("nothing relevant here") == []
+    assert automaton.extract("") == []
+
+def test_save_load_round_trip_and_extract_skills_dispatch():
+    automaton = nlp.get_skills_matcher(SKILLS, backend="automaton")
+    text = "Senior Python developer: SQL, AWS, Docker and general ledger work."
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "skills_automaton.pkl")
+        automaton.save(path)
+        loaded = SkillAutomaton.load(path)
+    assert sorted(nlp.extract_skills(text, loaded)) == sorted(automaton.extract(text))
+    assert sorted(nlp.extract_skills_batch([text, ""], loaded)[0]) == ["Aws", "Docker", "General Ledger", "Python", "Sql"]
+
+def test_configured_automaton_is_the_bank_matcher():
+    automaton = SkillAutomaton.build({"Machine Learning": ["ML"], "Excel": ["MS Excel"]})
+    saved = nlp.SKILL_AUTOMATON, nlp._skill_automaton, nlp._bank_matcher
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "skills_automaton.pkl")
+        automaton.save(path)
+        try:
+            nlp.SKILL_AUTOMATON, nlp._skill_automaton, nlp._bank_matcher = path, None, None
+            matcher = nlp.get_bank_matcher()
+            assert matcher is nlp.get_bank_matcher() is nlp.get_skill_automaton()
+            assert sorted(nlp.extract_skills("ML engineer, MS Excel", matcher)) == ["Excel", "Machine Learning"]
+        finally:
+            nlp.SKILL_AUTOMATON, nlp._skill_automaton, nlp._bank_matcher = saved
+
+if __name__ == "__main__":
+    test_automaton_matches_phrase_matcher_on_resumes()
+    test_overlapping_matches_and_aliases()
+    test_save_load_round_trip_and_extract_skills_dispatch()
+    test_configured_automaton_is_the_bank_matcher()
+    print("Skill automaton agrees with the PhraseMatcher.")
@@ -0,0 +1,44 @@
+import random
+from collections import Counter
+import numpy as np
+import nlp_engine as nlp
+from scripts.skill_bits import SkillMatrix, SkillVocabulary
+
+def _pool(n=2000, seed=0):
+    rng = random.Random(seed)
+    bank = [f"Skill {i}" for i in range(300)] + ["Python", "Sql", "Accounting"]
+    # Some lists repeat a skill, as concatenated extractions can
+    return bank, [rng.sample(bank, rng.randint(0, 25)) + rng.sample(bank, rng.randint(0, 1)) for _ in range(n)]
+
+def test_matches_set_based_scoring():
+    bank, pool = _pool()
+    skill_bits = SkillMatrix.encode(pool)
+    assert skill_bits.bits.dtype == np.uint8 and skill_bits.bits.shape == (len(pool), (len(bank) + 7) // 8)
+    for targets in (["Python", "Sql", "Accounting"], ["Python", "Python", "Never Seen"], []):
+        ratios = skill_bits.match_ratio(targets)
+        gaps = skill_bits.gaps(targets)
+        for i, skills in enumerate(pool):
+            assert ratios[i] == nlp.skill_match_ratio(targets, skills)
+            assert gaps[i] == nlp.identify_gap(targets, skills)
+    assert (skill_bits.counts() == [len(set(s)) for s in pool]).all()
+    assert sorted(skill_bits.skills_of(7)) == sorted(set(pool[7]))
+
+def test_coverage_and_shared_vocabulary():
+    bank, pool = _pool()
+    skill_bits = SkillMatrix.encode(pool)
+    expected = Counter(s for skills in pool for s in set(skills))
+    assert skill_bits.coverage() == {name: expected[name] for name in skill_bits.vocabulary.names}
+    assert skill_bits.coverage(["Python", "Never Seen"]) == {"Python": expected["Python"], "Never Seen": 0}
+    # A fixed vocabulary keeps ids stable across batches and grows as needed
+    vocabulary = SkillVocabulary(bank)
+    first = SkillMatrix.encode(pool[:10], vocabulary)
+    second = SkillMatrix.encode([["Python", "Brand New"]], vocabulary)
+    assert vocabulary.ids["Brand New"] == len(bank)
+    assert first.skills_of(3) == [s for s in bank if s in set(pool[3])]
+    assert second.skills_of(0) == ["Python", "Brand New"]
+    empty = SkillMatrix.encode([[], []])
+    assert empty.match_ratio(["Python"]).tolist() == [0.0, 0.0] and empty.gaps(["Python"]) == [["Python"]] * 2
+
+if __name__ == "__main__":
+    test_matches_set_based_scoring()
+    test_coverage_and_shared_vocabulary()
@@ -0,0 +1,46 @@
+import os
+import json
+import spacy
+from spacy.matcher import PhraseMatcher
+import nlp_engine as nlp
+
+SKILLS = json.load(open(os.path.join(nlp.BASE_DIR, 'models', 'skills.json'))) + [
+    "Financial Reporting", "QuickBooks", "Microsoft Excel", "general ledger", "c++", "node.js",
+]
+
+def _pipeline():
+    # en_core_web_sm when installed, else the same tokenizer rules on a blank pipeline
+    try:
+        return spacy.load('en_core_web_sm')
+    except OSError:
+        return spacy.blank("en")
+
+def _full_pipeline_skills(pipeline, text):
+    # What extract_skills did before it skipped the pipeline: a full nlp(text)
+    matcher = PhraseMatcher(pipeline.vocab, attr="LOWER")
+    matcher.add("SkillsMatcher", [pipeline.make_doc(s) for s in SKILLS])
+    doc = pipeline(text)
+    return sorted({doc[start:end].text.lower().title() for _, start, end in matcher(doc)})
+
+def test_tokenizer_only_matching_equals_full_pipeline():
+    data_dir = os.path.join(nlp.BASE_DIR, "data")
+    texts = ["", "Python, SQL and node.js; c++ too. MICROSOFT EXCEL / general ledger"]
+    for filename in sorted(os.listdir(data_dir)):
+        with open(os.path.join(data_dir, filename), 'rb') as f:
+            texts.append(nlp.extract_text_universal(f, filename))
+    pipeline = _pipeline()
+    saved = nlp._nlp
+    try:
+        nlp._nlp = pipeline
+        matcher = nlp.get_skills_matcher(SKILLS, backend="phrase")
+        expected = [_full_pipeline_skills(pipeline, text) for text in texts]
+        assert expected[1] == ["C++", "General Ledger", "Microsoft Excel", "Node.Js", "Python", "Sql"]
+        assert [sorted(nlp.extract_skills(text, matcher)) for text in texts] == expected
+        for n_process in (1, 2):
+            found = nlp.extract_skills_batch(texts, matcher, n_process=n_process, batch_size=4)
+            assert [sorted(skills) for skills in found] == expected
+    finally:
+        nlp._nlp = saved
+
+if __name__ == "__main__":
+    test_tokenizer_only_matching_equals_full_pipeline()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import nlp_engine as nlp
+from scripts import train_v2
+from scripts.hashing_featurizer import HashingFeaturizer
+
+VOCAB = {
+    "ACCOUNTANT": ["ledger", "tax", "audit", "reconciliation", "quickbooks", "payroll", "invoices"],
+    "CHEF": ["kitchen", "menu", "culinary", "cooking", "restaurant", "pastry", "sauces"],
+    "TEACHER": ["classroom", "curriculum", "students", "lesson", "grading", "tutoring", "school"],
+}
+
+def _write_csv(path, per_category=40):
+    # Sorted by category like the Kaggle export, which is what the shuffle
+    # shards exist for
+    rng = np.random.default_rng(0)
+    rows = []
+    for category, words in VOCAB.items():
+        for i in range(per_category):
+            text = " ".join(rng.choice(words, size=12)) + f" resume number {i}"
+            rows.append({"ID": len(rows), "Resume_str": text, "Category": category})
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return len(rows)
+
+def test_featurizer_is_stateless():
+    a, b = HashingFeaturizer(n_features=2 ** 10), HashingFeaturizer(n_features=2 ** 10)
+    X = a.transform(["tax audit tax", "kitchen menu"])
+    assert (X != b.transform(["tax audit tax", "kitchen menu"])).nnz == 0
+    assert np.allclose(np.asarray(X.multiply(X).sum(axis=1)).ravel(), 1.0)
+
+def test_streaming_training_and_hashing_inference():
+    saved = (nlp.MODELS_DIR, nlp.FEATURIZER, nlp._classifier, nlp._vectorizer, nlp._label_encoder, nlp._streaming_model)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "Resume.csv")
+        n_rows = _write_csv(csv_path)
+        models_dir = os.path.join(tmp, "models")
+        # Tiny shards and mini-batches so every phase loops more than once
+        report = train_v2.train_streaming(csv_path, models_dir, chunk_size=8, epochs=3, shard_mb=0.002,
+                                          n_features=2 ** 12, n_jobs=1, use_cache=False)
+        assert report["rows"] == n_rows
+        assert report["accuracy"] == 1.0
+        try:
+            nlp.MODELS_DIR, nlp.FEATURIZER = models_dir, 'hashing'
+            nlp._classifier = nlp._vectorizer = nlp._label_encoder = nlp._streaming_model = None
+            assert nlp.predict_category("audit of the general ledger and tax returns")[0] == "ACCOUNTANT"
+            assert nlp.predict_category("pastry chef running a restaurant kitchen")[0] == "CHEF"
+            assert nlp.vectorizer_fingerprint().startswith("hashing:")
+        finally:
+            (nlp.MODELS_DIR, nlp.FEATURIZER, nlp._classifier, nlp._vectorizer,
+             nlp._label_encoder, nlp._streaming_model) = saved
+
+if __name__ == "__main__":
+    test_featurizer_is_stateless()
+    test_streaming_training_and_hashing_inference()
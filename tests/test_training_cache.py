@@ -0,0 +1,88 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import make_pipeline
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+from scripts import train_v2
+
+VOCAB = {
+    "ACCOUNTANT": ["ledger", "tax", "audit", "reconciliation", "quickbooks", "payroll", "invoices"],
+    "CHEF": ["kitchen", "menu", "culinary", "cooking", "restaurant", "pastry", "sauces"],
+    "TEACHER": ["classroom", "curriculum", "students", "lesson", "grading", "tutoring", "school"],
+}
+
+def _write_csv(path, per_category=12, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for category, words in VOCAB.items():
+        for i in range(per_category):
+            text = " ".join(rng.choice(words, size=10)) + f" resume number {i}"
+            rows.append({"ID": len(rows), "Resume_str": text, "Category": category})
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+def _record_hits(run):
+    # Runs `run` and returns (cache file, hit) for every _cached lookup
+    hits = []
+    original = train_v2._cached
+    def cached(path, build, use_cache=True):
+        value, hit = original(path, build, use_cache)
+        hits.append((os.path.basename(path), hit))
+        return value, hit
+    train_v2._cached = cached
+    try:
+        run()
+    finally:
+        train_v2._cached = original
+    return hits
+
+def _features(csv_path, cache_dir):
+    cleaned, _, data_dir = train_v2.load_corpus(csv_path, cache_dir, n_jobs=1)
+    train_v2.fit_tfidf(cleaned, (1, 1), data_dir)
+    return data_dir
+
+def test_feature_cache_follows_the_data():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, cache_dir = os.path.join(tmp, "Resume.csv"), os.path.join(tmp, "cache")
+        _write_csv(csv_path)
+        data_dirs = []
+        first = _record_hits(lambda: data_dirs.append(_features(csv_path, cache_dir)))
+        assert [hit for _, hit in first] == [False, False]
+        # Same bytes: the cleaned corpus and the TF-IDF matrix are reused
+        again = _record_hits(lambda: data_dirs.append(_features(csv_path, cache_dir)))
+        assert again == [(name, True) for name, _ in first]
+        # Changed data: a new cache directory, everything rebuilt
+        _write_csv(csv_path, seed=1)
+        changed = _record_hits(lambda: data_dirs.append(_features(csv_path, cache_dir)))
+        assert [hit for _, hit in changed] == [False, False]
+        assert data_dirs[0] == data_dirs[1] != data_dirs[2]
+        # A different n-gram range is a different matrix
+        cleaned, _, data_dir = train_v2.load_corpus(csv_path, cache_dir, n_jobs=1)
+        [(name, hit)] = _record_hits(lambda: train_v2.fit_tfidf(cleaned, (1, 2), data_dir))
+        assert name != first[1][0] and not hit
+
+def test_sweep_refits_the_vectorizer_per_fold():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "Resume.csv")
+        _write_csv(csv_path)
+        cleaned, categories, data_dir = train_v2.load_corpus(csv_path, os.path.join(tmp, "cache"), n_jobs=1)
+        y = np.unique(categories, return_inverse=True)[1]
+        grid = {"n_estimators": [5], "max_features": ["sqrt"], "ngram_range": [(1, 1), (1, 2)]}
+        rows = train_v2.sweep(cleaned, y, data_dir, grid=grid, cv=3, n_jobs=1)
+        assert sorted(tuple(r["ngram_range"]) for r in rows) == [(1, 1), (1, 2)]
+        # Each score is the cross-validation of TF-IDF + forest fitted together
+        folds = StratifiedKFold(n_splits=3, shuffle=True, random_state=42)
+        for r in rows:
+            pipeline = make_pipeline(TfidfVectorizer(**dict(train_v2.TFIDF_PARAMS, ngram_range=tuple(r["ngram_range"]))),
+                                     RandomForestClassifier(n_estimators=5, max_features="sqrt", random_state=42, n_jobs=1))
+            assert r["cv_accuracy"] == round(float(cross_val_score(pipeline, cleaned, y, cv=folds).mean()), 4)
+        # The memoized vectorizers give the same scores on a rerun
+        assert os.path.isdir(os.path.join(data_dir, "sweep"))
+        assert [r["cv_accuracy"] for r in train_v2.sweep(cleaned, y, data_dir, grid=grid, cv=3, n_jobs=1)] == \
+            [r["cv_accuracy"] for r in rows]
+
+if __name__ == "__main__":
+    test_feature_cache_follows_the_data()
+    test_sweep_refits_the_vectorizer_per_fold()